@@ -0,0 +1,195 @@
+from io import BytesIO
+
+from pytz import timezone as get_timezone
+
+from .columns.service import get_column_by_spec, read_column
+from .reader import read_varint
+from .util.helpers import import_numpy, import_pyarrow
+
+
+numpy_dtypes = {
+    'Int8': '<i1', 'Int16': '<i2', 'Int32': '<i4', 'Int64': '<i8',
+    'UInt8': '<u1', 'UInt16': '<u2', 'UInt32': '<u4', 'UInt64': '<u8',
+    'Float32': '<f4', 'Float64': '<f8',
+    'IntervalYear': '<i8', 'IntervalMonth': '<i8', 'IntervalWeek': '<i8',
+    'IntervalDay': '<i8', 'IntervalHour': '<i8', 'IntervalMinute': '<i8',
+    'IntervalSecond': '<i8'
+}
+
+
+def null_bitmap(mask):
+    np = import_numpy()
+    pa = import_pyarrow()
+
+    # Arrow validity bitmap: bit is set for valid items.
+    bits = np.packbits(~mask, bitorder='little')
+    return pa.py_buffer(bits.tobytes())
+
+
+def read_fixed(dtype, n_items, buf):
+    np = import_numpy()
+    size = np.dtype(dtype).itemsize * n_items
+    return np.frombuffer(buf.read(size), dtype=dtype)
+
+
+def read_strings(n_items, buf, mask):
+    np = import_numpy()
+    pa = import_pyarrow()
+
+    offsets = np.zeros(n_items + 1, dtype=np.int32)
+    data = bytearray()
+
+    for i in range(n_items):
+        data += buf.read(read_varint(buf))
+        offsets[i + 1] = len(data)
+
+    return pa.StringArray.from_buffers(
+        n_items, pa.py_buffer(offsets.tobytes()), pa.py_buffer(bytes(data)),
+        null_bitmap(mask) if mask is not None else None
+    )
+
+
+def get_timezone_name(spec, context):
+    # Column's timezone or server's one.
+    if spec[-1] == ')':
+        return spec[10:-2]
+
+    if not context.settings.get('use_client_time_zone', False):
+        return context.server_info.timezone
+
+
+def read_enum(spec, n_items, buf, mask, context):
+    np = import_numpy()
+    pa = import_pyarrow()
+
+    column = get_column_by_spec(spec, {'context': context})
+    values = read_fixed('<' + column.format, n_items, buf)
+
+    enum_values = sorted(column.value_to_name)
+    names = [column.value_to_name[x] for x in enum_values]
+
+    indices = np.searchsorted(enum_values, values).astype(np.int32)
+    return pa.DictionaryArray.from_arrays(
+        pa.array(indices, mask=mask), pa.array(names)
+    )
+
+
+def read_arrow_column(context, spec, n_items, buf, mask=None):
+    """
+    Reads column in native format into pyarrow array. Fixed width values
+    are taken from received buffer without copying, strings and arrays are
+    built from offsets. Other types are read as Python objects.
+    """
+    np = import_numpy()
+    pa = import_pyarrow()
+
+    if spec.startswith('Nullable'):
+        mask = np.frombuffer(buf.read(n_items), dtype=np.bool_)
+        return read_arrow_column(context, spec[9:-1], n_items, buf, mask=mask)
+
+    elif spec.startswith('Array'):
+        offsets = read_fixed('<u8', n_items, buf)
+        n_nested = int(offsets[-1]) if n_items else 0
+        values = read_arrow_column(context, spec[6:-1], n_nested, buf)
+
+        offsets = np.concatenate(([0], offsets)).astype(np.int64)
+        return pa.LargeListArray.from_arrays(pa.array(offsets), values)
+
+    elif spec in numpy_dtypes:
+        values = read_fixed(numpy_dtypes[spec], n_items, buf)
+        return pa.array(values, mask=mask)
+
+    elif spec == 'String':
+        return read_strings(n_items, buf, mask)
+
+    elif spec.startswith('FixedString'):
+        length = int(spec[12:-1])
+        data = buf.read(length * n_items)
+        bitmap = null_bitmap(mask) if mask is not None else None
+        return pa.FixedSizeBinaryArray.from_buffers(
+            pa.binary(length), n_items, [bitmap, pa.py_buffer(data)]
+        )
+
+    elif spec == 'Date':
+        values = read_fixed('<u2', n_items, buf)
+        return pa.array(values.astype('datetime64[D]'), mask=mask)
+
+    elif spec.startswith('DateTime'):
+        values = read_fixed('<u4', n_items, buf).astype(np.int64)
+        tz_name = get_timezone_name(spec, context)
+        if tz_name:
+            # Check timezone name before passing it to Arrow.
+            tz_name = get_timezone(tz_name).zone
+
+        return pa.array(values, type=pa.timestamp('s', tz=tz_name),
+                        mask=mask)
+
+    elif spec.startswith('Enum'):
+        return read_enum(spec, n_items, buf, mask, context)
+
+    values = read_column(context, spec, n_items, buf)
+    if mask is not None:
+        values = [None if is_null else x for x, is_null in zip(values, mask)]
+
+    if spec == 'UUID':
+        values = [None if x is None else str(x) for x in values]
+        return pa.array(values, type=pa.string())
+
+    return pa.array(values)
+
+
+def block_to_record_batch(block, context):
+    pa = import_pyarrow()
+
+    names = [name for name, _ in block.columns_with_types]
+
+    if block.rows:
+        arrays = block.get_columns()
+    else:
+        # Header block. Empty arrays give schema of result.
+        arrays = [
+            read_arrow_column(context, spec, 0, BytesIO())
+            for _, spec in block.columns_with_types
+        ]
+
+    return pa.RecordBatch.from_arrays(arrays, names)
+
+
+def arrow_to_columns(table):
+    """
+    Takes numpy arrays from pyarrow Table columns. Fixed width columns
+    without nulls are taken without copying, nulls become masked arrays.
+    """
+    np = import_numpy()
+    pa = import_pyarrow()
+
+    columns = {}
+
+    for name, column in zip(table.column_names, table.columns):
+        array = column.combine_chunks() \
+            if isinstance(column, pa.ChunkedArray) else column
+
+        if pa.types.is_dictionary(array.type):
+            array = array.dictionary_decode()
+
+        if pa.types.is_timestamp(array.type) and array.type.tz is not None:
+            # Timezone aware values are UTC internally. Integers are written
+            # as timestamps.
+            array = array.cast(pa.timestamp('s', array.type.tz))
+            array = array.view(pa.int64())
+
+        is_fixed = pa.types.is_integer(array.type) or \
+            pa.types.is_floating(array.type) or \
+            pa.types.is_temporal(array.type)
+
+        if is_fixed and array.null_count:
+            mask = array.is_null().to_numpy(zero_copy_only=False)
+            values = array.fill_null(0).to_numpy(zero_copy_only=False)
+            values = np.ma.masked_array(values, mask=mask)
+
+        else:
+            values = array.to_numpy(zero_copy_only=False)
+
+        columns[name] = values
+
+    return columns
@@ -35,22 +35,31 @@ class Block(object):
     supported_row_types = dict_row_types + tuple_row_types
 
     def __init__(self, columns_with_types=None, data=None, info=None,
-                 types_check=False, received_from_server=False):
+                 types_check=False, received_from_server=False,
+                 columnar=False, start_row=0):
         self.columns_with_types = columns_with_types or []
         self.data = data or []
         self.types_check = types_check
+        self.columnar = columnar
+        # Number of rows in previous blocks of the same INSERT. Rows in
+        # errors are counted from the beginning of inserted data.
+        self.start_row = start_row
 
         if data and not received_from_server:
-            # Guessing about whole data format by first row.
-            first_row = data[0]
+            if columnar:
+                self.check_columns(data)
 
-            if self.types_check:
-                self.check_row_type(first_row)
-
-            if isinstance(first_row, dict):
-                self.dicts_to_rows(data)
             else:
-                self.check_rows(data)
+                # Guessing about whole data format by first row.
+                first_row = data[0]
+
+                if self.types_check:
+                    self.check_row_type(first_row)
+
+                if isinstance(first_row, dict):
+                    self.data = self.dicts_to_rows(data)
+                else:
+                    self.check_rows(data)
 
         self.info = info or BlockInfo()
 
@@ -63,11 +72,14 @@ class Block(object):
         if self.types_check:
             check_row_type = self.check_dict_row_type
 
+        rows = [None] * len(data)
         for i, row in enumerate(data):
             if check_row_type:
                 check_row_type(row)
 
-            self.data[i] = [row[name] for name in column_names]
+            rows[i] = [row[name] for name in column_names]
+
+        return rows
 
     def check_rows(self, data):
         expected_row_len = len(self.columns_with_types)
@@ -78,15 +90,39 @@ class Block(object):
             raise ValueError(msg)
 
         if self.types_check:
+            # Check one row of each distinct type.
             check_row_type = self.check_tuple_row_type
-            for row in data:
+            for row in dict((type(x), x) for x in data).values():
                 check_row_type(row)
 
+    def check_columns(self, data):
+        expected_n_columns = len(self.columns_with_types)
+
+        got = len(data)
+        if expected_n_columns != got:
+            msg = 'Expected {} columns, got {}'.format(expected_n_columns, got)
+            raise ValueError(msg)
+
+        if len(set(len(x) for x in data)) > 1:
+            raise ValueError('Different columns length')
+
     def get_columns(self):
-        return self.data
+        if self.columnar:
+            return self.data
+
+        return [self.get_column(i) for i in range(self.columns)]
+
+    def get_column(self, i):
+        if self.columnar:
+            return self.data[i]
+
+        try:
+            return [row[i] for row in self.data]
+        except IndexError:
+            raise ValueError('Different rows length')
 
     def get_rows(self):
-        if not self.data:
+        if not self.columnar or not self.data:
             return self.data
 
         # Transpose results: columns -> rows.
@@ -132,8 +168,11 @@ class Block(object):
 
     @property
     def columns(self):
-        return len(self.data)
+        return len(self.columns_with_types)
 
     @property
     def rows(self):
-        return len(self.data[0]) if self.columns else 0
+        if not self.columnar:
+            return len(self.data)
+
+        return len(self.data[0]) if self.data else 0
@@ -0,0 +1,251 @@
+from itertools import chain
+from threading import Thread
+
+from . import defines
+from .client import Client
+from .connection import create_ssl_context
+from .util import compat
+from .util.helpers import chunks
+
+if compat.PY3:
+    from queue import Queue
+else:
+    from Queue import Queue
+
+
+class BulkInsertError(Exception):
+    def __init__(self, report):
+        self.report = report
+        super(BulkInsertError, self).__init__(report)
+
+    def __str__(self):
+        failed = self.report.failed
+        return '{} of {} connections failed: {}'.format(
+            len(failed), len(self.report.results),
+            '; '.join(
+                '{}: {}'.format(x.description, x.error) for x in failed
+            )
+        )
+
+
+class InsertAbortedError(Exception):
+    pass
+
+
+class ConnectionResult(object):
+    def __init__(self, shard, description):
+        self.shard = shard
+        self.description = description
+        self.rows = 0
+        self.blocks = 0
+        self.error = None
+
+        super(ConnectionResult, self).__init__()
+
+
+class BulkInsertReport(object):
+    def __init__(self, results):
+        self.results = results
+
+        super(BulkInsertReport, self).__init__()
+
+    @property
+    def rows(self):
+        return sum(x.rows for x in self.results)
+
+    @property
+    def failed(self):
+        return [x for x in self.results if x.error is not None]
+
+
+class BulkInserter(object):
+    """
+    Fans out rows from one data source over several connections. Each
+    connection runs its own INSERT query in separate thread.
+
+    :param hosts: list of shard hosts. Host can be passed as string or as
+                  ``(host, port)`` tuple.
+    :param connections_per_host: number of connections opened to each host.
+    :param sharding_key: function returning integer key for row. Row goes to
+                         shard ``sharding_key(row) % len(hosts)``. Without
+                         it blocks are spread between all connections.
+    :param queue_size: number of blocks waiting for each connection. Reading
+                       of data is paused when connections fall behind.
+
+    Other keyword arguments are passed to :class:`Client`.
+    """
+
+    ssl_options = (
+        'verify', 'ssl_version', 'ca_certs', 'ciphers', 'certfile', 'keyfile'
+    )
+
+    # Sent to connections instead of end of data if reading of data or
+    # other connection failed. INSERT must not be finished with part of
+    # data.
+    abort = object()
+
+    def __init__(self, hosts, connections_per_host=1, sharding_key=None,
+                 queue_size=2, **kwargs):
+        settings = kwargs.pop('settings', {})
+        self.block_size = settings.get(
+            'insert_block_size', defines.DEFAULT_INSERT_BLOCK_SIZE
+        )
+        if sharding_key is None and len(hosts) > 1:
+            raise ValueError('sharding_key is required for several hosts')
+
+        self.sharding_key = sharding_key
+        self.queue_size = queue_size
+
+        # All connections share one SSL context.
+        if kwargs.get('secure') and kwargs.get('ssl_context') is None:
+            ssl_options = dict(
+                (x, kwargs.pop(x)) for x in self.ssl_options if x in kwargs
+            )
+            kwargs['ssl_context'] = create_ssl_context(**ssl_options)
+
+        self.shards = []
+        for host in hosts:
+            host, port = host if isinstance(host, tuple) else (host, None)
+            self.shards.append([
+                Client(host, port, settings=settings.copy(), **kwargs)
+                for _ in range(connections_per_host)
+            ])
+
+        super(BulkInserter, self).__init__()
+
+    def disconnect(self):
+        for clients in self.shards:
+            for client in clients:
+                client.disconnect()
+
+    def insert(self, query, data, settings=None, types_check=False):
+        """
+        Inserts rows from data iterable. Returns :class:`BulkInsertReport`
+        with number of rows sent by each connection. Raises
+        :class:`BulkInsertError` with the report if any connection failed.
+
+        Data is not read anymore after the first failure and other
+        connections are closed without end of data: their errors are
+        :class:`InsertAbortedError`. Insert is not atomic. Server drops
+        only data it hasn't written yet: rows above
+        ``min_insert_block_size_rows`` or ``min_insert_block_size_bytes``
+        may be already stored by closed connections.
+        """
+        queues = [
+            Queue(self.queue_size * len(clients)) for clients in self.shards
+        ]
+
+        results = []
+        threads = []
+        for i, clients in enumerate(self.shards):
+            for client in clients:
+                result = ConnectionResult(
+                    i, client.connection.get_description()
+                )
+                thread = Thread(
+                    target=self.run_connection,
+                    args=(client, query, queues[i], result, settings,
+                          types_check)
+                )
+                thread.daemon = True
+                thread.start()
+
+                results.append(result)
+                threads.append(thread)
+
+        def failed():
+            return any(x.error is not None for x in results)
+
+        completed = False
+        try:
+            if self.sharding_key is None:
+                self.spread_blocks(data, queues[0], failed)
+            else:
+                self.shard_rows(data, queues, failed)
+
+            # Failed connection aborts the others as failed data source.
+            completed = not failed()
+
+        finally:
+            end = None if completed else self.abort
+            for clients, queue in zip(self.shards, queues):
+                for _ in clients:
+                    queue.put(end)
+
+            for thread in threads:
+                thread.join()
+
+        report = BulkInsertReport(results)
+        if report.failed:
+            raise BulkInsertError(report)
+
+        return report
+
+    def spread_blocks(self, data, queue, failed):
+        # Without sharding key all connections are in one shard.
+        for chunk in chunks(data, self.block_size):
+            if failed():
+                break
+            queue.put(chunk)
+
+    def shard_rows(self, data, queues, failed):
+        sharding_key = self.sharding_key
+        block_size = self.block_size
+        n_shards = len(queues)
+        buffers = [[] for _ in queues]
+
+        for row in data:
+            i = sharding_key(row) % n_shards
+            buffer = buffers[i]
+            buffer.append(row)
+
+            if len(buffer) >= block_size:
+                if failed():
+                    return
+                queues[i].put(buffer)
+                buffers[i] = []
+
+        for buffer, queue in zip(buffers, queues):
+            if buffer:
+                queue.put(buffer)
+
+    def run_connection(self, client, query, queue, result, settings,
+                       types_check):
+        exhausted = []
+
+        def blocks():
+            for block in iter(queue.get, None):
+                if block is self.abort:
+                    exhausted.append(True)
+                    raise InsertAbortedError(
+                        'Data source or other connection failed'
+                    )
+
+                result.rows += len(block)
+                result.blocks += 1
+                yield block
+
+            exhausted.append(True)
+
+        connection = client.connection
+        connection.context.settings = client.make_query_settings(settings)
+
+        try:
+            connection.force_connect()
+            client.process_insert_query(
+                query, chain.from_iterable(blocks()), types_check=types_check
+            )
+
+        except Exception as e:
+            # Connection is closed without end of data: server drops data
+            # of INSERT that isn't written yet.
+            result.error = e
+            client.disconnect()
+
+        # Keep queue drained, reader must not be blocked by connection
+        # that stopped early. Blocks taken from other connections of shard
+        # are dropped: they are aborted too.
+        if not exhausted:
+            for block in iter(queue.get, None):
+                if block is self.abort:
+                    break
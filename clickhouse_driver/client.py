@@ -1,69 +1,273 @@
+import logging
+import re
+import socket
+
 from . import errors, defines
+from .arrow import arrow_to_columns, block_to_record_batch
 from .block import Block
 from .connection import Connection
+from .dataframe import columns_to_dataframe, dataframe_to_columns
+from .nativefile import NativeFileWriter
 from .protocol import ServerPacketTypes
+from .queryinfo import QueryInfo
 from .result import IterQueryResult, ProgressQueryResult, QueryResult
-from .util.escape import escape_params
-from .util.helpers import chunks
+from .resultcache import estimate_columns_size
+from .resultstorage import SpillingStorage
+from .textfile import DEFAULT_CHUNK_SIZE, TextFileReader
+from .util.escape import escape_identifier, escape_params
+from .util.helpers import chunks, column_chunks, import_pyarrow
+from .util.prefetch import PrefetchIterator
+from .watchdog import QueryWatchdog
+
+
+logger = logging.getLogger(__name__)
+
+# Query is finished by server after these errors, connection is usable.
+reusable_connection_errors = (
+    errors.ServerException, errors.TimeoutExceededError
+)
+
+# Queries that don't modify data and can be safely sent again.
+idempotent_query_re = re.compile(
+    r'\s*(SELECT|WITH|SHOW|DESC|DESCRIBE|EXISTS)\b', re.IGNORECASE
+)
 
 
 class Client(object):
     def __init__(self, *args, **kwargs):
         self.settings = kwargs.pop('settings', {})
+        self.result_cache = kwargs.pop('result_cache', None)
 
         client_settings = {
             'insert_block_size': self.settings.pop(
                 'insert_block_size', defines.DEFAULT_INSERT_BLOCK_SIZE
+            ),
+            'datetime_output': self.settings.pop(
+                'datetime_output', defines.DEFAULT_DATETIME_OUTPUT
+            ),
+            'uuid_output': self.settings.pop(
+                'uuid_output', defines.DEFAULT_UUID_OUTPUT
+            ),
+            'enum_output': self.settings.pop(
+                'enum_output', defines.DEFAULT_ENUM_OUTPUT
+            ),
+            'array_output': self.settings.pop(
+                'array_output', defines.DEFAULT_ARRAY_OUTPUT
+            ),
+            'insert_pipeline_depth': self.settings.pop(
+                'insert_pipeline_depth', defines.DEFAULT_INSERT_PIPELINE_DEPTH
+            ),
+            'use_numpy': self.settings.pop(
+                'use_numpy', defines.DEFAULT_USE_NUMPY
+            ),
+            'result_memory_limit': self.settings.pop(
+                'result_memory_limit', defines.DEFAULT_RESULT_MEMORY_LIMIT
             )
         }
 
         self.connection = Connection(*args, **kwargs)
         self.connection.context.settings = self.settings
         self.connection.context.client_settings = client_settings
+        # Information about the last query.
+        self.last_query = None
         super(Client, self).__init__()
 
     def disconnect(self):
         self.connection.disconnect()
 
     def receive_result(self, with_column_types=False, progress=False,
-                       columnar=False):
+                       columnar=False, watchdog=None, callbacks=None):
 
-        gen = self.packet_generator()
+        gen = self.packet_generator(watchdog=watchdog, callbacks=callbacks)
+        storage = self.make_result_storage(columnar)
 
         if progress:
             return ProgressQueryResult(
-                gen, with_column_types=with_column_types, columnar=columnar
+                gen, with_column_types=with_column_types, columnar=columnar,
+                storage=storage
             )
 
         else:
             result = QueryResult(
-                gen, with_column_types=with_column_types, columnar=columnar
+                gen, with_column_types=with_column_types, columnar=columnar,
+                storage=storage
             )
             return result.get_result()
 
-    def iter_receive_result(self, with_column_types=False):
-        gen = self.packet_generator()
+    def make_result_storage(self, columnar):
+        context = self.connection.context
+        memory_limit = context.client_settings['result_memory_limit']
 
-        for rows in IterQueryResult(gen, with_column_types=with_column_types):
-            for row in rows:
-                yield row
+        # Columns are always kept in memory.
+        if not memory_limit or columnar:
+            return None
+
+        return SpillingStorage(context, memory_limit)
+
+    def iter_receive_result(self, with_column_types=False, watchdog=None,
+                            callbacks=None):
+        packets = self.iter_receive_packets(watchdog=watchdog,
+                                            callbacks=callbacks)
+
+        try:
+            # Generator is started by caller to get into this block.
+            yield
+
+            for rows in IterQueryResult(packets,
+                                        with_column_types=with_column_types):
+                for row in rows:
+                    yield row
+
+        finally:
+            packets.close()
+
+    def iter_receive_packets(self, watchdog=None, callbacks=None):
+        """
+        Returns generator of current query packets. Query is cancelled if
+        generator is closed before the end of result.
+        """
+        packets = self._iter_receive_packets(watchdog=watchdog,
+                                             callbacks=callbacks)
+        # Generator is started here to get into its try block: closed
+        # generator must cancel query even if no packets were taken.
+        next(packets)
+        return packets
+
+    def _iter_receive_packets(self, watchdog=None, callbacks=None):
+        gen = self.packet_generator(watchdog=watchdog, callbacks=callbacks)
+        query_number = self.connection.queries_sent
+
+        try:
+            yield
+
+            for packet in gen:
+                yield packet
+
+        except GeneratorExit:
+            # Generator is closed or garbage collected before the end of
+            # result. Query is still running unless connection has been
+            # used for other query since.
+            if watchdog:
+                watchdog.stop()
+
+            connection = self.connection
+            if connection.connected and \
+                    connection.queries_sent == query_number:
+                self.cancel_and_drain()
+            raise
+
+    def packet_generator(self, watchdog=None, callbacks=None):
+        fired = False
 
-    def packet_generator(self):
         while True:
             try:
                 packet = self.receive_packet()
                 if not packet:
+                    # Stream is completed: watchdog is stopped before
+                    # anything else, so Cancel isn't sent after the end of
+                    # query.
+                    if watchdog:
+                        fired = watchdog.stop()
                     break
 
                 if packet is True:
                     continue
 
+                self.track_packet(packet, callbacks)
                 yield packet
 
+            except errors.ServerException:
+                # Server finishes query after exception, connection is
+                # still usable.
+                if watchdog and watchdog.stop():
+                    raise self.timeout_error(watchdog)
+                raise
+
             except Exception:
+                if watchdog:
+                    watchdog.stop()
                 self.disconnect()
                 raise
 
+        self.last_query.store_elapsed()
+
+        # Cancel was sent before the end of stream: result may be
+        # incomplete, but stream is read to the end.
+        if fired:
+            raise self.timeout_error(watchdog)
+
+    def track_packet(self, packet, callbacks):
+        if packet.progress:
+            self.last_query.store_progress(packet.progress)
+            value = packet.progress
+
+        elif packet.profile_info:
+            self.last_query.store_profile(packet.profile_info)
+            value = packet.profile_info
+
+        elif packet.type == ServerPacketTypes.TOTALS:
+            self.last_query.store_totals(packet.block)
+            value = packet.block
+
+        elif packet.type == ServerPacketTypes.EXTREMES:
+            self.last_query.store_extremes(packet.block)
+            value = packet.block
+
+        elif packet.block and packet.block.rows:
+            value = packet.block
+
+        else:
+            # Header block.
+            return
+
+        callback = callbacks.get(packet.type) if callbacks else None
+        if callback:
+            callback(value)
+
+    def make_callbacks(self, on_progress=None, on_profile_info=None,
+                       on_block=None, on_totals=None):
+        callbacks = {
+            ServerPacketTypes.PROGRESS: on_progress,
+            ServerPacketTypes.PROFILE_INFO: on_profile_info,
+            ServerPacketTypes.DATA: on_block,
+            ServerPacketTypes.TOTALS: on_totals
+        }
+        return dict((k, v) for k, v in callbacks.items() if v is not None)
+
+    def timeout_error(self, watchdog):
+        return errors.TimeoutExceededError(
+            'Query timeout {} exceeded, query was cancelled ({})'.format(
+                watchdog.timeout, self.connection.get_description()
+            )
+        )
+
+    def start_watchdog(self, timeout):
+        if timeout is None:
+            return None
+
+        return QueryWatchdog(self.connection, timeout)
+
+    def cancel_and_drain(self):
+        """
+        Cancels current query and skips the rest of its packets, so
+        connection can be used for next query.
+        """
+        connection = self.connection
+
+        try:
+            connection.send_cancel()
+
+            with connection.timeout_setter(connection.sync_request_timeout):
+                while True:
+                    packet = connection.receive_packet()
+                    if packet.type in (ServerPacketTypes.END_OF_STREAM,
+                                       ServerPacketTypes.EXCEPTION):
+                        break
+
+        except (socket.error, EOFError, errors.Error) as e:
+            logger.warning('Error on query cancel: %s', e)
+            self.disconnect()
+
     def receive_packet(self):
         packet = self.connection.receive_packet()
 
@@ -73,6 +277,9 @@ class Client(object):
         elif packet.type == ServerPacketTypes.PROGRESS:
             return packet
 
+        elif packet.type == ServerPacketTypes.PROFILE_INFO:
+            return packet
+
         elif packet.type == ServerPacketTypes.END_OF_STREAM:
             return False
 
@@ -95,7 +302,25 @@ class Client(object):
 
     def execute(self, query, params=None, with_column_types=False,
                 external_tables=None, query_id=None, settings=None,
-                types_check=False, columnar=False):
+                types_check=False, columnar=False, timeout=None,
+                on_progress=None, on_profile_info=None, on_block=None,
+                on_totals=None, use_cache=False):
+
+        callbacks = self.make_callbacks(
+            on_progress=on_progress, on_profile_info=on_profile_info,
+            on_block=on_block, on_totals=on_totals
+        )
+
+        # External tables data is not a part of cache key. Cached result
+        # can't call callbacks.
+        if use_cache and self.result_cache is not None and \
+                not external_tables and not callbacks and \
+                idempotent_query_re.match(query):
+            return self.execute_cached(
+                query, params=params, with_column_types=with_column_types,
+                query_id=query_id, settings=settings, columnar=columnar,
+                timeout=timeout
+            )
 
         self.connection.context.settings = self.make_query_settings(settings)
 
@@ -109,16 +334,20 @@ class Client(object):
             if is_insert:
                 return self.process_insert_query(
                     query, params, external_tables=external_tables,
-                    query_id=query_id, types_check=types_check
+                    query_id=query_id, types_check=types_check,
+                    columnar=columnar
                 )
             else:
                 return self.process_ordinary_query(
                     query, params=params, with_column_types=with_column_types,
                     external_tables=external_tables,
                     query_id=query_id, types_check=types_check,
-                    columnar=columnar
+                    columnar=columnar, timeout=timeout, callbacks=callbacks
                 )
 
+        except reusable_connection_errors:
+            raise
+
         except Exception:
             self.disconnect()
             raise
@@ -126,7 +355,7 @@ class Client(object):
     def execute_with_progress(
             self, query, params=None, with_column_types=False,
             external_tables=None, query_id=None, settings=None,
-            types_check=False):
+            types_check=False, timeout=None):
 
         self.connection.context.settings = self.make_query_settings(settings)
 
@@ -136,9 +365,12 @@ class Client(object):
             return self.process_ordinary_query_with_progress(
                 query, params=params, with_column_types=with_column_types,
                 external_tables=external_tables,
-                query_id=query_id, types_check=types_check
+                query_id=query_id, types_check=types_check, timeout=timeout
             )
 
+        except reusable_connection_errors:
+            raise
+
         except Exception:
             self.disconnect()
             raise
@@ -146,7 +378,8 @@ class Client(object):
     def execute_iter(
             self, query, params=None, with_column_types=False,
             external_tables=None, query_id=None, settings=None,
-            types_check=False):
+            types_check=False, timeout=None, on_progress=None,
+            on_profile_info=None, on_block=None, on_totals=None):
 
         self.connection.context.settings = self.make_query_settings(settings)
 
@@ -156,68 +389,425 @@ class Client(object):
             return self.iter_process_ordinary_query(
                 query, params=params, with_column_types=with_column_types,
                 external_tables=external_tables,
-                query_id=query_id, types_check=types_check
+                query_id=query_id, types_check=types_check, timeout=timeout,
+                callbacks=self.make_callbacks(
+                    on_progress=on_progress, on_profile_info=on_profile_info,
+                    on_block=on_block, on_totals=on_totals
+                )
             )
 
+        except reusable_connection_errors:
+            raise
+
         except Exception:
             self.connection.disconnect()
             raise
 
+    def execute_cached(self, query, params=None, with_column_types=False,
+                       query_id=None, settings=None, columnar=False,
+                       timeout=None):
+        """
+        Takes result from :attr:`result_cache` or executes query and puts
+        its columns there.
+        """
+        if params is not None:
+            query = self.substitute_params(query, params)
+
+        connection = self.connection
+        cache = self.result_cache
+        key = cache.make_key(
+            query, self.make_query_settings(settings),
+            connection.context.client_settings, connection.hosts,
+            connection.database, connection.user
+        )
+
+        entry = cache.get(key)
+        if entry is None:
+            columns, columns_with_types = self.execute(
+                query, with_column_types=True, query_id=query_id,
+                settings=settings, columnar=True, timeout=timeout
+            )
+            entry = columns, columns_with_types, self.last_query
+            cache.put(key, entry, estimate_columns_size(columns))
+
+        # Info of the last query is the one of query that made the entry.
+        columns, columns_with_types, self.last_query = entry
+
+        if columnar:
+            # numpy arrays are mutable: cached ones are not returned.
+            data = [
+                x.copy() if not isinstance(x, tuple) else x for x in columns
+            ]
+        else:
+            data = list(zip(*columns))
+
+        if with_column_types:
+            return data, columns_with_types
+        else:
+            return data
+
     def process_ordinary_query_with_progress(
             self, query, params=None, with_column_types=False,
             external_tables=None, query_id=None,
-            types_check=False, columnar=False):
+            types_check=False, columnar=False, timeout=None):
 
         if params is not None:
             query = self.substitute_params(query, params)
 
-        self.connection.send_query(query, query_id=query_id)
-        self.connection.send_external_tables(external_tables,
-                                             types_check=types_check)
+        self.send_query(query, query_id=query_id,
+                        external_tables=external_tables,
+                        types_check=types_check)
         return self.receive_result(with_column_types=with_column_types,
-                                   progress=True, columnar=columnar)
+                                   progress=True, columnar=columnar,
+                                   watchdog=self.start_watchdog(timeout))
 
     def process_ordinary_query(
             self, query, params=None, with_column_types=False,
             external_tables=None, query_id=None,
-            types_check=False, columnar=False):
+            types_check=False, columnar=False, timeout=None, callbacks=None):
 
         if params is not None:
             query = self.substitute_params(query, params)
 
-        self.connection.send_query(query, query_id=query_id)
-        self.connection.send_external_tables(external_tables,
-                                             types_check=types_check)
+        self.send_query(query, query_id=query_id,
+                        external_tables=external_tables,
+                        types_check=types_check)
         return self.receive_result(with_column_types=with_column_types,
-                                   columnar=columnar)
+                                   columnar=columnar,
+                                   watchdog=self.start_watchdog(timeout),
+                                   callbacks=callbacks)
 
     def iter_process_ordinary_query(
             self, query, params=None, with_column_types=False,
             external_tables=None, query_id=None,
-            types_check=False, columnar=False):
+            types_check=False, columnar=False, timeout=None, callbacks=None):
 
         if params is not None:
             query = self.substitute_params(query, params)
 
-        self.connection.send_query(query, query_id=query_id)
-        self.connection.send_external_tables(external_tables,
-                                             types_check=types_check)
-        return self.iter_receive_result(with_column_types=with_column_types)
+        self.send_query(query, query_id=query_id,
+                        external_tables=external_tables,
+                        types_check=types_check)
+        rows = self.iter_receive_result(with_column_types=with_column_types,
+                                        watchdog=self.start_watchdog(timeout),
+                                        callbacks=callbacks)
+        next(rows)
+        return rows
+
+    def send_query(self, query, query_id=None, external_tables=None,
+                   types_check=False):
+        self.last_query = QueryInfo()
+
+        try:
+            self.connection.send_query(query, query_id=query_id)
+            self.connection.send_external_tables(external_tables,
+                                                 types_check=types_check)
+
+        except socket.error as e:
+            # Connection could be closed by server after liveness check.
+            # Nothing is executed yet, read only query can be sent again.
+            if not idempotent_query_re.match(query):
+                raise
+
+            logger.warning('Error on query send: %s. Retrying on new '
+                           'connection.', e)
+            self.connection.connect()
+            self.connection.send_query(query, query_id=query_id)
+            self.connection.send_external_tables(external_tables,
+                                                 types_check=types_check)
+
+    def insert_columns(self, table, columns, external_tables=None,
+                       query_id=None, settings=None, types_check=False):
+        """
+        Inserts data that is already column-oriented. Columns are passed as
+        dict: column name -> sequence of values (list, tuple, array).
+        """
+        names = ', '.join(escape_identifier(name) for name in columns)
+        query = 'INSERT INTO {} ({}) VALUES'.format(table, names)
+
+        return self.execute(
+            query, list(columns.values()), external_tables=external_tables,
+            query_id=query_id, settings=settings, types_check=types_check,
+            columnar=True
+        )
+
+    def query_dataframe(self, query, params=None, external_tables=None,
+                        query_id=None, settings=None):
+        """
+        Returns result as pandas DataFrame. Columns are built from columnar
+        blocks: numeric, Date and DateTime columns are read into typed numpy
+        arrays, Enum columns become categoricals.
+        """
+        context = self.connection.context
+        client_settings = context.client_settings
+        context.client_settings = dict(
+            client_settings, use_numpy=True, enum_output='value',
+            array_output='tuple'
+        )
+
+        try:
+            columns, columns_with_types = self.execute(
+                query, params=params, with_column_types=True,
+                external_tables=external_tables, query_id=query_id,
+                settings=settings, columnar=True
+            )
+
+        finally:
+            context.client_settings = client_settings
+
+        return columns_to_dataframe(columns, columns_with_types, context)
+
+    def insert_dataframe(self, table, dataframe, external_tables=None,
+                         query_id=None, settings=None, types_check=False):
+        """
+        Inserts pandas DataFrame. Columns are written from their numpy
+        arrays, rows are never built.
+        """
+        return self.insert_columns(
+            table, dataframe_to_columns(dataframe),
+            external_tables=external_tables, query_id=query_id,
+            settings=settings, types_check=types_check
+        )
+
+    def query_arrow_iter(self, query, params=None, external_tables=None,
+                         query_id=None, settings=None):
+        """
+        Returns generator of ``pyarrow.RecordBatch`` for each block of
+        result. Closing generator before the end of result cancels query.
+        """
+        return self.process_arrow_query(
+            query, params=params, external_tables=external_tables,
+            query_id=query_id, settings=settings
+        )
+
+    def query_arrow(self, query, params=None, external_tables=None,
+                    query_id=None, settings=None):
+        """
+        Returns result as ``pyarrow.Table``.
+        """
+        pa = import_pyarrow()
+
+        batches = list(self.process_arrow_query(
+            query, params=params, external_tables=external_tables,
+            query_id=query_id, settings=settings, with_header=True
+        ))
+        if not batches:
+            return pa.table({})
+
+        # Header block has schema even for empty result.
+        schema = batches[0].schema
+        return pa.Table.from_batches(
+            [x for x in batches if x.num_rows], schema=schema
+        )
+
+    def process_arrow_query(self, query, params=None, external_tables=None,
+                            query_id=None, settings=None, with_header=False):
+        self.connection.context.settings = self.make_query_settings(settings)
+
+        self.connection.force_connect()
+
+        try:
+            if params is not None:
+                query = self.substitute_params(query, params)
+
+            self.send_query(query, query_id=query_id,
+                            external_tables=external_tables)
+            batches = self.iter_receive_batches(with_header=with_header)
+            next(batches)
+            return batches
+
+        except reusable_connection_errors:
+            raise
+
+        except Exception:
+            self.connection.disconnect()
+            raise
+
+    def iter_receive_batches(self, with_header=False):
+        context = self.connection.context
+        client_settings = context.client_settings
+        arrow_settings = dict(client_settings, arrow_output=True)
+
+        packets = self.iter_receive_packets()
+
+        try:
+            # Generator is started by caller to get into this block.
+            yield
+
+            while True:
+                # Blocks are read into Arrow arrays only by this generator.
+                # Settings are restored between iterations.
+                context.client_settings = arrow_settings
+                try:
+                    packet = next(packets, None)
+                finally:
+                    context.client_settings = client_settings
+
+                if packet is None:
+                    break
+
+                block = packet.block
+                if packet.type != ServerPacketTypes.DATA or \
+                        not (block.rows or with_header):
+                    continue
+
+                yield block_to_record_batch(block, context)
+
+        finally:
+            packets.close()
+
+    def insert_arrow(self, table, arrow_table, external_tables=None,
+                     query_id=None, settings=None, types_check=False):
+        """
+        Inserts ``pyarrow.Table``. Columns are written from numpy arrays
+        taken from Arrow buffers, rows are never built.
+        """
+        return self.insert_columns(
+            table, arrow_to_columns(arrow_table),
+            external_tables=external_tables, query_id=query_id,
+            settings=settings, types_check=types_check
+        )
+
+    def query_to_native_file(self, query, file, params=None,
+                             external_tables=None, query_id=None,
+                             settings=None, compression=False):
+        """
+        Writes result to file in Native format block by block. Result is
+        never kept in memory. File can be read back by
+        :class:`~clickhouse_driver.nativefile.NativeFileReader`.
+        Returns number of written rows.
+
+        :param file: path or binary file object.
+        :param compression: ``True`` for LZ4 or compression method name:
+                            ``lz4``, ``lz4hc``, ``zstd``.
+        """
+        context = self.connection.context
+        context.settings = self.make_query_settings(settings)
+
+        self.connection.force_connect()
+
+        # Values must be written back exactly as they were read.
+        client_settings = context.client_settings
+        context.client_settings = {}
+
+        try:
+            if params is not None:
+                query = self.substitute_params(query, params)
+
+            self.send_query(query, query_id=query_id,
+                            external_tables=external_tables)
+
+            writer = NativeFileWriter(
+                file, compression=compression,
+                timezone=self.connection.server_info.timezone,
+                settings=context.settings
+            )
+            with writer:
+                packets = self.iter_receive_packets()
+                try:
+                    for packet in packets:
+                        if packet.type == ServerPacketTypes.DATA:
+                            writer.write(packet.block)
+
+                finally:
+                    packets.close()
+
+            return writer.rows
+
+        except reusable_connection_errors:
+            raise
+
+        except Exception:
+            self.connection.disconnect()
+            raise
+
+        finally:
+            context.client_settings = client_settings
+
+    def insert_file(self, table, path, format='CSV', column_names=None,
+                    query_id=None, settings=None, types_check=False,
+                    chunk_size=DEFAULT_CHUNK_SIZE, workers=0):
+        """
+        Inserts local file in CSV, TSV or JSONEachRow format. File is
+        memory-mapped and parsed by chunks of about *chunk_size* bytes into
+        columns of table types. Only chunks being parsed and sent are kept
+        in memory.
+
+        :param format: ``CSV``, ``CSVWithNames``, ``TSV``
+                       (``TabSeparated``), ``TSVWithNames``
+                       (``TabSeparatedWithNames``) or ``JSONEachRow``.
+        :param column_names: inserted columns. Taken from header for
+                             formats with names. All table columns are
+                             inserted by default.
+        :param workers: number of processes parsing chunks in parallel.
+        """
+        with TextFileReader(path, format, chunk_size=chunk_size,
+                            workers=workers) as reader:
+            column_names = column_names or reader.names
+
+            query = 'INSERT INTO {}'.format(table)
+            if column_names:
+                names = ', '.join(escape_identifier(x) for x in column_names)
+                query += ' ({})'.format(names)
+            query += ' VALUES'
+
+            context = self.connection.context
+            context.settings = self.make_query_settings(settings)
+            block_size = context.client_settings['insert_block_size']
+
+            def make_blocks(sample_block):
+                columns_with_types = sample_block.columns_with_types
+                start_row = 0
+                for columns in reader.iter_columns(columns_with_types):
+                    for chunk in column_chunks(columns, block_size):
+                        block = Block(columns_with_types, chunk,
+                                      types_check=types_check, columnar=True,
+                                      start_row=start_row)
+                        start_row += block.rows
+                        yield block
+
+            self.connection.force_connect()
+
+            try:
+                return self.process_insert_query(
+                    query, None, query_id=query_id, types_check=types_check,
+                    make_blocks=make_blocks
+                )
+
+            except reusable_connection_errors:
+                raise
+
+            except Exception:
+                self.disconnect()
+                raise
 
     def process_insert_query(self, query_without_data, data,
                              external_tables=None, query_id=None,
-                             types_check=False):
+                             types_check=False, columnar=False,
+                             make_blocks=None):
+        self.last_query = QueryInfo()
         self.connection.send_query(query_without_data, query_id=query_id)
         self.connection.send_external_tables(external_tables,
                                              types_check=types_check)
 
         sample_block = self.receive_sample_block()
         if sample_block:
-            self.send_data(sample_block, data, types_check=types_check)
+            # Blocks can be built from data that depends on table
+            # structure: file is parsed into sample block types.
+            if make_blocks is not None:
+                self.send_blocks(make_blocks(sample_block))
+            else:
+                self.send_data(sample_block, data, types_check=types_check,
+                               columnar=columnar)
             packet = self.connection.receive_packet()
             if packet.exception:
+                # Server could stop reading data on error, the rest of
+                # data can stay in socket.
+                self.disconnect()
                 raise packet.exception
 
+        self.last_query.store_elapsed()
+
     def receive_sample_block(self):
         packet = self.connection.receive_packet()
 
@@ -232,16 +822,54 @@ class Client(object):
                                                                 packet.type)
             raise errors.UnexpectedPacketFromServerError(message)
 
-    def send_data(self, sample_block, data, types_check=False):
+    def send_data(self, sample_block, data, types_check=False,
+                  columnar=False):
+        client_settings = self.connection.context.client_settings
+        block_size = client_settings['insert_block_size']
+
+        if columnar:
+            data_chunks = column_chunks(data, block_size)
+        else:
+            data_chunks = chunks(data, block_size)
+
+        blocks = (
+            Block(sample_block.columns_with_types, chunk,
+                  types_check=types_check, columnar=columnar,
+                  start_row=i * block_size)
+            for i, chunk in enumerate(data_chunks)
+        )
+
+        self.send_blocks(blocks)
+
+    def send_blocks(self, blocks):
         client_settings = self.connection.context.client_settings
-        for chunk in chunks(data, client_settings['insert_block_size']):
-            block = Block(sample_block.columns_with_types, chunk,
-                          types_check=types_check)
-            self.connection.send_data(block)
+
+        pipeline_depth = client_settings['insert_pipeline_depth']
+        if pipeline_depth:
+            self.send_blocks_pipelined(blocks, pipeline_depth)
+
+        else:
+            for block in blocks:
+                self.connection.send_data(block)
 
         # Empty block means end of data.
         self.connection.send_data(Block())
 
+    def send_blocks_pipelined(self, blocks, pipeline_depth):
+        # Next blocks are built, encoded and compressed in background
+        # thread while current one is written to socket.
+        encode_data = self.connection.encode_data
+        encoded = PrefetchIterator(
+            (encode_data(block) for block in blocks), pipeline_depth
+        )
+
+        try:
+            for data in encoded:
+                self.connection.send_encoded_data(data)
+
+        finally:
+            encoded.close()
+
     def cancel(self, with_column_types=False):
         # TODO: Add warning if already cancelled.
         self.connection.send_cancel()
@@ -1,15 +1,12 @@
-
-from struct import Struct
+from bisect import bisect_right
+from itertools import chain
 
 from ..util import compat
+from ..util.helpers import import_numpy
 from .base import Column
+from .exceptions import ColumnTypeMismatchException
 from .intcolumn import UInt64Column
 
-if compat.PY3:
-    from queue import Queue
-else:
-    from Queue import Queue
-
 
 class ArrayColumn(Column):
     """
@@ -22,167 +19,164 @@ class ArrayColumn(Column):
                    |    |           |    |
     (leaf)        3     4          5     6
 
-    Offsets (sizes) written in breadth-first search order. In example above
-    following sequence of offset will be written: 4 -> 2 -> 4
-    1) size of whole array: 4
-    2) size of array 1 in depth=1: 2
-    3) size of array 2 plus size of all array before in depth=1: 2 + 2 = 4
+    Offsets (sizes) written level by level. Each level is a sequence of
+    cumulative sizes of its arrays. Column with one row from example above
+    is written as following sequence of offsets: 2 -> 2 -> 4
+    1) offsets of depth 0: size of whole array: 2
+    2) offsets of depth 1: size of array 1: 2, size of array 1 plus size
+       of array 2: 2 + 2 = 4
 
     After sizes info comes flatten data: 3 -> 4 -> 5 -> 6
+
+    All offsets of one level are read/written at once. Data of the next
+    level is flattened (on write) or sliced (on read) by these offsets.
+
+    With *numpy_output* arrays of one level are read as :class:`NumpyArrays`
+    without building rows.
     """
     py_types = (list, tuple)
-    size_struct = Struct('<Q')
 
-    def __init__(self, nested_column, **kwargs):
-        self.size_column = UInt64Column()
+    def __init__(self, nested_column, numpy_output=False, **kwargs):
+        self.numpy_output = numpy_output
+        self.size_column = UInt64Column(use_numpy=numpy_output)
         self.nested_column = nested_column
-        self._write_depth_0_size = True
         super(ArrayColumn, self).__init__(**kwargs)
 
-    def size_pack(self, value):
-        return self.size_struct.pack(value)
+    def write_data(self, items, buf):
+        levels = []
+        column = self
 
-    def size_unpack(self, buf):
-        return self.size_struct.unpack(buf.read(self.size_struct.size))[0]
+        while isinstance(column, ArrayColumn):
+            if column.nullable:
+                column._write_nulls_map(items, buf)
+                items = [() if x is None else x for x in items]
 
-    def write_data(self, data, buf):
-        # Column of Array(T) is stored in "compact" format and passed to server
-        # wrapped into another Array without size of wrapper array.
-        self.nested_column = ArrayColumn(self.nested_column)
-        self.nested_column.nullable = self.nullable
-        self.nullable = False
-        self._write_depth_0_size = False
-        self._write(data, buf)
+            offsets = list(compat.accumulate(len(x) for x in items))
+            self.size_column.write_items(offsets, buf)
+            levels.append(offsets)
 
-    def read_data(self, rows, buf):
-        self.nested_column = ArrayColumn(self.nested_column)
-        self.nested_column.nullable = self.nullable
-        self.nullable = False
-        return self._read(rows, buf)
+            items = list(chain.from_iterable(items))
+            column = column.nested_column
 
-    def _write_sizes(self, value, buf):
-        q = Queue()
-        q.put((self, value, 0))
+        try:
+            column.write_data(items, buf)
 
-        cur_depth = 0
-        offset = 0
-        nulls_map = []
+        except ColumnTypeMismatchException as e:
+            value, i = e.args
+            # Index of flatten item is mapped back to row of outer array.
+            for offsets in reversed(levels):
+                i = bisect_right(offsets, i)
 
-        while not q.empty():
-            column, value, depth = q.get_nowait()
+            raise ColumnTypeMismatchException(value, i)
 
-            if cur_depth != depth:
-                cur_depth = depth
-                offset = 0
-                if column.nullable:
-                    self._write_nulls_map(nulls_map, buf)
+    def read_data(self, n_items, buf):
+        if self.numpy_output:
+            return self.read_numpy_data(n_items, buf)
 
-                nulls_map = []
+        levels = []
+        column = self
 
+        while isinstance(column, ArrayColumn):
             if column.nullable:
-                value = value or []
-
-            offset += len(value)
-            if (cur_depth == 0 and self._write_depth_0_size) or cur_depth > 0:
-                buf.write(self.size_pack(offset))
-
-            nested_column = column.nested_column
-            if isinstance(nested_column, ArrayColumn):
-                for x in value:
-                    q.put((nested_column, x, cur_depth + 1))
-                    nulls_map.append(None if x is None else False)
-
-    def _write_data(self, value, buf):
-        if self.nullable:
-            value = value or []
-
-        if isinstance(self.nested_column, ArrayColumn):
-            for x in value:
-                self.nested_column._write_data(x, buf)
-        else:
-            self.nested_column._write_data(value, buf)
-
-    def _write_nulls_data(self, value, buf):
-        if self.nullable:
-            value = value or []
-
-        if isinstance(self.nested_column, ArrayColumn):
-            for x in value:
-                self.nested_column._write_nulls_data(x, buf)
-        else:
-            if self.nested_column.nullable:
-                self.nested_column._write_nulls_map(value, buf)
-
-    def _write(self, value, buf):
-        self._write_sizes(value, buf)
-        self._write_nulls_data(value, buf)
-        self._write_data(value, buf)
-
-    def _read(self, size, buf):
-        q = Queue()
-        q.put((self, size, 0))
-
-        data = []
-        slices_series = []
-
-        cur_depth = 0
-        prev_offset = 0
-        slices = []
-
-        if self.nested_column.nullable:
-            nulls_map = self._read_nulls_map(size, buf)
-        else:
-            nulls_map = [0] * size
-
-        # Read and store info about slices.
-        while not q.empty():
-            column, size, depth = q.get_nowait()
-
-            nested_column = column.nested_column
-
-            if cur_depth != depth:
-                cur_depth = depth
-
-                slices_series.append((slices, nulls_map))
-
-                if nested_column.nullable:
-                    nulls_map = self._read_nulls_map(prev_offset, buf)
-                else:
-                    nulls_map = [0] * prev_offset
-
-                prev_offset = 0
-                slices = []
-
-            if isinstance(nested_column, ArrayColumn):
-                for _i in range(size):
-                    offset = self.size_unpack(buf)
-                    q.put((nested_column, offset - prev_offset, cur_depth + 1))
-                    slices.append((prev_offset, offset))
-                    prev_offset = offset
-
-            # Read data
+                nulls_map = column._read_nulls_map(n_items, buf)
             else:
-                data.extend(
-                    nested_column._read_data(
-                        size, buf,
-                        nulls_map=nulls_map[prev_offset:prev_offset + size]
-                    )
-                )
-                prev_offset += size
-
-        # Build nested tuple structure.
-        for slices, nulls_map in reversed(slices_series):
-            nested_data = []
-            for (slice_from, slice_to), is_null in zip(slices, nulls_map):
-                nested_data.append(
-                    None if is_null else tuple(data[slice_from:slice_to])
+                nulls_map = None
+
+            offsets = self.size_column.read_items(n_items, buf)
+            levels.append((offsets, nulls_map))
+
+            n_items = offsets[-1] if offsets else 0
+            column = column.nested_column
+
+        data = column.read_data(n_items, buf)
+
+        # Build nested structure from the deepest level.
+        for offsets, nulls_map in reversed(levels):
+            starts = chain((0, ), offsets)
+            data = tuple(data[x:y] for x, y in zip(starts, offsets))
+
+            if nulls_map is not None and 1 in nulls_map:
+                data = tuple(
+                    None if is_null else x
+                    for x, is_null in zip(data, nulls_map)
                 )
 
-            data = nested_data
+        return data
+
+    def read_numpy_data(self, n_items, buf):
+        offsets = self.size_column.read_items(n_items, buf)
+
+        n_values = int(offsets[-1]) if len(offsets) else 0
+        values = self.nested_column.read_data(n_values, buf)
+
+        if getattr(values, 'dtype', None) is None:
+            # Strings and other items without numpy representation.
+            np = import_numpy()
+            items = np.empty(n_values, dtype=object)
+            items[:] = values
+            values = items
+
+        return NumpyArrays(offsets, values)
+
+
+class NumpyArrays(object):
+    """
+    Array column read with numpy output. *values* is flat numpy array of
+    items of all rows, *offsets* are cumulative sizes of rows: row ``i`` is
+    ``values[offsets[i - 1]:offsets[i]]``. Rows are returned as views into
+    *values*.
+    """
+
+    def __init__(self, offsets, values):
+        self.offsets = offsets
+        self.values = values
+
+        super(NumpyArrays, self).__init__()
+
+    @classmethod
+    def concatenate(cls, parts):
+        np = import_numpy()
+
+        offsets = []
+        shift = 0
+        for part in parts:
+            offsets.append(part.offsets + shift)
+            if len(part.offsets):
+                shift += part.offsets[-1]
+
+        concatenate = np.concatenate
+        if any(np.ma.isMaskedArray(x.values) for x in parts):
+            concatenate = np.ma.concatenate
+
+        return cls(
+            np.concatenate(offsets), concatenate([x.values for x in parts])
+        )
+
+    @property
+    def nbytes(self):
+        return self.offsets.nbytes + self.values.nbytes
+
+    def copy(self):
+        return NumpyArrays(self.offsets.copy(), self.values.copy())
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self.offsets)
+
+        start = self.offsets[i - 1] if i else 0
+        return self.values[start:self.offsets[i]]
+
+    def __iter__(self):
+        values = self.values
+        offsets = self.offsets.tolist()
 
-        return tuple(data)
+        for start, end in zip(chain((0, ), offsets), offsets):
+            yield values[start:end]
 
 
-def create_array_column(spec, column_by_spec_getter):
+def create_array_column(spec, column_by_spec_getter, numpy_output=False):
     inner = spec[6:-1]
-    return ArrayColumn(column_by_spec_getter(inner))
+    return ArrayColumn(column_by_spec_getter(inner), numpy_output=numpy_output)
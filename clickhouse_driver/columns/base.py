@@ -1,79 +1,113 @@
 from struct import Struct, error as struct_error
 
+from ..util.helpers import import_numpy
 from . import exceptions
 
 
+NoneType = type(None)
+
+
 class Column(object):
     ch_type = None
     py_types = None
 
-    check_item = None
     after_read_item = None
     before_write_item = None
 
+    # Bulk counterparts of after_read_item/before_write_item. Take whole
+    # sequence of items and are used instead of per item hooks if defined.
+    after_read_items = None
+    before_write_items = None
+
+    # Kinds of numpy arrays that are passed types check without checking
+    # each item.
+    numpy_kinds = ''
+
     types_check_enabled = False
 
-    def __init__(self, types_check=False, **kwargs):
+    def __init__(self, types_check=False, use_numpy=False, **kwargs):
         self.nullable = False
         self.types_check_enabled = types_check
+        self.use_numpy = use_numpy
         super(Column, self).__init__()
 
-    def make_null_struct(self, n_items):
-        return Struct('<{}B'.format(n_items))
-
     def _read_nulls_map(self, n_items, buf):
-        s = self.make_null_struct(n_items)
-        return s.unpack(buf.read(s.size))
+        # Null map is one byte per item: 1 for NULL, 0 otherwise.
+        return bytearray(buf.read(n_items))
 
     def _write_nulls_map(self, items, buf):
-        s = self.make_null_struct(len(items))
-        items = [x is None for x in items]
-        buf.write(s.pack(*items))
-
-    def prepare_null(self, value):
-        if self.nullable and value is None:
-            return 0, True
+        if getattr(items, 'mask', None) is not None:
+            # numpy masked array.
+            np = import_numpy()
+            nulls_map = np.ma.getmaskarray(items).astype(np.uint8).tobytes()
 
+        elif None in items:
+            nulls_map = bytearray([x is None for x in items])
         else:
-            return value, False
+            nulls_map = bytearray(len(items))
 
-    def check_item_type(self, value):
-        if not isinstance(value, self.py_types):
-            raise exceptions.ColumnTypeMismatchException(value)
+        buf.write(nulls_map)
 
-    def prepare_items(self, items):
-        before_write = self.before_write_item
-        prepare_null = self.prepare_null if self.nullable else False
+    def check_items(self, items):
+        """
+        Checks types of whole column. Each distinct type of items is checked
+        only once. Raises exception with first offending item and its row.
+        """
+        if getattr(items, 'dtype', None) is not None:
+            # numpy array.
+            if items.dtype.kind in self.numpy_kinds:
+                return
+
+        py_types = self.py_types
+        nullable = self.nullable
+
+        mismatched = set(
+            x for x in set(map(type, items))
+            if not issubclass(x, py_types) and not (nullable and x is NoneType)
+        )
 
-        check_item = self.check_item
+        if mismatched:
+            for i, x in enumerate(items):
+                if type(x) in mismatched:
+                    raise exceptions.ColumnTypeMismatchException(x, i)
+
+    def prepare_items(self, items):
         if self.types_check_enabled:
-            check_item_type = self.check_item_type
-        else:
-            check_item_type = False
+            self.check_items(items)
 
-        prepared = [None] * len(items)
-        for i, x in enumerate(items):
-            if prepare_null:
-                x, is_null = prepare_null(x)
-            else:
-                is_null = False
+        before_write_items = self.before_write_items
+        if before_write_items:
+            # Bulk hook gets NULLs as is and replaces them by itself.
+            return before_write_items(items)
 
-            if not is_null:
-                if check_item_type:
-                    check_item_type(x)
+        before_write = self.before_write_item
+        has_nulls = self.nullable and None in items
 
-                if check_item:
-                    check_item(x)
+        # NULLs are replaced by zeros.
+        if before_write:
+            if has_nulls:
+                return [0 if x is None else before_write(x) for x in items]
 
-                if before_write:
-                    x = before_write(x)
+            return [before_write(x) for x in items]
 
-            prepared[i] = x
+        if has_nulls:
+            return [0 if x is None else x for x in items]
 
-        return prepared
+        return items
 
     def write_data(self, items, buf):
         if self.nullable:
+            kind = getattr(getattr(items, 'dtype', None), 'kind', None)
+            if kind == 'f':
+                # NaNs are missing values in numpy float arrays.
+                np = import_numpy()
+                items = np.ma.masked_invalid(items)
+
+            elif kind == 'M':
+                # So are NaTs in datetime64 arrays.
+                np = import_numpy()
+                items = np.ma.masked_where(np.isnat(items), items)
+
             self._write_nulls_map(items, buf)
 
         self._write_data(items, buf)
@@ -94,20 +128,38 @@ class Column(object):
         return self._read_data(n_items, buf, nulls_map=nulls_map)
 
     def _read_data(self, n_items, buf, nulls_map=None):
-        after_read = self.after_read_item
-
         items = self.read_items(n_items, buf)
 
+        if nulls_map is not None and 1 not in nulls_map:
+            nulls_map = None
+
+        if self.after_read_items:
+            items = self.after_read_items(items)
+
+            if nulls_map is not None:
+                items = self._apply_nulls_map(items, nulls_map)
+
+            return items
+
+        if getattr(items, 'dtype', None) is not None:
+            # numpy array.
+            if nulls_map is not None:
+                items = self._apply_nulls_map(items, nulls_map)
+
+            return items
+
+        after_read = self.after_read_item
+
         if nulls_map is not None:
             if after_read:
                 items = tuple(
-                    (None if is_null else after_read(items[i]))
-                    for i, is_null in enumerate(nulls_map)
+                    (None if is_null else after_read(x))
+                    for x, is_null in zip(items, nulls_map)
                 )
             else:
                 items = tuple(
-                    (None if is_null else items[i])
-                    for i, is_null in enumerate(nulls_map)
+                    (None if is_null else x)
+                    for x, is_null in zip(items, nulls_map)
                 )
 
         else:
@@ -116,6 +168,22 @@ class Column(object):
 
         return tuple(items)
 
+    def _apply_nulls_map(self, items, nulls_map):
+        if not isinstance(items, (tuple, list)):
+            # numpy array.
+            np = import_numpy()
+            mask = np.frombuffer(bytes(nulls_map), dtype=np.bool_)
+            return np.ma.masked_array(items, mask=mask)
+
+        items = list(items)
+
+        i = nulls_map.find(b'\x01')
+        while i != -1:
+            items[i] = None
+            i = nulls_map.find(b'\x01', i + 1)
+
+        return tuple(items)
+
     def read_items(self, n_items, buf):
         raise NotImplementedError
 
@@ -131,6 +199,12 @@ class FormatColumn(Column):
         return Struct('<{}{}'.format(n_items, self.format))
 
     def write_items(self, items, buf):
+        if getattr(items, 'dtype', None) is not None and \
+                items.dtype.kind in 'biuf':
+            # Numeric or bool numpy array is written without unpacking.
+            self.write_numpy_items(items, buf)
+            return
+
         s = self.make_struct(len(items))
         try:
             buf.write(s.pack(*items))
@@ -138,8 +212,42 @@ class FormatColumn(Column):
         except struct_error as e:
             raise exceptions.StructPackException(e)
 
+    def write_numpy_items(self, items, buf):
+        if getattr(items, 'mask', None) is not None:
+            # Masked values are NULLs. They are written as zeros.
+            items = items.filled(0)
+
+        dtype = '<' + self.format
+        prepared = items.astype(dtype)
+
+        # Integers must fit into column type, floats are just rounded.
+        if self.format not in 'fd' and (prepared != items).any():
+            if items.dtype.kind == 'f':
+                np = import_numpy()
+                if (items != np.trunc(items)).any():
+                    raise exceptions.StructPackException(
+                        'numpy array of {} has fractional or NaN values, '
+                        'they can\'t be written to {}'.format(
+                            items.dtype, self.ch_type
+                        )
+                    )
+
+            raise exceptions.StructPackException(
+                'numpy array values are out of range for {}'.format(
+                    self.ch_type
+                )
+            )
+
+        buf.write(prepared.tobytes())
+
     def read_items(self, n_items, buf):
         s = self.make_struct(n_items)
+
+        # Items with per item read hook are still converted one by one.
+        if self.use_numpy and not self.after_read_item:
+            np = import_numpy()
+            return np.frombuffer(buf.read(s.size), dtype='<' + self.format)
+
         return s.unpack(buf.read(s.size))
 
 
@@ -163,21 +271,16 @@ class CustomItemColumn(Column):
 
     def _write_data(self, items, buf):
         if self.types_check_enabled:
-            check_item_type = self.check_item_type
-        else:
-            check_item_type = False
+            self.check_items(items)
 
         for x in items:
-            self.write_item(x, buf, check_item_type)
+            self.write_item(x, buf)
 
-    def write_item(self, x, buf, check_item_type):
+    def write_item(self, x, buf):
         if self.nullable and x is None:
             self._write_null(buf)
 
         else:
-            if check_item_type:
-                check_item_type(x)
-
             self.write(x, buf)
 
     def _read_data(self, n_items, buf, nulls_map=None):
@@ -1,5 +1,6 @@
 from datetime import date, timedelta
 
+from ..util.helpers import import_numpy
 from .base import FormatColumn
 
 
@@ -7,11 +8,31 @@ class DateColumn(FormatColumn):
     ch_type = 'Date'
     py_types = (date, )
     format = 'H'
+    numpy_kinds = 'M'
 
     epoch_start = date(1970, 1, 1)
 
-    def before_write_item(self, value):
-        return (value - self.epoch_start).days
+    def before_write_items(self, items):
+        if getattr(items, 'dtype', None) is not None:
+            # numpy datetime64 array.
+            np = import_numpy()
+            if getattr(items, 'mask', None) is not None:
+                # Masked values are NULLs. They are written as zeros.
+                items = items.filled(np.datetime64(0, 'D'))
 
-    def after_read_item(self, value):
-        return self.epoch_start + timedelta(value)
+            return items.astype('datetime64[D]').astype(np.uint16)
+
+        epoch_start = self.epoch_start
+        nullable = self.nullable
+
+        return [
+            0 if nullable and x is None else (x - epoch_start).days
+            for x in items
+        ]
+
+    def after_read_items(self, items):
+        if getattr(items, 'dtype', None) is not None:
+            return items.astype('datetime64[D]')
+
+        epoch_start = self.epoch_start
+        return tuple(epoch_start + timedelta(x) for x in items)
@@ -1,46 +1,263 @@
+from bisect import bisect_right
 from calendar import timegm
-from datetime import datetime
+from datetime import datetime, timedelta
 from time import mktime
 
 from pytz import timezone as get_timezone, utc
 
+from .. import defines
+from ..util import compat
+from ..util.helpers import import_numpy
 from .base import FormatColumn
 
 
+EPOCH = datetime(1970, 1, 1)
+
+INF = float('inf')
+
+
+class TimezoneOffsets(object):
+    """
+    UTC offsets of pytz timezone taken from its transition tables.
+
+    Transition times are converted to timestamps once per timezone, so
+    offset for each timestamp is resolved by binary search. Consecutive
+    timestamps usually fall into the same interval between transitions,
+    which is checked before searching.
+    """
+    _cache = {}
+
+    @classmethod
+    def get(cls, tz):
+        key = tz.zone
+        offsets = cls._cache.get(key)
+        if offsets is None:
+            offsets = cls._cache[key] = cls(tz)
+
+        return offsets
+
+    def __init__(self, tz):
+        transition_times = getattr(tz, '_utc_transition_times', None)
+
+        if transition_times:
+            self.transitions = [-INF] + [
+                timegm(x.timetuple()) for x in transition_times[1:]
+            ]
+            self.offsets = [
+                int(x[0].total_seconds()) for x in tz._transition_info
+            ]
+
+        else:
+            # UTC or timezone with constant offset.
+            self.transitions = [-INF]
+            self.offsets = [int(tz.utcoffset(EPOCH).total_seconds())]
+
+        transitions, offsets = self.transitions, self.offsets
+        n = len(transitions)
+
+        # Local time is unambiguous within interval i if it falls into
+        # [local_starts[i], local_ends[i]). Outside these ranges it's
+        # skipped or repeated by DST switch.
+        self.ends = transitions[1:] + [INF]
+        self.local_starts = [
+            transitions[i] + max(offsets[i - 1] if i else offsets[i],
+                                 offsets[i])
+            for i in range(n)
+        ]
+        self.local_ends = [
+            self.ends[i] + min(offsets[i],
+                               offsets[i + 1] if i + 1 < n else offsets[i])
+            for i in range(n)
+        ]
+
+        super(TimezoneOffsets, self).__init__()
+
+    def to_local(self, timestamps):
+        transitions, ends, offsets = self.transitions, self.ends, self.offsets
+
+        start = end = offset = 0
+        rv = [None] * len(timestamps)
+
+        for i, ts in enumerate(timestamps):
+            if not start <= ts < end:
+                idx = bisect_right(transitions, ts) - 1
+                start, end, offset = transitions[idx], ends[idx], offsets[idx]
+
+            rv[i] = ts + offset
+
+        return rv
+
+    def to_utc(self, local_ts):
+        """
+        Returns timestamp for unambiguous local time and None otherwise.
+        """
+        idx = bisect_right(self.local_starts, local_ts) - 1
+        if idx < 0 or local_ts >= self.local_ends[idx]:
+            return None
+
+        return local_ts - self.offsets[idx]
+
+    def to_local_numpy(self, timestamps):
+        np = import_numpy()
+
+        timestamps = np.asarray(timestamps, dtype=np.int64)
+
+        # First transition is -inf. It's covered by clipping.
+        transitions = np.array(self.transitions[1:], dtype=np.int64)
+        offsets = np.array(self.offsets, dtype=np.int64)
+
+        idx = np.searchsorted(transitions, timestamps, side='right')
+        return timestamps + offsets[idx]
+
+    def to_utc_numpy(self, local_timestamps):
+        """
+        Resolves skipped and repeated local times like pytz with
+        ``is_dst=False``: skipped time gets offset of the earlier interval,
+        repeated time gets offset of the later one.
+        """
+        np = import_numpy()
+
+        local_timestamps = np.asarray(local_timestamps, dtype=np.int64)
+
+        offsets = np.array(self.offsets, dtype=np.int64)
+        # Local time of each transition by offset after it. Repeated local
+        # times are after it, skipped ones are before it.
+        local_starts = np.array(self.transitions[1:], dtype=np.int64) + \
+            offsets[1:]
+
+        idx = np.searchsorted(local_starts, local_timestamps, side='right')
+        return local_timestamps - offsets[idx]
+
+
+def naive_timestamp(value):
+    delta = value - EPOCH
+    return delta.days * 86400 + delta.seconds
+
+
 class DateTimeColumn(FormatColumn):
     ch_type = 'DateTime'
-    py_types = (datetime, int)
+    py_types = (datetime, ) + compat.integer_types
     format = 'I'
+    numpy_kinds = 'Miu'
 
-    def __init__(self, timezone=None, **kwargs):
+    def __init__(self, timezone=None,
+                 output=defines.DEFAULT_DATETIME_OUTPUT, **kwargs):
         self.timezone = timezone
+        self.output = output
+
+        if timezone is not None:
+            self.offsets = TimezoneOffsets.get(timezone)
+        else:
+            self.offsets = None
+
         super(DateTimeColumn, self).__init__(**kwargs)
 
-    def after_read_item(self, value):
-        dt = datetime.fromtimestamp(value, self.timezone)
-        return dt.replace(tzinfo=None)
+    def read_items(self, n_items, buf):
+        if self.output == 'numpy':
+            np = import_numpy()
+            s = self.make_struct(n_items)
+            return np.frombuffer(buf.read(s.size), dtype='<u4')
+
+        return super(DateTimeColumn, self).read_items(n_items, buf)
+
+    def after_read_items(self, items):
+        output = self.output
+
+        if output == 'timestamp':
+            return items
+
+        elif output == 'numpy':
+            if self.offsets is not None:
+                local = self.offsets.to_local_numpy(items)
+                return local.astype('datetime64[s]')
+
+            np = import_numpy()
+            return np.array(
+                [datetime.fromtimestamp(x) for x in items.tolist()],
+                dtype='datetime64[s]'
+            )
+
+        if self.offsets is None:
+            # Local timezone of client.
+            fromtimestamp = datetime.fromtimestamp
+            return tuple(fromtimestamp(x) for x in items)
+
+        epoch = EPOCH
+        return tuple(
+            epoch + timedelta(0, x) for x in self.offsets.to_local(items)
+        )
+
+    def before_write_items(self, items):
+        if getattr(items, 'dtype', None) is not None:
+            return self.numpy_to_timestamps(items)
+
+        nullable = self.nullable
+        integer_types = compat.integer_types
+
+        tz = self.timezone
+        offsets = self.offsets
 
-    def before_write_item(self, value):
-        if isinstance(value, int):
-            # support supplying raw integers to avoid
-            # costly timezone conversions when using datetime
-            return value
+        rv = [None] * len(items)
 
-        if self.timezone:
-            # Set server's timezone for offset-naive datetime.
-            if value.tzinfo is None:
-                value = self.timezone.localize(value)
+        for i, value in enumerate(items):
+            if isinstance(value, integer_types):
+                # support supplying raw integers to avoid
+                # costly timezone conversions when using datetime
+                pass
 
-            value = value.astimezone(utc)
-            return int(timegm(value.timetuple()))
+            elif nullable and value is None:
+                value = 0
+
+            elif value.tzinfo is not None:
+                # If datetime is offset-aware use it's timezone.
+                value = timegm(value.utctimetuple())
+
+            elif offsets is not None:
+                # Set server's timezone for offset-naive datetime.
+                ts = offsets.to_utc(naive_timestamp(value))
+
+                if ts is None:
+                    # Skipped or repeated time. Let pytz resolve it.
+                    value = tz.localize(value).astimezone(utc)
+                    ts = timegm(value.timetuple())
+
+                value = ts
+
+            else:
+                value = int(mktime(value.timetuple()))
+
+            rv[i] = value
+
+        return rv
+
+    def numpy_to_timestamps(self, items):
+        np = import_numpy()
+
+        if items.dtype.kind in 'iu':
+            return items
+
+        mask = None
+        if getattr(items, 'mask', None) is not None:
+            # Masked values are NULLs. They are converted as epoch start
+            # and written as zeros.
+            mask = np.ma.getmaskarray(items)
+            items = items.filled(np.datetime64(0, 's'))
+
+        # Naive datetime64 values are local time in column's timezone.
+        local = items.astype('datetime64[s]').astype(np.int64)
+        if self.offsets is not None:
+            rv = self.offsets.to_utc_numpy(local)
 
         else:
-            # If datetime is offset-aware use it's timezone.
-            if value.tzinfo is not None:
-                value = value.astimezone(utc)
-                return int(timegm(value.timetuple()))
+            rv = np.array(
+                [int(mktime(x.timetuple())) for x in items.astype(datetime)],
+                dtype=np.int64
+            )
 
-            return int(mktime(value.timetuple()))
+        if mask is not None:
+            rv[mask] = 0
+
+        return rv
 
 
 def create_datetime_column(spec, column_options):
@@ -58,4 +275,11 @@ def create_datetime_column(spec, column_options):
     if tz_name:
         timezone = get_timezone(tz_name)
 
-    return DateTimeColumn(timezone=timezone, **column_options)
+    if column_options.get('use_numpy'):
+        output = 'numpy'
+    else:
+        output = context.client_settings.get(
+            'datetime_output', defines.DEFAULT_DATETIME_OUTPUT
+        )
+
+    return DateTimeColumn(timezone=timezone, output=output, **column_options)
@@ -1,6 +1,6 @@
 from enum import Enum
 
-from .. import errors
+from .. import defines, errors
 from ..util import compat
 from .intcolumn import IntColumn
 
@@ -8,34 +8,66 @@ from .intcolumn import IntColumn
 class EnumColumn(IntColumn):
     py_types = (Enum, ) + compat.integer_types + compat.string_types
 
-    def __init__(self, enum_cls, **kwargs):
+    def __init__(self, enum_cls, output=defines.DEFAULT_ENUM_OUTPUT,
+                 **kwargs):
         self.enum_cls = enum_cls
+        self.output = output
+
+        # Plain dicts are much faster than enum lookups.
+        self.value_to_name = {x.value: x.name for x in enum_cls}
+
+        # Both names and values are mapped to values on write.
+        self.write_map = {v: v for v in self.value_to_name}
+        self.write_map.update(
+            (name, x.value) for name, x in enum_cls.__members__.items()
+        )
+
         super(EnumColumn, self).__init__(**kwargs)
 
-    def before_write_item(self, value):
-        source_value = value.name if isinstance(value, Enum) else value
+    def before_write_items(self, items):
+        write_map = self.write_map
+        nullable = self.nullable
+
+        rv = [None] * len(items)
+
+        for i, value in enumerate(items):
+            if isinstance(value, Enum):
+                value = value.name
+
+            elif nullable and value is None:
+                rv[i] = 0
+                continue
+
+            try:
+                rv[i] = write_map[value]
+
+            except (KeyError, TypeError):
+                self.raise_unknown_element(value)
+
+        return rv
+
+    def raise_unknown_element(self, value):
         enum_cls = self.enum_cls
+        choices = ', '.join(
+            "'{}' = {}".format(x.name, x.value) for x in enum_cls
+        )
+        enum_str = '{}({})'.format(enum_cls.__name__, choices)
 
-        # Check real enum value
-        try:
-            if isinstance(source_value, compat.string_types):
-                return enum_cls[source_value].value
-            else:
-                return enum_cls(source_value).value
+        raise errors.LogicalError(
+            "Unknown element '{}' for type {}".format(value, enum_str)
+        )
 
-        except (ValueError, KeyError):
-            choices = ', '.join(
-                "'{}' = {}".format(x.name, x.value) for x in enum_cls
-            )
-            enum_str = '{}({})'.format(enum_cls.__name__, choices)
+    def after_read_items(self, items):
+        if self.output == 'value':
+            return items
 
-            raise errors.LogicalError(
-                "Unknown element '{}' for type {}"
-                .format(source_value, enum_str)
-            )
+        # NULLs are read as zeros that can be out of enum.
+        if self.nullable:
+            get_name = self.value_to_name.get
+        else:
+            get_name = self.value_to_name.__getitem__
 
-    def after_read_item(self, value):
-        return self.enum_cls(value).name
+        return tuple(map(get_name, items))
 
 
 class Enum8Column(EnumColumn):
@@ -65,4 +97,9 @@ def create_enum_column(spec, column_options):
         value = int(param[pos + 1:].lstrip(' ='))
         d[name] = value
 
-    return cls(Enum(cls.ch_type, d), **column_options)
+    context = column_options['context']
+    output = context.client_settings.get(
+        'enum_output', defines.DEFAULT_ENUM_OUTPUT
+    )
+
+    return cls(Enum(cls.ch_type, d), output=output, **column_options)
@@ -5,22 +5,25 @@ from .base import FormatColumn
 
 class FloatColumn(FormatColumn):
     py_types = (float, int)
+    numpy_kinds = 'bfiu'
 
 
 class Float32(FloatColumn):
     ch_type = 'Float32'
     format = 'f'
 
-    def __init__(self, types_check=False, **kwargs):
-        super(Float32, self).__init__(types_check=types_check, **kwargs)
+    def write_items(self, items, buf):
+        try:
+            super(Float32, self).write_items(items, buf)
+
+        except OverflowError:
+            if not self.types_check_enabled:
+                raise
 
-        if types_check:
             # Chop only bytes that fit current type.
             # Cast to -nan or nan if overflows.
-            def before_write_item(value):
-                return c_float(value).value
-
-            self.before_write_item = before_write_item
+            items = [c_float(x).value for x in items]
+            super(Float32, self).write_items(items, buf)
 
 
 class Float64(FloatColumn):
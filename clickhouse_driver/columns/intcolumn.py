@@ -6,6 +6,7 @@ from .base import FormatColumn
 
 class IntColumn(FormatColumn):
     py_types = compat.integer_types
+    numpy_kinds = 'biu'
     int_size = None
 
     def __init__(self, types_check=False, **kwargs):
@@ -13,31 +14,58 @@ class IntColumn(FormatColumn):
 
         if types_check:
             self.mask = (1 << 8 * self.int_size) - 1
+            self.min_value, self.max_value = self.get_bounds()
 
-            # Chop only bytes that fit current type.
-            # ctypes.c_intXX is slower.
-            def before_write_item(value):
-                if value >= 0:
-                    sign = 1
-                else:
-                    sign = -1
-                    value = -value
+    def get_bounds(self):
+        half = 1 << (8 * self.int_size - 1)
+        return -half, half - 1
 
-                return sign * (value & self.mask)
+    def prepare_items(self, items):
+        prepared = super(IntColumn, self).prepare_items(items)
 
-            self.before_write_item = before_write_item
+        if self.types_check_enabled and len(prepared):
+            prepared = self.fit_items(prepared)
+
+        return prepared
+
+    def fit_items(self, items):
+        # Range check of whole column. Items are chopped one by one only
+        # if some of them don't fit current type.
+        if getattr(items, 'dtype', None) is not None:
+            min_value, max_value = items.min(), items.max()
+        else:
+            min_value, max_value = min(items), max(items)
+
+        if self.min_value <= min_value and max_value <= self.max_value:
+            return items
+
+        return self.chop_items(items)
+
+    def chop_items(self, items):
+        return [self.chop_item(x) for x in items]
+
+    def chop_item(self, value):
+        # Chop only bytes that fit current type.
+        # ctypes.c_intXX is slower.
+        if value >= 0:
+            sign = 1
+        else:
+            sign = -1
+            value = -value
+
+        return sign * (value & self.mask)
 
 
 class UIntColumn(IntColumn):
-    def __init__(self, types_check=False, **kwargs):
-        super(UIntColumn, self).__init__(types_check=types_check, **kwargs)
+    def get_bounds(self):
+        return 0, self.mask
 
-        if types_check:
-            def check_item(value):
-                if value < 0:
-                    raise ColumnTypeMismatchException(value)
+    def chop_items(self, items):
+        for i, x in enumerate(items):
+            if x < 0:
+                raise ColumnTypeMismatchException(x, i)
 
-            self.check_item = check_item
+        return super(UIntColumn, self).chop_items(items)
 
 
 class Int8Column(IntColumn):
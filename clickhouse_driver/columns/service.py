@@ -1,4 +1,4 @@
-from .. import errors
+from .. import defines, errors
 from .arraycolumn import create_array_column
 from .datecolumn import DateColumn
 from .datetimecolumn import create_datetime_column
@@ -13,7 +13,7 @@ from .nothingcolumn import NothingColumn
 from .nullcolumn import NullColumn
 from .nullablecolumn import create_nullable_column
 from .stringcolumn import String, create_fixed_string_column
-from .uuidcolumn import UUIDColumn
+from .uuidcolumn import create_uuid_column
 from .intervalcolumn import (
     IntervalYearColumn, IntervalMonthColumn, IntervalWeekColumn,
     IntervalDayColumn, IntervalHourColumn, IntervalMinuteColumn,
@@ -25,7 +25,7 @@ column_by_type = {c.ch_type: c for c in [
     DateColumn, String, Float32, Float64,
     Int8Column, Int16Column, Int32Column, Int64Column,
     UInt8Column, UInt16Column, UInt32Column, UInt64Column,
-    NothingColumn, NullColumn, UUIDColumn,
+    NothingColumn, NullColumn,
     IntervalYearColumn, IntervalMonthColumn, IntervalWeekColumn,
     IntervalDayColumn, IntervalHourColumn, IntervalMinuteColumn,
     IntervalSecondColumn
@@ -47,8 +47,28 @@ def get_column_by_spec(spec, column_options=None):
     elif spec.startswith('DateTime'):
         return create_datetime_column(spec, column_options)
 
+    elif spec == 'UUID':
+        return create_uuid_column(spec, column_options)
+
     elif spec.startswith('Array'):
-        return create_array_column(spec, create_column_with_options)
+        # Arrays are returned as tuples. Arrays of one level can be returned
+        # as numpy offsets and values.
+        array_output = column_options.get('array_output')
+        if array_output is None:
+            array_output = column_options['context'].client_settings.get(
+                'array_output', defines.DEFAULT_ARRAY_OUTPUT
+            )
+        numpy_output = array_output == 'numpy' and \
+            not spec.startswith('Array(Array(')
+
+        # Nested arrays are always tuples.
+        nested_options = dict(
+            column_options, use_numpy=numpy_output, array_output='tuple'
+        )
+        return create_array_column(
+            spec, lambda x: get_column_by_spec(x, nested_options),
+            numpy_output=numpy_output
+        )
 
     elif spec.startswith('Nullable'):
         return create_nullable_column(spec, create_column_with_options)
@@ -63,13 +83,18 @@ def get_column_by_spec(spec, column_options=None):
 
 
 def read_column(context, column_spec, n_items, buf):
-    column_options = {'context': context}
+    column_options = {
+        'context': context,
+        'use_numpy': context.client_settings.get(
+            'use_numpy', defines.DEFAULT_USE_NUMPY
+        )
+    }
     column = get_column_by_spec(column_spec, column_options=column_options)
     return column.read_data(n_items, buf)
 
 
 def write_column(context, column_name, column_spec, items, buf,
-                 types_check=False):
+                 types_check=False, start_row=0):
     column_options = {
         'context': context,
         'types_check': types_check
@@ -80,10 +105,12 @@ def write_column(context, column_name, column_spec, items, buf,
         column.write_data(items, buf)
 
     except column_exceptions.ColumnTypeMismatchException as e:
+        value, row = e.args
         raise errors.TypeMismatchError(
             'Type mismatch in VALUES section. '
-            'Expected {} got {}: {} for column "{}".'.format(
-                column_spec, type(e.args[0]), e.args[0], column_name
+            'Expected {} got {}: {} for column "{}" in row {}.'.format(
+                column_spec, type(value), value, column_name,
+                start_row + row
             )
         )
 
@@ -1,51 +1,98 @@
+from binascii import hexlify
 from uuid import UUID
 
 from .base import FormatColumn
-from .. import errors
+from .. import defines, errors
 from ..util import compat
 from ..writer import MAX_UINT64
 
 
 class UUIDColumn(FormatColumn):
+    """
+    UUID is stored by two little-endian uint64 numbers: high and low
+    halves of 128-bit number. Reversing whole buffer gives big-endian
+    halves of items in reversed order with low half going first.
+    """
     ch_type = 'UUID'
-    py_types = compat.string_types + (UUID, )
+    py_types = compat.string_types + (compat.binary_type, UUID)
     format = 'Q'
 
-    # UUID is stored by two uint64 numbers.
+    def __init__(self, output=defines.DEFAULT_UUID_OUTPUT, **kwargs):
+        self.output = output
+        super(UUIDColumn, self).__init__(**kwargs)
+
     def write_items(self, items, buf):
-        n_items = len(items)
+        uint_64_pairs = []
+        extend = uint_64_pairs.extend
 
-        uint_64_pairs = [None] * 2 * n_items
-        for i, x in enumerate(items):
-            i2 = 2 * i
-            uint_64_pairs[i2] = (x >> 64) & MAX_UINT64
-            uint_64_pairs[i2 + 1] = x & MAX_UINT64
+        for x in items:
+            extend(((x >> 64) & MAX_UINT64, x & MAX_UINT64))
 
-        s = self.make_struct(2 * n_items)
+        s = self.make_struct(len(uint_64_pairs))
         buf.write(s.pack(*uint_64_pairs))
 
     def read_items(self, n_items, buf):
+        return buf.read(16 * n_items)
+
+    def after_read_items(self, items):
+        output = self.output
+        n_items = len(items) // 16
+
+        if output == 'bytes':
+            items = items[::-1]
+            return tuple(
+                items[i + 8:i + 16] + items[i:i + 8]
+                for i in range(16 * (n_items - 1), -1, -16)
+            )
+
+        elif output == 'hex':
+            items = hexlify(items[::-1]).decode('ascii')
+            return tuple(
+                items[i + 16:i + 32] + items[i:i + 16]
+                for i in range(32 * (n_items - 1), -1, -32)
+            )
+
         s = self.make_struct(2 * n_items)
-        items = s.unpack(buf.read(s.size))
+        halves = iter(s.unpack(items))
+        return tuple(
+            UUID(int=(hi << 64) | lo) for hi, lo in zip(halves, halves)
+        )
 
-        uint_128_items = [None] * n_items
-        for i in range(n_items):
-            i2 = 2 * i
-            uint_128_items[i] = (items[i2] << 64) + items[i2 + 1]
+    def before_write_items(self, items):
+        nullable = self.nullable
+        binary_type = compat.binary_type
 
-        return uint_128_items
+        rv = [None] * len(items)
 
-    def after_read_item(self, value):
-        return UUID(int=value)
+        for i, value in enumerate(items):
+            if isinstance(value, UUID):
+                rv[i] = value.int
+                continue
 
-    def before_write_item(self, value):
-        try:
-            if not isinstance(value, UUID):
-                value = UUID(value)
+            elif nullable and value is None:
+                rv[i] = 0
+                continue
 
-        except ValueError:
-            raise errors.CannotParseUuidError(
-                "Cannot parse uuid '{}'".format(value)
-            )
+            try:
+                if isinstance(value, binary_type) and len(value) == 16:
+                    value = UUID(bytes=value)
+                else:
+                    value = UUID(value)
+
+            except ValueError:
+                raise errors.CannotParseUuidError(
+                    "Cannot parse uuid '{}'".format(value)
+                )
+
+            rv[i] = value.int
+
+        return rv
+
+
+def create_uuid_column(spec, column_options):
+    context = column_options['context']
+    output = context.client_settings.get(
+        'uuid_output', defines.DEFAULT_UUID_OUTPUT
+    )
 
-        return value.int
+    return UUIDColumn(output=output, **column_options)
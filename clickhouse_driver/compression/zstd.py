@@ -46,6 +46,8 @@ class Decompressor(BaseDecompressor):
 
         self.check_hash(block_check.getvalue(), compressed_hash)
 
+        # Uncompressed size precedes zstd frame.
+        read_binary_uint32(compressed)
         compressed = compressed.read(compressed_size - 4)
 
         return zstd.decompress(compressed)
@@ -1,5 +1,7 @@
 from contextlib import contextmanager
+from io import BytesIO
 import logging
+import select
 import socket
 import ssl
 from time import time
@@ -8,6 +10,7 @@ from .block import Block
 from .blockstreamprofileinfo import BlockStreamProfileInfo
 from .clientinfo import ClientInfo
 from .context import Context
+from .loadbalancing import LoadBalancing, hosts_state, parse_hosts
 from . import defines
 from . import errors
 from .progress import Progress
@@ -17,11 +20,81 @@ from .reader import read_varint, read_binary_str
 from .readhelpers import read_exception
 from .compression import get_compressor_cls
 from .settings.writer import write_settings
+from .tablesstatus import (
+    read_tables_status_response, write_tables_status_request
+)
+from .util.addresscache import address_cache
 from .writer import write_varint, write_binary_str
 
 
 logger = logging.getLogger(__name__)
 
+# Session resumption is available since Python 3.6.
+ssl_session_supported = hasattr(ssl.SSLSocket, 'session')
+
+
+def keepalive_options(tcp_keepalive):
+    """
+    Socket options for TCP keepalive. *tcp_keepalive* is True for system
+    defaults or tuple (idle time, interval, probes count) in seconds.
+    """
+    options = [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+
+    if tcp_keepalive is True:
+        return options
+
+    idle, interval, probes = tcp_keepalive
+
+    # TCP_KEEPIDLE is TCP_KEEPALIVE on macOS.
+    idle_option = getattr(
+        socket, 'TCP_KEEPIDLE', getattr(socket, 'TCP_KEEPALIVE', None)
+    )
+    for option, value in ((idle_option, idle),
+                          (getattr(socket, 'TCP_KEEPINTVL', None), interval),
+                          (getattr(socket, 'TCP_KEEPCNT', None), probes)):
+        if option is not None:
+            options.append((socket.IPPROTO_TCP, option, value))
+
+    return options
+
+
+def create_ssl_context(verify=True, ssl_version=None, ca_certs=None,
+                       ciphers=None, certfile=None, keyfile=None):
+    """
+    Creates SSL context with the same semantic of parameters as
+    ssl.wrap_socket had. Host name is not checked.
+    """
+    if ssl_version is None:
+        ssl_version = getattr(
+            ssl, 'PROTOCOL_TLS_CLIENT',
+            getattr(ssl, 'PROTOCOL_TLS', ssl.PROTOCOL_SSLv23)
+        )
+
+    context = ssl.SSLContext(ssl_version)
+    context.check_hostname = False
+
+    if verify:
+        context.verify_mode = ssl.CERT_REQUIRED
+        if ca_certs is not None:
+            context.load_verify_locations(ca_certs)
+        else:
+            context.load_default_certs()
+    else:
+        context.verify_mode = ssl.CERT_NONE
+
+    if ciphers is not None:
+        context.set_ciphers(ciphers)
+
+    if certfile is not None:
+        context.load_cert_chain(certfile, keyfile)
+
+    return context
+
+
+def parse_table_name(name, default_database):
+    database, _, table = name.rpartition('.')
+    return database or default_database, table
+
 
 class Packet(object):
     def __init__(self):
@@ -53,18 +126,50 @@ class Connection(object):
             connect_timeout=defines.DBMS_DEFAULT_CONNECT_TIMEOUT_SEC,
             send_receive_timeout=defines.DBMS_DEFAULT_TIMEOUT_SEC,
             sync_request_timeout=defines.DBMS_DEFAULT_SYNC_REQUEST_TIMEOUT_SEC,
+            ping_interval=defines.DBMS_DEFAULT_PING_INTERVAL_SEC,
+            # Socket options.
+            recv_buffer_size=None, send_buffer_size=None, tcp_keepalive=False,
+            socket_options=None,
+            dns_cache_ttl=defines.DBMS_DEFAULT_DNS_CACHE_TTL_SEC,
             compress_block_size=defines.DEFAULT_COMPRESS_BLOCK_SIZE,
             compression=False,
             secure=False,
             # Secure socket parameters.
-            verify=True, ssl_version=None, ca_certs=None, ciphers=None
+            verify=True, ssl_version=None, ca_certs=None, ciphers=None,
+            certfile=None, keyfile=None, ssl_context=None,
+            # Replicas.
+            alt_hosts=None, load_balancing=defines.DEFAULT_LOAD_BALANCING,
+            ban_timeout=defines.DBMS_DEFAULT_BAN_TIMEOUT_SEC,
+            replica_tables=None, max_replica_delay=None,
+            replica_status_ttl=defines.DBMS_DEFAULT_REPLICA_STATUS_TTL_SEC
     ):
-        self.host = host
-
         if secure:
-            self.port = port or defines.DEFAULT_SECURE_PORT
+            default_port = defines.DEFAULT_SECURE_PORT
         else:
-            self.port = port or defines.DEFAULT_PORT
+            default_port = defines.DEFAULT_PORT
+
+        self.host = host
+        self.port = port or default_port
+
+        self.hosts = [(self.host, self.port)]
+        if alt_hosts:
+            self.hosts.extend(parse_hosts(alt_hosts, default_port))
+
+        if load_balancing not in LoadBalancing.strategies:
+            raise ValueError(
+                'Unknown load balancing strategy {}'.format(load_balancing)
+            )
+        self.load_balancing = load_balancing
+        self.ban_timeout = ban_timeout
+
+        # Replicas with greater replication delay of these tables are used
+        # only if there is no fresher replica.
+        self.replica_tables = [
+            x if isinstance(x, tuple) else parse_table_name(x, database)
+            for x in replica_tables or ()
+        ]
+        self.max_replica_delay = max_replica_delay
+        self.replica_status_ttl = replica_status_ttl
 
         self.database = database
         self.user = user
@@ -73,19 +178,33 @@ class Connection(object):
         self.connect_timeout = connect_timeout
         self.send_receive_timeout = send_receive_timeout
         self.sync_request_timeout = sync_request_timeout
+        self.ping_interval = ping_interval
 
-        self.secure_socket = secure
-        self.verify_cert = verify
+        self.socket_options = list(socket_options or ())
+        if recv_buffer_size:
+            self.socket_options.append(
+                (socket.SOL_SOCKET, socket.SO_RCVBUF, recv_buffer_size)
+            )
+        if send_buffer_size:
+            self.socket_options.append(
+                (socket.SOL_SOCKET, socket.SO_SNDBUF, send_buffer_size)
+            )
+        if tcp_keepalive:
+            self.socket_options.extend(keepalive_options(tcp_keepalive))
 
-        ssl_options = {}
-        if ssl_version is not None:
-            ssl_options['ssl_version'] = ssl_version
-        if ca_certs is not None:
-            ssl_options['ca_certs'] = ca_certs
-        if ciphers is not None:
-            ssl_options['ciphers'] = ciphers
+        self.dns_cache_ttl = dns_cache_ttl
+
+        self.secure_socket = secure
 
-        self.ssl_options = ssl_options
+        # Context can be shared by several connections.
+        if secure and ssl_context is None:
+            ssl_context = create_ssl_context(
+                verify=verify, ssl_version=ssl_version, ca_certs=ca_certs,
+                ciphers=ciphers, certfile=certfile, keyfile=keyfile
+            )
+        self.ssl_context = ssl_context
+        # TLS sessions for resumption on reconnect: (host, port) -> session.
+        self.ssl_sessions = {}
 
         # Use LZ4 compression by default.
         if compression is True:
@@ -105,6 +224,10 @@ class Connection(object):
         self.fout = None
 
         self.connected = False
+        # Time of the last packet from server.
+        self.last_used = None
+        # Distinguishes queries of the same connection.
+        self.queries_sent = 0
 
         self.server_info = None
         self.context = Context()
@@ -123,36 +246,60 @@ class Connection(object):
         if not self.connected:
             self.connect()
 
-        elif not self.ping():
+        elif not self.is_alive():
             logger.warning('Connection was closed, reconnecting.')
             self.connect()
 
+    def is_alive(self):
+        """
+        Connection that was used recently is checked without network round
+        trip: only for closed by server socket. Idle connection is pinged.
+        """
+        if time() - self.last_used > self.ping_interval:
+            return self.ping()
+
+        return not self.is_socket_closed()
+
+    def is_socket_closed(self):
+        try:
+            readable, _, _ = select.select([self.socket], [], [], 0)
+            if not readable:
+                return False
+
+            # Server sends nothing between queries. Readable socket is
+            # either closed or has pending data that can't be peeked in
+            # SSL socket (TLS session tickets for example).
+            if self.secure_socket:
+                return not self.ping()
+
+            return not self.socket.recv(1, socket.MSG_PEEK)
+
+        except (socket.error, select.error, ValueError):
+            return True
+
     def _create_socket(self):
         """
         Acts like socket.create_connection, but wraps socket with SSL
         if connection is secure.
         """
-        ssl_options = {}
-        if self.secure_socket:
-            if self.verify_cert:
-                cert_reqs = ssl.CERT_REQUIRED
-            else:
-                cert_reqs = ssl.CERT_NONE
-
-            ssl_options = self.ssl_options.copy()
-            ssl_options['cert_reqs'] = cert_reqs
-
         host, port = self.host, self.port
+        addresses = address_cache.resolve(host, port, self.dns_cache_ttl)
+
         err = None
-        for res in socket.getaddrinfo(host, port, 0, socket.SOCK_STREAM):
+        for res in addresses:
             af, socktype, proto, canonname, sa = res
             sock = None
             try:
                 sock = socket.socket(af, socktype, proto)
                 sock.settimeout(self.connect_timeout)
 
+                # Buffer sizes must be set before connect to take effect
+                # on TCP window scaling.
+                for level, option, value in self.socket_options:
+                    sock.setsockopt(level, option, value)
+
                 if self.secure_socket:
-                    sock = ssl.wrap_socket(sock, **ssl_options)
+                    sock = self.wrap_ssl_socket(sock)
 
                 sock.connect(sa)
                 return sock
@@ -162,18 +309,141 @@ class Connection(object):
                 if sock is not None:
                     sock.close()
 
+        # Host could move to other address.
+        address_cache.invalidate(host, port)
+
         if err is not None:
             raise err
         else:
             raise socket.error("getaddrinfo returns an empty list")
 
+    def wrap_ssl_socket(self, sock):
+        options = {'server_hostname': self.host}
+
+        # Abbreviated handshake with session of previous connection.
+        session = self.ssl_sessions.get((self.host, self.port))
+        if session is not None and ssl_session_supported:
+            options['session'] = session
+
+        return self.ssl_context.wrap_socket(sock, **options)
+
+    def save_ssl_session(self):
+        if not ssl_session_supported:
+            return
+
+        if self.socket.session_reused:
+            logger.debug('TLS session reused for %s', self.get_description())
+
+        # With TLS 1.3 session ticket is received after handshake, so
+        # session is taken after hello exchange.
+        session = self.socket.session
+        if session is not None:
+            self.ssl_sessions[(self.host, self.port)] = session
+
     def connect(self):
-        try:
-            if self.connected:
+        if self.connected:
+            self.disconnect()
+
+        hosts = self.hosts
+        check_delay = (
+            self.replica_tables and self.max_replica_delay is not None and
+            len(hosts) > 1
+        )
+
+        if len(hosts) > 1:
+            hosts = hosts_state.order(hosts, self.load_balancing)
+
+        err = None
+        stale = []
+        for host in hosts:
+            if check_delay:
+                # Don't connect to replicas known to be stale.
+                delay = hosts_state.get_replica_delay(
+                    self.replica_status_key(host)
+                )
+                if delay is not None and delay > self.max_replica_delay:
+                    stale.append((delay, host))
+                    continue
+
+            self.host, self.port = host
+
+            try:
+                start = time()
+                self._init_connection()
+                hosts_state.add_latency(host, time() - start)
+                hosts_state.unban(host)
+
+            except (errors.SocketTimeoutError, errors.NetworkError) as e:
+                logger.warning('Failed to connect to %s: %s',
+                               self.get_description(), e)
+                hosts_state.ban(host, self.ban_timeout)
+                err = e
+                continue
+
+            if not check_delay:
+                return
+
+            try:
+                delay = self.get_replica_delay()
+
+            except (errors.ServerException,
+                    errors.ServerRevisionIsTooOldError) as e:
+                # Tables are missing or their status can't be requested.
+                logger.warning('Failed to check replica %s: %s',
+                               self.get_description(), e)
+                self.disconnect()
+                err = e
+                continue
+
+            except (errors.SocketTimeoutError, errors.NetworkError) as e:
+                logger.warning('Failed to check replica %s: %s',
+                               self.get_description(), e)
+                hosts_state.ban(host, self.ban_timeout)
                 self.disconnect()
+                err = e
+                continue
 
+            if delay <= self.max_replica_delay:
+                return
+
+            logger.warning('Replica %s is stale, delay: %s',
+                           self.get_description(), delay)
+            stale.append((delay, host))
+            self.disconnect()
+
+        if stale:
+            # Fallback to the least lagging replica.
+            delay, (self.host, self.port) = min(stale, key=lambda x: x[0])
+            self._init_connection()
+            return
+
+        raise err
+
+    def replica_status_key(self, host):
+        return host, tuple(self.replica_tables)
+
+    def get_replica_delay(self):
+        """
+        Returns max replication delay of replica_tables on current replica.
+        Result is cached for replica_status_ttl seconds.
+        """
+        key = self.replica_status_key((self.host, self.port))
+        delay = hosts_state.get_replica_delay(key)
+
+        if delay is None:
+            statuses = self.get_tables_status(self.replica_tables)
+            delay = max(
+                [x.absolute_delay for x in statuses.values()] or [0]
+            )
+            hosts_state.set_replica_delay(key, delay, self.replica_status_ttl)
+
+        return delay
+
+    def _init_connection(self):
+        try:
             logger.debug(
-                'Connecting. Database: %s. User: %s', self.database, self.user
+                'Connecting to %s. Database: %s. User: %s',
+                self.get_description(), self.database, self.user
             )
 
             self.socket = self._create_socket()
@@ -188,6 +458,10 @@ class Connection(object):
 
             self.send_hello()
             self.receive_hello()
+            self.last_used = time()
+
+            if self.secure_socket:
+                self.save_ssl_session()
 
             self.block_in = self.get_block_in_stream()
             self.block_out = self.get_block_out_stream()
@@ -287,7 +561,10 @@ class Connection(object):
             )
 
         elif packet_type == ServerPacketTypes.EXCEPTION:
-            raise self.receive_exception()
+            exc = self.receive_exception()
+            # Server closes connection after failed handshake.
+            self.disconnect()
+            raise exc
 
         else:
             self.disconnect()
@@ -300,6 +577,7 @@ class Connection(object):
 
         with self.timeout_setter(timeout):
             try:
+                start = time()
                 write_varint(ClientPacketTypes.PING, self.fout)
                 self.fout.flush()
 
@@ -312,6 +590,10 @@ class Connection(object):
                     msg = self.unexpected_packet_message('Pong', packet_type)
                     raise errors.UnexpectedPacketFromServerError(msg)
 
+                self.last_used = time()
+                hosts_state.add_latency((self.host, self.port),
+                                        self.last_used - start)
+
             except errors.Error:
                 raise
 
@@ -325,10 +607,61 @@ class Connection(object):
 
         return True
 
+    def get_tables_status(self, tables):
+        """
+        Requests replication status of tables: list of (database, table).
+        Returns dict: (database, table) -> TableStatus.
+        """
+        if not self.connected:
+            self.connect()
+
+        revision = self.server_info.revision
+        if revision < defines.DBMS_MIN_REVISION_WITH_TABLES_STATUS:
+            raise errors.ServerRevisionIsTooOldError(
+                'Tables status request is not supported by server revision '
+                '{}'.format(revision)
+            )
+
+        try:
+            with self.timeout_setter(self.sync_request_timeout):
+                return self.request_tables_status(tables)
+
+        except socket.timeout as e:
+            self.disconnect()
+            raise errors.SocketTimeoutError(
+                '{} ({})'.format(e.strerror, self.get_description())
+            )
+
+        except socket.error as e:
+            self.disconnect()
+            raise errors.NetworkError(
+                '{} ({})'.format(e.strerror, self.get_description())
+            )
+
+    def request_tables_status(self, tables):
+        write_varint(ClientPacketTypes.TABLES_STATUS_REQUEST, self.fout)
+        write_tables_status_request(tables, self.fout)
+        self.fout.flush()
+
+        packet_type = read_varint(self.fin)
+
+        if packet_type == ServerPacketTypes.TABLES_STATUS_RESPONSE:
+            return read_tables_status_response(self.fin)
+
+        elif packet_type == ServerPacketTypes.EXCEPTION:
+            raise self.receive_exception()
+
+        else:
+            message = self.unexpected_packet_message(
+                'TablesStatusResponse', packet_type
+            )
+            raise errors.UnexpectedPacketFromServerError(message)
+
     def receive_packet(self):
         packet = Packet()
 
         packet.type = packet_type = read_varint(self.fin)
+        self.last_used = time()
 
         if packet_type == ServerPacketTypes.DATA:
             packet.block = self.receive_data()
@@ -371,18 +704,20 @@ class Connection(object):
 
             return BlockInputStream(self.fin, self.context)
 
-    def get_block_out_stream(self):
+    def get_block_out_stream(self, fout=None):
+        fout = fout or self.fout
+
         if self.compression:
             from .streams.compressed import CompressedBlockOutputStream
 
             return CompressedBlockOutputStream(
                 self.compressor_cls, self.compress_block_size,
-                self.fout, self.context
+                fout, self.context
             )
         else:
             from .streams.native import BlockOutputStream
 
-            return BlockOutputStream(self.fout, self.context)
+            return BlockOutputStream(fout, self.context)
 
     def receive_data(self):
         revision = self.server_info.revision
@@ -419,10 +754,33 @@ class Connection(object):
         self.block_out.reset()
         logger.debug('Block send time: %f', time() - start)
 
+    def encode_data(self, block, table_name=''):
+        """
+        Returns Data packet with block as bytes. Socket is not touched, so
+        blocks can be encoded in other thread while previous ones are sent.
+        """
+        buf = BytesIO()
+        write_varint(ClientPacketTypes.DATA, buf)
+
+        revision = self.server_info.revision
+        if revision >= defines.DBMS_MIN_REVISION_WITH_TEMPORARY_TABLES:
+            write_binary_str(table_name, buf)
+
+        self.get_block_out_stream(buf).write(block)
+        return buf.getvalue()
+
+    def send_encoded_data(self, data):
+        start = time()
+        self.fout.write(data)
+        self.fout.flush()
+        logger.debug('Block send time: %f', time() - start)
+
     def send_query(self, query, query_id=None):
         if not self.connected:
             self.connect()
 
+        self.queries_sent += 1
+
         write_varint(ClientPacketTypes.QUERY, self.fout)
 
         write_binary_str(query_id or '', self.fout)
@@ -3,7 +3,7 @@ class Context(object):
     def __init__(self):
         self._server_info = None
         self._settings = None
-        self._client_settings = None
+        self._client_settings = {}
         super(Context, self).__init__()
 
     @property
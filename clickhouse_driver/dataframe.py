@@ -0,0 +1,78 @@
+from .columns.service import get_column_by_spec
+from .util.helpers import import_numpy, import_pandas
+
+
+def enum_to_categorical(values, spec, context):
+    """
+    Makes categorical from raw Enum values. Categories are Enum names
+    ordered by their values, NULLs are missing values.
+    """
+    np = import_numpy()
+    pd = import_pandas()
+
+    if spec.startswith('Nullable'):
+        spec = spec[9:-1]
+
+    column = get_column_by_spec(spec, {'context': context})
+    enum_values = sorted(column.value_to_name)
+    categories = [column.value_to_name[x] for x in enum_values]
+
+    codes = np.searchsorted(enum_values, np.ma.getdata(values))
+    mask = np.ma.getmaskarray(values)
+    if mask.any():
+        codes[mask] = -1
+
+    return pd.Categorical.from_codes(codes, categories)
+
+
+def columns_to_dataframe(columns, columns_with_types, context):
+    pd = import_pandas()
+
+    if not columns:
+        columns = [()] * len(columns_with_types)
+
+    names = [name for name, _ in columns_with_types]
+    data = {}
+
+    for values, (name, spec) in zip(columns, columns_with_types):
+        if spec.startswith(('Enum', 'Nullable(Enum')):
+            values = enum_to_categorical(values, spec, context)
+
+        data[name] = values
+
+    return pd.DataFrame(data, columns=names)
+
+
+def dataframe_to_columns(dataframe):
+    """
+    Takes numpy arrays from DataFrame columns. Only object columns with
+    missing values are copied to replace them with None.
+    """
+    np = import_numpy()
+    pd = import_pandas()
+
+    columns = {}
+
+    for name in dataframe.columns:
+        series = dataframe[name]
+        dtype = series.dtype
+
+        if getattr(dtype, 'tz', None) is not None:
+            # Timezone aware values are UTC internally. Integers are written
+            # as timestamps.
+            values = series.values.astype('datetime64[s]').astype(np.int64)
+
+        elif isinstance(series.values, np.ndarray) and dtype.kind != 'O':
+            values = series.values
+
+        else:
+            # Categoricals, extension arrays and Python objects.
+            values = np.asarray(series, dtype=object)
+            mask = pd.isnull(values)
+            if mask.any():
+                values = values.copy()
+                values[mask] = None
+
+        columns[name] = values
+
+    return columns
@@ -11,6 +11,7 @@ DBMS_MIN_REVISION_WITH_BLOCK_INFO = 51903
 DBMS_MIN_REVISION_WITH_CLIENT_INFO = 54032
 DBMS_MIN_REVISION_WITH_SERVER_TIMEZONE = 54058
 DBMS_MIN_REVISION_WITH_QUOTA_KEY_IN_CLIENT_INFO = 54060
+DBMS_MIN_REVISION_WITH_TABLES_STATUS = 54226
 
 # Timeouts
 DBMS_DEFAULT_CONNECT_TIMEOUT_SEC = 10
@@ -18,9 +19,48 @@ DBMS_DEFAULT_TIMEOUT_SEC = 300
 
 DBMS_DEFAULT_SYNC_REQUEST_TIMEOUT_SEC = 5
 
+# Connection idle for longer is pinged before query.
+DBMS_DEFAULT_PING_INTERVAL_SEC = 10
+
+# Resolved addresses of hosts are cached during this time.
+DBMS_DEFAULT_DNS_CACHE_TTL_SEC = 60
+
+# Failed replica is tried after all other replicas during this time.
+DBMS_DEFAULT_BAN_TIMEOUT_SEC = 60
+
+# Order of connection attempts to replicas: random, in_order,
+# nearest_hostname, round_robin or least_latency.
+DEFAULT_LOAD_BALANCING = 'in_order'
+
+# Replication delay of replica tables is cached during this time.
+DBMS_DEFAULT_REPLICA_STATUS_TTL_SEC = 5
+
 DEFAULT_COMPRESS_BLOCK_SIZE = 1048576
 DEFAULT_INSERT_BLOCK_SIZE = 1048576
 
+# Number of INSERT blocks encoded in background thread ahead of sending.
+# Zero disables background encoding.
+DEFAULT_INSERT_PIPELINE_DEPTH = 0
+
+# Representation of DateTime values: datetime, timestamp or numpy.
+DEFAULT_DATETIME_OUTPUT = 'datetime'
+
+# Representation of UUID values: uuid, bytes or hex.
+DEFAULT_UUID_OUTPUT = 'uuid'
+
+# Representation of Enum values: name or value.
+DEFAULT_ENUM_OUTPUT = 'name'
+
+# Representation of Array values: tuple or numpy (offsets and values).
+DEFAULT_ARRAY_OUTPUT = 'tuple'
+
+# Numeric, Date and DateTime columns are read into numpy arrays.
+DEFAULT_USE_NUMPY = False
+
+# Estimated size of result rows in bytes kept in memory. Bigger results are
+# spilled to temporary file. Zero disables spilling.
+DEFAULT_RESULT_MEMORY_LIMIT = 0
+
 DBMS_NAME = 'ClickHouse'
 CLIENT_NAME = 'python-driver'
 CLIENT_VERSION = 54337
@@ -466,3 +466,15 @@ class UnknownPacketFromServerError(Error):
 
 class CannotParseUuidError(Error):
     code = ErrorCodes.CANNOT_PARSE_UUID
+
+
+class ServerRevisionIsTooOldError(Error):
+    code = ErrorCodes.SERVER_REVISION_IS_TOO_OLD
+
+
+class TimeoutExceededError(Error):
+    code = ErrorCodes.TIMEOUT_EXCEEDED
+
+
+class CannotParseTextError(Error):
+    code = ErrorCodes.CANNOT_PARSE_TEXT
@@ -0,0 +1,290 @@
+import logging
+from threading import Condition, Lock, Thread
+from time import time
+
+from .util.compat import binary_type, string_types
+from .util.escape import escape_identifier
+
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_size(values):
+    return sum(
+        len(x) if isinstance(x, (string_types, binary_type)) else 8
+        for x in values
+    )
+
+
+class TableBuffer(object):
+    def __init__(self, query, columnar):
+        self.query = query
+        self.columnar = columnar
+        self.data = []
+        self.rows = 0
+        self.bytes = 0
+        self.created = time()
+
+        super(TableBuffer, self).__init__()
+
+    def check_rows(self, rows, column_names=None):
+        """
+        Block takes rows format from the first row: rows of one buffer must
+        be all dicts with the same keys or all tuples of the same length.
+        """
+        first = self.data[0] if self.data else (rows[0] if rows else None)
+        if first is None:
+            return
+
+        is_dict = isinstance(first, dict)
+        if is_dict:
+            names = column_names or list(first)
+        else:
+            size = len(column_names) if column_names else len(first)
+
+        for i, row in enumerate(rows):
+            if isinstance(row, dict) != is_dict:
+                raise ValueError(
+                    'Row {} is {}, buffered rows are {}'.format(
+                        i, type(row).__name__,
+                        'dicts' if is_dict else 'tuples'
+                    )
+                )
+
+            if is_dict:
+                missing = [x for x in names if x not in row]
+                if missing:
+                    raise ValueError(
+                        'Row {} has no values for {}'.format(
+                            i, ', '.join(missing)
+                        )
+                    )
+
+            elif len(row) != size:
+                raise ValueError(
+                    'Expected {} values, got {} in row {}'.format(
+                        size, len(row), i
+                    )
+                )
+
+    def check_columns(self, columns):
+        if len(set(len(values) for values in columns)) > 1:
+            raise ValueError('Different columns length')
+
+    def add_rows(self, rows, with_bytes):
+        self.data.extend(rows)
+        self.rows += len(rows)
+
+        if with_bytes:
+            self.bytes += sum(
+                estimate_size(row.values() if isinstance(row, dict) else row)
+                for row in rows
+            )
+
+    def add_columns(self, columns, with_bytes):
+        if self.data:
+            for column, values in zip(self.data, columns):
+                column.extend(values)
+        else:
+            self.data = [list(values) for values in columns]
+
+        self.rows += len(columns[0]) if columns else 0
+
+        if with_bytes:
+            self.bytes += sum(estimate_size(values) for values in columns)
+
+
+class InsertBuffer(object):
+    """
+    Accumulates rows inserted by many threads and sends them to server by
+    big blocks. Data of each table is flushed when it has *max_rows* rows,
+    about *max_bytes* bytes or when the oldest row waits for *max_delay*
+    seconds. Flushes are made by background thread.
+
+    :param client: :class:`Client` used for flushes. It shouldn't be used by
+                   other code while buffer is open.
+    :param error_callback: function called with query, data and exception
+                           when flush fails. Error is logged by default.
+    """
+
+    def __init__(self, client, max_rows=100000, max_bytes=None,
+                 max_delay=1.0, types_check=False, error_callback=None):
+        self.client = client
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.max_delay = max_delay
+        self.types_check = types_check
+        self.error_callback = error_callback
+
+        self.buffers = {}
+        self.closed = False
+        lock = Lock()
+        self.cond = Condition(lock)
+        # Buffers taken by flush thread but not sent yet.
+        self.sending = 0
+        self.sent = Condition(lock)
+        # Serializes client usage between flush thread and explicit flushes.
+        self.client_lock = Lock()
+
+        self.thread = Thread(target=self.run)
+        self.thread.daemon = True
+        self.thread.start()
+
+        super(InsertBuffer, self).__init__()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def insert(self, table, rows, column_names=None):
+        """
+        Adds rows (list of tuples or dicts) to table buffer. Rows must
+        contain all table columns or columns listed in *column_names*.
+        Raises ``ValueError`` if rows don't match each other or rows already
+        buffered for the table.
+        """
+        query = 'INSERT INTO {}'.format(table)
+        if column_names:
+            names = ', '.join(escape_identifier(x) for x in column_names)
+            query += ' ({})'.format(names)
+        query += ' VALUES'
+
+        with self.cond:
+            buffer = self.get_buffer(query, False)
+            # Bad rows must fail here, not in flush of all producers' data.
+            buffer.check_rows(rows, column_names=column_names)
+            buffer.add_rows(rows, self.max_bytes is not None)
+            self.notify_if_ready(buffer)
+
+    def insert_columns(self, table, columns):
+        """
+        Adds column-oriented data: dict column name -> sequence of values.
+        Raises ``ValueError`` if columns have different length.
+        """
+        names = sorted(columns)
+        query = 'INSERT INTO {} ({}) VALUES'.format(
+            table, ', '.join(escape_identifier(x) for x in names)
+        )
+
+        with self.cond:
+            buffer = self.get_buffer(query, True)
+            values = [columns[x] for x in names]
+            buffer.check_columns(values)
+            buffer.add_columns(values, self.max_bytes is not None)
+            self.notify_if_ready(buffer)
+
+    def get_buffer(self, query, columnar):
+        if self.closed:
+            raise RuntimeError('InsertBuffer is closed')
+
+        key = (query, columnar)
+        buffer = self.buffers.get(key)
+        if buffer is None:
+            buffer = self.buffers[key] = TableBuffer(query, columnar)
+            # New deadline may be earlier than one flush thread waits for.
+            self.cond.notify()
+
+        return buffer
+
+    def notify_if_ready(self, buffer):
+        if self.is_full(buffer):
+            self.cond.notify()
+
+    def is_full(self, buffer):
+        return buffer.rows >= self.max_rows or (
+            self.max_bytes is not None and buffer.bytes >= self.max_bytes
+        )
+
+    def pop_ready(self, now):
+        deadline = now - self.max_delay
+
+        ready = [
+            key for key, buffer in self.buffers.items()
+            if self.closed or buffer.created <= deadline or
+            self.is_full(buffer)
+        ]
+        return [self.buffers.pop(key) for key in ready]
+
+    def next_timeout(self, now):
+        if not self.buffers:
+            return None
+
+        oldest = min(x.created for x in self.buffers.values())
+        return max(oldest + self.max_delay - now, 0)
+
+    def run(self):
+        while True:
+            with self.cond:
+                ready = self.pop_ready(time())
+                while not ready and not self.closed:
+                    self.cond.wait(self.next_timeout(time()))
+                    ready = self.pop_ready(time())
+
+                finished = self.closed
+                self.sending = len(ready)
+
+            for buffer in ready:
+                self.send(buffer)
+
+            with self.cond:
+                self.sending = 0
+                self.sent.notify_all()
+
+            if finished:
+                break
+
+    def send(self, buffer):
+        # Buffer can be created by insert with no or invalid rows.
+        if not buffer.rows:
+            return
+
+        try:
+            with self.client_lock:
+                self.client.execute(
+                    buffer.query, buffer.data, types_check=self.types_check,
+                    columnar=buffer.columnar
+                )
+
+        except Exception as e:
+            if self.error_callback is None:
+                logger.exception(
+                    'Failed to flush %d rows: %s', buffer.rows, buffer.query
+                )
+            else:
+                # Failed callback must not stop flush thread.
+                try:
+                    self.error_callback(buffer.query, buffer.data, e)
+                except Exception:
+                    logger.exception(
+                        'Error callback failed for %d rows: %s',
+                        buffer.rows, buffer.query
+                    )
+
+    def flush(self):
+        """
+        Sends all buffered data in calling thread. Waits for data being sent
+        by flush thread.
+        """
+        with self.cond:
+            buffers = list(self.buffers.values())
+            self.buffers.clear()
+
+        for buffer in buffers:
+            self.send(buffer)
+
+        with self.cond:
+            while self.sending:
+                self.sent.wait()
+
+    def close(self):
+        """
+        Stops accepting data, flushes everything buffered and waits for
+        flush thread.
+        """
+        with self.cond:
+            self.closed = True
+            self.cond.notify()
+
+        self.thread.join()
@@ -0,0 +1,153 @@
+from itertools import count
+import random
+import socket
+from threading import Lock
+from time import time
+
+
+class LoadBalancing(object):
+    RANDOM = 'random'
+    IN_ORDER = 'in_order'
+    NEAREST_HOSTNAME = 'nearest_hostname'
+    ROUND_ROBIN = 'round_robin'
+    LEAST_LATENCY = 'least_latency'
+
+    strategies = (
+        RANDOM, IN_ORDER, NEAREST_HOSTNAME, ROUND_ROBIN, LEAST_LATENCY
+    )
+
+
+def parse_hosts(hosts, default_port):
+    """
+    Parses hosts passed as comma separated string ``host1:port,host2`` or as
+    list of strings and ``(host, port)`` tuples.
+    """
+    if isinstance(hosts, tuple) or not isinstance(hosts, (list, set)):
+        hosts = [hosts]
+
+    rv = []
+    for host in hosts:
+        if isinstance(host, tuple):
+            rv.append((host[0], host[1] or default_port))
+            continue
+
+        for item in host.split(','):
+            item = item.strip()
+            port = default_port
+
+            if item.startswith('['):
+                # IPv6 address: [::1]:9000.
+                item, _, tail = item[1:].partition(']')
+                if tail.startswith(':'):
+                    port = int(tail[1:])
+
+            elif item.count(':') == 1:
+                item, port = item.split(':')
+                port = int(port)
+
+            rv.append((item, port))
+
+    return rv
+
+
+def hostname_difference(a, b):
+    return sum(x != y for x, y in zip(a, b)) + abs(len(a) - len(b))
+
+
+class HostsState(object):
+    """
+    Failures, latencies and replication delays of hosts shared by all
+    connections in process. Failed host is banned for a while: it's tried
+    only after all other hosts.
+    """
+
+    # Weight of new measurement in latency moving average.
+    latency_alpha = 0.3
+
+    def __init__(self):
+        self.lock = Lock()
+        self.banned = {}
+        self.latencies = {}
+        self.replica_delays = {}
+        self.rotation = count()
+
+        super(HostsState, self).__init__()
+
+    def ban(self, host, timeout):
+        with self.lock:
+            self.banned[host] = time() + timeout
+
+    def unban(self, host):
+        with self.lock:
+            self.banned.pop(host, None)
+
+    def banned_until(self, host, now):
+        until = self.banned.get(host)
+        if until is not None and until <= now:
+            with self.lock:
+                self.banned.pop(host, None)
+            return None
+
+        return until
+
+    def add_latency(self, host, value):
+        with self.lock:
+            prev = self.latencies.get(host)
+            if prev is not None:
+                value = prev + self.latency_alpha * (value - prev)
+            self.latencies[host] = value
+
+    def get_replica_delay(self, key):
+        delay, expires = self.replica_delays.get(key, (None, None))
+        if expires is not None and expires <= time():
+            return None
+
+        return delay
+
+    def set_replica_delay(self, key, delay, ttl):
+        with self.lock:
+            self.replica_delays[key] = delay, time() + ttl
+
+    def order(self, hosts, strategy):
+        if strategy == LoadBalancing.IN_ORDER:
+            ordered = list(hosts)
+
+        elif strategy == LoadBalancing.RANDOM:
+            ordered = list(hosts)
+            random.shuffle(ordered)
+
+        elif strategy == LoadBalancing.ROUND_ROBIN:
+            start = next(self.rotation) % len(hosts)
+            ordered = hosts[start:] + hosts[:start]
+
+        elif strategy == LoadBalancing.NEAREST_HOSTNAME:
+            local = socket.gethostname()
+            ordered = sorted(
+                hosts, key=lambda x: hostname_difference(local, x[0])
+            )
+
+        elif strategy == LoadBalancing.LEAST_LATENCY:
+            # Hosts without measurements go first to get them measured.
+            latencies = self.latencies
+            ordered = sorted(hosts, key=lambda x: latencies.get(x, 0))
+
+        else:
+            raise ValueError(
+                'Unknown load balancing strategy {}'.format(strategy)
+            )
+
+        # Banned hosts are moved to the end, the earliest unbanned first.
+        now = time()
+        alive, banned = [], []
+        for host in ordered:
+            until = self.banned_until(host, now)
+            if until is None:
+                alive.append(host)
+            else:
+                banned.append((until, host))
+
+        banned.sort(key=lambda x: x[0])
+        return alive + [host for until, host in banned]
+
+
+hosts_state = HostsState()
@@ -0,0 +1,174 @@
+import mmap
+import os
+
+from . import defines
+from .compression import get_compressor_cls
+from .connection import ServerInfo
+from .context import Context
+from .streams.native import BlockInputStream, BlockOutputStream
+from .util.compat import string_types
+
+
+def make_file_context(timezone=None, settings=None, client_settings=None):
+    context = Context()
+    # Revision 0: Native format files have no block info, like ones written
+    # by server with FORMAT Native.
+    context.server_info = ServerInfo('file', 0, 0, 0, timezone or 'UTC')
+    context.settings = settings or {}
+    context.client_settings = client_settings or {}
+    return context
+
+
+class NativeFile(object):
+    def __init__(self, file, mode):
+        if isinstance(file, string_types):
+            self.file = open(file, mode)
+            self.owns_file = True
+        else:
+            self.file = file
+            self.owns_file = False
+
+        super(NativeFile, self).__init__()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if self.owns_file:
+            self.file.close()
+
+
+class NativeFileWriter(NativeFile):
+    """
+    Writes blocks to file in Native format. Each block can be compressed
+    separately with the same codecs that are used by connection.
+
+    :param file: path or binary file object.
+    :param compression: ``True`` for LZ4 or compression method name:
+                        ``lz4``, ``lz4hc``, ``zstd``.
+    :param timezone: timezone of DateTime columns without explicit timezone.
+                     UTC by default.
+    :param settings: query settings that affect columns encoding.
+    """
+
+    def __init__(self, file, compression=False,
+                 compress_block_size=defines.DEFAULT_COMPRESS_BLOCK_SIZE,
+                 timezone=None, settings=None):
+        self.context = make_file_context(timezone=timezone, settings=settings)
+
+        # Use LZ4 compression by default.
+        if compression is True:
+            compression = 'lz4'
+
+        super(NativeFileWriter, self).__init__(file, 'wb')
+
+        if compression:
+            from .streams.compressed import CompressedBlockOutputStream
+
+            self.stream = CompressedBlockOutputStream(
+                get_compressor_cls(compression), compress_block_size,
+                self.file, self.context
+            )
+        else:
+            self.stream = BlockOutputStream(self.file, self.context)
+
+        self.rows = 0
+        self.blocks = 0
+
+    def write(self, block):
+        """
+        Writes :class:`Block`. Empty blocks are skipped except the first one:
+        file of empty result keeps column names and types.
+        """
+        if not block.rows and self.blocks:
+            return
+
+        self.stream.write(block)
+        self.stream.reset()
+
+        self.rows += block.rows
+        self.blocks += 1
+
+    def close(self):
+        self.file.flush()
+        super(NativeFileWriter, self).close()
+
+
+class NativeFileReader(NativeFile):
+    """
+    Reads blocks from file in Native format. Regular files are read through
+    memory map by default. File can be iterated many times.
+
+    :param file: path or seekable binary file object.
+    :param compression: ``True`` if file was written with compression.
+                        Method is taken from each compressed block.
+    :param timezone: timezone of DateTime columns without explicit timezone.
+                     UTC by default.
+    :param settings: query settings that affect columns decoding.
+    :param client_settings: client settings that affect output of columns:
+                            ``use_numpy``, ``datetime_output`` etc.
+    :param use_mmap: read file through memory map. Must be ``False`` for
+                     file objects without descriptor like ``BytesIO``.
+    """
+
+    def __init__(self, file, compression=False, timezone=None, settings=None,
+                 client_settings=None, use_mmap=True):
+        self.context = make_file_context(
+            timezone=timezone, settings=settings,
+            client_settings=client_settings
+        )
+        self.compression = compression
+        self.use_mmap = use_mmap
+
+        super(NativeFileReader, self).__init__(file, 'rb')
+
+    def __iter__(self):
+        for block in self.iter_blocks():
+            for row in block.get_rows():
+                yield row
+
+    def iter_blocks(self):
+        """
+        Returns generator of columnar :class:`Block` objects.
+        """
+        if self.use_mmap:
+            size = os.fstat(self.file.fileno()).st_size
+            if not size:
+                return
+
+            buf = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        else:
+            # File object may have no descriptor, e.g. BytesIO.
+            buf = self.file
+            buf.seek(0, 2)
+            size = buf.tell()
+            if not size:
+                return
+
+            buf.seek(0)
+
+        if self.compression:
+            from .streams.compressed import CompressedBlockInputStream
+
+            stream = CompressedBlockInputStream(buf, self.context)
+
+            def has_data():
+                return buf.tell() < size or not stream.fin.exhausted()
+
+        else:
+            stream = BlockInputStream(buf, self.context)
+
+            def has_data():
+                return buf.tell() < size
+
+        try:
+            while has_data():
+                yield stream.read()
+
+        finally:
+            if self.use_mmap:
+                buf.close()
@@ -10,6 +10,11 @@ class Progress(object):
 
         super(Progress, self).__init__()
 
+    def increment(self, another_progress):
+        self.rows += another_progress.rows
+        self.bytes += another_progress.bytes
+        self.total_rows += another_progress.total_rows
+
     def read(self, server_revision, fin):
         self.rows = read_varint(fin)
         self.bytes = read_varint(fin)
@@ -0,0 +1,37 @@
+from time import time
+
+from .blockstreamprofileinfo import BlockStreamProfileInfo
+from .progress import Progress
+
+
+class QueryInfo(object):
+    """
+    Information about the last query: profile info sent by server at the end
+    of result, cumulative progress, elapsed time in seconds and rows of
+    TOTALS and EXTREMES blocks.
+    """
+
+    def __init__(self):
+        self.profile_info = BlockStreamProfileInfo()
+        self.progress = Progress()
+        self.elapsed = 0
+        self.totals = []
+        self.extremes = []
+        self.started = time()
+
+        super(QueryInfo, self).__init__()
+
+    def store_profile(self, profile_info):
+        self.profile_info = profile_info
+
+    def store_progress(self, progress):
+        self.progress.increment(progress)
+
+    def store_totals(self, block):
+        self.totals = block.get_rows()
+
+    def store_extremes(self, block):
+        self.extremes = block.get_rows()
+
+    def store_elapsed(self):
+        self.elapsed = time() - self.started
@@ -1,16 +1,29 @@
 from .progress import Progress
+from .util.helpers import merge_columns
+from .protocol import ServerPacketTypes
 
 
 class QueryResult(object):
+    """
+    Stores data rows in memory or in *storage* if it's passed.
+    """
+
     def __init__(
             self, packet_generator,
-            with_column_types=False, columnar=False):
+            with_column_types=False, columnar=False, storage=None):
         self.packet_generator = packet_generator
         self.with_column_types = with_column_types
+        self.storage = storage
 
         self.data = []
         self.columns_with_types = []
         self.columnar = columnar
+        # Columns of each block. They are concatenated once at the end.
+        self.blocks_columns = []
+
+        # Rows of TOTALS and EXTREMES blocks. They are not mixed with data.
+        self.totals = []
+        self.extremes = []
 
         super(QueryResult, self).__init__()
 
@@ -19,26 +32,39 @@ class QueryResult(object):
         if block is None:
             return
 
+        if packet.type == ServerPacketTypes.TOTALS:
+            self.totals = self.get_block_data(block)
+
+        elif packet.type == ServerPacketTypes.EXTREMES:
+            self.extremes = self.get_block_data(block)
+
         # Header block contains no rows. Pick columns from it.
-        if block.rows:
+        elif block.rows:
             if self.columnar:
-                columns = block.get_columns()
-                if self.data:
-                    # Extend corresponding column.
-                    for i, column in enumerate(columns):
-                        self.data[i] += column
-                else:
-                    self.data.extend(columns)
+                self.blocks_columns.append(block.get_columns())
+            elif self.storage is not None:
+                self.storage.add_block(block)
             else:
                 self.data.extend(block.get_rows())
 
         elif not self.columns_with_types:
             self.columns_with_types = block.columns_with_types
 
+    def get_block_data(self, block):
+        return block.get_columns() if self.columnar else block.get_rows()
+
     def get_result(self):
         for packet in self.packet_generator:
             self.store(packet)
 
+        if self.blocks_columns:
+            self.data = merge_columns(self.blocks_columns)
+            self.blocks_columns = []
+
+        elif self.storage is not None:
+            self.data = self.storage.get_result()
+            self.storage = None
+
         if self.with_column_types:
             return self.data, self.columns_with_types
         else:
@@ -48,17 +74,15 @@ class QueryResult(object):
 class ProgressQueryResult(QueryResult):
     def __init__(
             self, packet_generator,
-            with_column_types=False, columnar=False):
+            with_column_types=False, columnar=False, storage=None):
         self.progress_totals = Progress()
 
         super(ProgressQueryResult, self).__init__(
-            packet_generator, with_column_types, columnar
+            packet_generator, with_column_types, columnar, storage
         )
 
     def store_progress(self, progress_packet):
-        self.progress_totals.rows += progress_packet.rows
-        self.progress_totals.bytes += progress_packet.bytes
-        self.progress_totals.total_rows += progress_packet.total_rows
+        self.progress_totals.increment(progress_packet)
         return self.progress_totals.rows, self.progress_totals.total_rows
 
     def __iter__(self):
@@ -100,7 +124,7 @@ class IterQueryResult(object):
     def next(self):
         packet = next(self.packet_generator)
         block = getattr(packet, 'block', None)
-        if block is None:
+        if block is None or packet.type != ServerPacketTypes.DATA:
             return []
 
         if self.first_block and self.with_column_types:
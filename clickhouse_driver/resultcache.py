@@ -0,0 +1,102 @@
+from collections import OrderedDict
+import re
+from threading import Lock
+from time import time
+
+from .resultstorage import estimate_column_size
+
+
+# Quoted literals and identifiers are kept as is, whitespace between them is
+# collapsed.
+query_whitespace_re = re.compile(
+    r"('(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"|`(?:[^`\\]|\\.)*`)|\s+"
+)
+
+
+def normalize_query(query):
+    return query_whitespace_re.sub(
+        lambda m: m.group(1) or ' ', query
+    ).strip()
+
+
+def estimate_columns_size(columns):
+    return sum(estimate_column_size(x) for x in columns)
+
+
+class ResultCache(object):
+    """
+    Decoded columnar results of SELECT queries. Entries expire in *ttl*
+    seconds, least recently used ones are evicted when total estimated
+    size exceeds *max_bytes*. Can be shared by several clients: hosts of
+    client are part of key.
+
+    :param ttl: lifetime of entry in seconds.
+    :param max_bytes: estimated size of all entries. Results bigger than it
+                      are not cached.
+    """
+
+    def __init__(self, ttl=60, max_bytes=100 * 1024 * 1024):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+
+        self.lock = Lock()
+        self.entries = OrderedDict()
+        self.size = 0
+
+        self.hits = 0
+        self.misses = 0
+
+        super(ResultCache, self).__init__()
+
+    def make_key(self, query, settings, client_settings, hosts, database,
+                 user):
+        """
+        Query must be passed with substituted parameters. *hosts* are
+        ``(host, port)`` tuples of main and alternative hosts.
+        """
+        return (
+            normalize_query(query),
+            tuple(sorted((k, repr(v)) for k, v in settings.items())),
+            tuple(sorted((k, repr(v)) for k, v in client_settings.items())),
+            tuple(sorted(hosts)),
+            database,
+            user
+        )
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+
+            if entry is None or entry[0] <= time():
+                if entry is not None:
+                    self.remove(key)
+                self.misses += 1
+                return None
+
+            # Most recently used entries are at the end.
+            self.entries[key] = self.entries.pop(key)
+            self.hits += 1
+            return entry[2]
+
+    def put(self, key, value, size):
+        if size > self.max_bytes:
+            return
+
+        with self.lock:
+            if key in self.entries:
+                self.remove(key)
+
+            self.entries[key] = time() + self.ttl, size, value
+            self.size += size
+
+            while self.size > self.max_bytes:
+                self.remove(next(iter(self.entries)))
+
+    def remove(self, key):
+        _, size, _ = self.entries.pop(key)
+        self.size -= size
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
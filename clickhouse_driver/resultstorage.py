@@ -0,0 +1,139 @@
+from itertools import chain, islice
+import mmap
+from tempfile import TemporaryFile
+
+from .context import Context
+from .streams.native import BlockInputStream, BlockOutputStream
+from .util.compat import binary_type, string_types
+
+
+# Number of column items used for column size estimation.
+ESTIMATE_SAMPLE_SIZE = 100
+
+
+def estimate_column_size(items):
+    nbytes = getattr(items, 'nbytes', None)
+    if nbytes is not None:
+        # numpy array.
+        return nbytes
+
+    n_items = len(items)
+    if not n_items:
+        return 0
+
+    sample = list(islice(items, ESTIMATE_SAMPLE_SIZE))
+    sample_size = sum(
+        len(x) + 40 if isinstance(x, (string_types, binary_type)) else 32
+        for x in sample
+    )
+    return sample_size * n_items // len(sample)
+
+
+def estimate_block_size(block):
+    return sum(estimate_column_size(x) for x in block.get_columns())
+
+
+def copy_context(context):
+    # Blocks are read back with settings of query that received them.
+    rv = Context()
+    rv.server_info = context.server_info
+    rv.settings = context.settings
+    rv.client_settings = context.client_settings
+    return rv
+
+
+class SpillingStorage(object):
+    """
+    Keeps received blocks in memory until their estimated size exceeds
+    *memory_limit* bytes. Then all blocks are written to temporary file in
+    Native format and result is read back from it on demand.
+    """
+
+    def __init__(self, context, memory_limit):
+        self.context = copy_context(context)
+        self.memory_limit = memory_limit
+
+        self.blocks = []
+        self.size = 0
+        self.rows = 0
+
+        self.file = None
+        self.stream = None
+
+        super(SpillingStorage, self).__init__()
+
+    def add_block(self, block):
+        self.rows += block.rows
+
+        if self.file is not None:
+            self.stream.write(block)
+            return
+
+        self.blocks.append(block)
+        self.size += estimate_block_size(block)
+
+        if self.size > self.memory_limit:
+            self.spill()
+
+    def spill(self):
+        self.file = TemporaryFile(prefix='clickhouse-driver-')
+        self.stream = BlockOutputStream(self.file, self.context)
+
+        for block in self.blocks:
+            self.stream.write(block)
+
+        self.blocks = []
+        self.size = 0
+
+    def get_result(self):
+        if self.file is None:
+            return list(chain.from_iterable(
+                block.get_rows() for block in self.blocks
+            ))
+
+        self.file.flush()
+        return SpilledResult(self.file, self.context, self.rows)
+
+
+class SpilledResult(object):
+    """
+    Rows of result spilled to temporary file. Can be iterated many times,
+    blocks are read from memory-mapped file one by one. File is removed on
+    :meth:`close` or when result is garbage collected.
+    """
+
+    def __init__(self, file, context, rows):
+        self.file = file
+        self.context = context
+        self.rows = rows
+
+        super(SpilledResult, self).__init__()
+
+    def __len__(self):
+        return self.rows
+
+    def __iter__(self):
+        for block in self.iter_blocks():
+            for row in block.get_rows():
+                yield row
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def iter_blocks(self):
+        buf = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        size = buf.size()
+        stream = BlockInputStream(buf, self.context)
+
+        try:
+            while buf.tell() < size:
+                yield stream.read()
+
+        finally:
+            buf.close()
+
+    def close(self):
+        self.file.close()
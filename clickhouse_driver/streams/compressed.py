@@ -88,6 +88,16 @@ class CompressedBlockReader(object):
 
         return rv
 
+    def exhausted(self):
+        if not self.block:
+            return True
+
+        # Decompressed data of current block is read to the end.
+        position = self.block.tell()
+        end = self.block.seek(0, 2)
+        self.block.seek(position)
+        return position == end
+
 
 class CompressedBlockInputStream(BlockInputStream):
     def __init__(self, fin, context):
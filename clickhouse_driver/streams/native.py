@@ -20,9 +20,8 @@ class BlockOutputStream(object):
         if revision >= defines.DBMS_MIN_REVISION_WITH_BLOCK_INFO:
             block.info.write(self.fout)
 
-        # We write transposed data.
-        n_columns = block.rows
-        n_rows = block.columns
+        n_columns = block.columns
+        n_rows = block.rows
 
         write_varint(n_columns, self.fout)
         write_varint(n_rows, self.fout)
@@ -31,14 +30,11 @@ class BlockOutputStream(object):
             write_binary_str(col_name, self.fout)
             write_binary_str(col_type, self.fout)
 
-            if n_columns:
-                try:
-                    items = [row[i] for row in block.data]
-                except IndexError:
-                    raise ValueError('Different rows length')
-
+            if n_rows:
+                items = block.get_column(i)
                 write_column(self.context, col_name, col_type, items,
-                             self.fout, types_check=block.types_check)
+                             self.fout, types_check=block.types_check,
+                             start_row=block.start_row)
 
         self.finalize()
 
@@ -68,6 +64,12 @@ class BlockInputStream(object):
 
         data, names, types = [], [], []
 
+        if self.context.client_settings.get('arrow_output'):
+            from ..arrow import read_arrow_column
+            column_reader = read_arrow_column
+        else:
+            column_reader = read_column
+
         for i in range(n_columns):
             column_name = read_binary_str(self.fin)
             column_type = read_binary_str(self.fin)
@@ -76,15 +78,16 @@ class BlockInputStream(object):
             types.append(column_type)
 
             if n_rows:
-                column = read_column(self.context, column_type, n_rows,
-                                     self.fin)
+                column = column_reader(self.context, column_type, n_rows,
+                                       self.fin)
                 data.append(column)
 
         block = Block(
             columns_with_types=list(zip(names, types)),
             data=data,
             info=info,
-            received_from_server=True
+            received_from_server=True,
+            columnar=True
         )
 
         return block
@@ -0,0 +1,40 @@
+from .reader import read_binary_str, read_binary_uint8, read_varint
+from .writer import write_binary_str, write_varint
+
+
+class TableStatus(object):
+    def __init__(self):
+        self.is_replicated = False
+        self.absolute_delay = 0
+
+        super(TableStatus, self).__init__()
+
+    def read(self, fin):
+        self.is_replicated = bool(read_binary_uint8(fin))
+        if self.is_replicated:
+            self.absolute_delay = read_varint(fin)
+
+
+def write_tables_status_request(tables, fout):
+    write_varint(len(tables), fout)
+
+    for database, table in tables:
+        write_binary_str(database, fout)
+        write_binary_str(table, fout)
+
+
+def read_tables_status_response(fin):
+    """
+    Returns dict: (database, table) -> TableStatus.
+    """
+    statuses = {}
+
+    for _ in range(read_varint(fin)):
+        database = read_binary_str(fin)
+        table = read_binary_str(fin)
+
+        status = TableStatus()
+        status.read(fin)
+        statuses[(database, table)] = status
+
+    return statuses
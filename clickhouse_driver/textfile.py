@@ -0,0 +1,417 @@
+from ast import literal_eval
+from collections import deque
+import csv
+from datetime import date, datetime
+import json
+import mmap
+from multiprocessing import Pool
+import os
+import re
+
+from . import errors
+from .util.compat import string_types
+
+
+# Approximate size of file part parsed at once. Each part is sent as
+# separate block (or several blocks if it has more than
+# insert_block_size rows).
+DEFAULT_CHUNK_SIZE = 16 * 1024 * 1024
+
+TSV_NULL = '\\N'
+
+tsv_escape_re = re.compile(r'\\(.)')
+tsv_escapes = {
+    'b': '\b', 'f': '\f', 'r': '\r', 'n': '\n', 't': '\t', '0': '\0'
+}
+
+# NULL outside of quoted strings in array literal.
+array_null_re = re.compile(r"('(?:[^'\\]|\\.)*')|\bNULL\b")
+
+
+class TextFormat(object):
+    CSV = 'CSV'
+    CSV_WITH_NAMES = 'CSVWithNames'
+    TSV = 'TSV'
+    TSV_WITH_NAMES = 'TSVWithNames'
+    JSON_EACH_ROW = 'JSONEachRow'
+
+    aliases = {
+        'TabSeparated': TSV,
+        'TabSeparatedWithNames': TSV_WITH_NAMES
+    }
+
+    formats = (CSV, CSV_WITH_NAMES, TSV, TSV_WITH_NAMES, JSON_EACH_ROW)
+
+    with_names = (CSV_WITH_NAMES, TSV_WITH_NAMES)
+
+
+def unescape_tsv(value):
+    if '\\' not in value:
+        return value
+
+    return tsv_escape_re.sub(
+        lambda m: tsv_escapes.get(m.group(1), m.group(1)), value
+    )
+
+
+def parse_date(value):
+    return date(int(value[0:4]), int(value[5:7]), int(value[8:10]))
+
+
+def parse_datetime(value):
+    # Raw timestamps are written as is.
+    if not isinstance(value, string_types) or value.isdigit():
+        return int(value)
+
+    return datetime(
+        int(value[0:4]), int(value[5:7]), int(value[8:10]),
+        int(value[11:13]), int(value[14:16]), int(value[17:19])
+    )
+
+
+def parse_array_literal(value):
+    return literal_eval(
+        array_null_re.sub(lambda m: m.group(1) or 'None', value)
+    )
+
+
+def get_default(spec):
+    """
+    Returns default value of type *spec* for empty CSV field. ``None`` is
+    returned for strings and other types without default: empty field is
+    passed as is.
+    """
+    if spec.startswith('Array'):
+        return []
+
+    elif spec.startswith('DateTime'):
+        return 0
+
+    elif spec == 'Date':
+        return date(1970, 1, 1)
+
+    elif spec.startswith('Float'):
+        return 0.0
+
+    elif spec.startswith(('Int', 'UInt')):
+        return 0
+
+    return None
+
+
+def make_converter(spec, null_value, unescape=None, empty_as_default=False):
+    """
+    Returns function converting parsed value into value accepted by column
+    of type *spec*. ``None`` is returned if value is accepted as is.
+
+    If *empty_as_default* is set empty values of non-string types are
+    replaced by type defaults and by NULLs in nullable columns, like
+    ClickHouse does with CSV.
+    """
+    if spec.startswith('Nullable'):
+        inner_spec = spec[9:-1]
+        inner = make_converter(inner_spec, null_value, unescape=unescape)
+        empty_is_null = empty_as_default and \
+            get_default(inner_spec) is not None
+
+        def convert_nullable(value):
+            if value is None or value == null_value or \
+                    (empty_is_null and value == ''):
+                return None
+
+            return inner(value) if inner is not None else value
+
+        return convert_nullable
+
+    converter = make_base_converter(spec, unescape=unescape)
+
+    default = get_default(spec) if empty_as_default else None
+    if default is None:
+        return converter
+
+    def convert_empty(value):
+        if value == '':
+            # Arrays are mutable: default isn't shared between rows.
+            return list(default) if isinstance(default, list) else default
+
+        return converter(value) if converter is not None else value
+
+    return convert_empty
+
+
+def make_base_converter(spec, unescape=None):
+    if spec.startswith('Array'):
+        # Items of array literal are already unescaped.
+        inner = make_converter(spec[6:-1], None)
+
+        def convert_array(value):
+            if isinstance(value, string_types):
+                value = parse_array_literal(value)
+
+            if inner is None:
+                return value
+
+            return [inner(x) for x in value]
+
+        return convert_array
+
+    elif spec.startswith(('String', 'FixedString', 'Enum')):
+        return unescape
+
+    elif spec.startswith('DateTime'):
+        return parse_datetime
+
+    elif spec == 'Date':
+        return parse_date
+
+    elif spec.startswith('Float'):
+        return float
+
+    elif spec.startswith(('Int', 'UInt')):
+        return int
+
+    return None
+
+
+def split_chunks(buf, size, chunk_size, start=0, quote=None):
+    """
+    Yields ``(start, end)`` offsets of file parts with whole lines. If
+    *quote* is passed newlines inside quoted values are skipped: they are
+    preceded by odd number of quotes since part start.
+    """
+    while start < size:
+        end = min(start + chunk_size, size)
+        quotes = buf[start:end].count(quote) if quote is not None else 0
+
+        while end < size:
+            position = buf.find(b'\n', end)
+            position = size if position == -1 else position + 1
+
+            if quote is not None:
+                quotes += buf[end:position].count(quote)
+
+            end = position
+            if not quotes % 2:
+                break
+
+        yield start, end
+        start = end
+
+
+def parse_rows(text, fmt, names):
+    # Empty lines are rows with one empty value, e.g. empty string. Only
+    # empty fragment after the last newline is skipped.
+    if fmt in (TextFormat.CSV, TextFormat.CSV_WITH_NAMES):
+        return [row or [''] for row in csv.reader(text.splitlines(True))]
+
+    elif fmt in (TextFormat.TSV, TextFormat.TSV_WITH_NAMES):
+        lines = text.split('\n')
+        if not lines[-1]:
+            lines.pop()
+        return [line.split('\t') for line in lines]
+
+    else:
+        # Whitespace between JSON objects is skipped.
+        rv = []
+        for line in text.split('\n'):
+            if line.strip():
+                item = json.loads(line)
+                rv.append([item.get(name) for name in names])
+
+        return rv
+
+
+def parse_text(text, fmt, columns_with_types, offset=0):
+    """
+    Parses text into list of typed columns. Errors refer rows by number in
+    text and *offset* of text in file.
+    """
+    names = [name for name, _ in columns_with_types]
+    rows = parse_rows(text, fmt, names)
+    if not rows:
+        return None
+
+    n_columns = len(columns_with_types)
+    for i, row in enumerate(rows):
+        if len(row) != n_columns:
+            raise ValueError(
+                'Expected {} values, got {} in row {} of part at byte {}: '
+                '{}'.format(n_columns, len(row), i, offset, row)
+            )
+
+    empty_as_default = False
+    if fmt == TextFormat.JSON_EACH_ROW:
+        null_value, unescape = None, None
+    elif fmt in (TextFormat.TSV, TextFormat.TSV_WITH_NAMES):
+        null_value, unescape = TSV_NULL, unescape_tsv
+    else:
+        null_value, unescape = TSV_NULL, None
+        empty_as_default = True
+
+    columns = []
+    for (name, spec), items in zip(columns_with_types, zip(*rows)):
+        converter = make_converter(
+            spec, null_value, unescape=unescape,
+            empty_as_default=empty_as_default
+        )
+
+        if converter is not None:
+            try:
+                items = [converter(x) for x in items]
+
+            except (ValueError, TypeError, SyntaxError) as e:
+                # Find failed row only on error: conversion is hot path.
+                i = 0
+                for i, x in enumerate(items):
+                    try:
+                        converter(x)
+                    except (ValueError, TypeError, SyntaxError):
+                        break
+
+                raise ValueError(
+                    'Cannot parse column "{}" of type {} in row {} of part '
+                    'at byte {}: {}'.format(name, spec, i, offset, e)
+                )
+
+        columns.append(items)
+
+    return columns
+
+
+def open_mmap(f):
+    return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def parse_file_chunk(path, fmt, columns_with_types, start, end):
+    # Runs in worker process: file is mapped again.
+    with open(path, 'rb') as f:
+        buf = open_mmap(f)
+        try:
+            text = buf[start:end].decode('utf-8')
+        finally:
+            buf.close()
+
+    return parse_text(text, fmt, columns_with_types, offset=start)
+
+
+class TextFileReader(object):
+    """
+    Reads local file in CSV, TSV or JSONEachRow format by chunks of about
+    *chunk_size* bytes. File is memory-mapped, only chunks being parsed are
+    kept in memory. Values are converted into types of table columns.
+
+    :param path: file path.
+    :param fmt: ``CSV``, ``CSVWithNames``, ``TSV`` (``TabSeparated``),
+                ``TSVWithNames`` (``TabSeparatedWithNames``) or
+                ``JSONEachRow``.
+    :param chunk_size: approximate size of chunk in bytes.
+    :param workers: number of processes parsing chunks in parallel. Chunks
+                    are parsed in calling thread by default.
+    """
+
+    def __init__(self, path, fmt, chunk_size=DEFAULT_CHUNK_SIZE, workers=0):
+        fmt = TextFormat.aliases.get(fmt, fmt)
+        if fmt not in TextFormat.formats:
+            raise ValueError('Unknown format {}'.format(fmt))
+
+        self.path = path
+        self.fmt = fmt
+        self.chunk_size = chunk_size
+        self.workers = workers
+
+        self.file = open(path, 'rb')
+        self.size = os.fstat(self.file.fileno()).st_size
+        self.buf = open_mmap(self.file) if self.size else None
+
+        # Column names from header line.
+        self.names = None
+        self.data_start = 0
+        if fmt in TextFormat.with_names and self.size:
+            self.read_header()
+
+        super(TextFileReader, self).__init__()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def read_header(self):
+        end = self.buf.find(b'\n')
+        end = self.size if end == -1 else end + 1
+
+        header = self.buf[:end].decode('utf-8')
+        if self.fmt == TextFormat.CSV_WITH_NAMES:
+            self.names = next(csv.reader([header]))
+        else:
+            self.names = [
+                unescape_tsv(x) for x in header.rstrip('\n').split('\t')
+            ]
+
+        self.data_start = end
+
+    def iter_chunks(self):
+        if not self.size:
+            return iter(())
+
+        quote = b'"' if self.fmt in (
+            TextFormat.CSV, TextFormat.CSV_WITH_NAMES
+        ) else None
+
+        return split_chunks(
+            self.buf, self.size, self.chunk_size, start=self.data_start,
+            quote=quote
+        )
+
+    def iter_columns(self, columns_with_types):
+        """
+        Returns generator of typed columns lists, one for each chunk.
+        """
+        try:
+            if self.workers:
+                parsed = self.iter_parsed_parallel(columns_with_types)
+            else:
+                parsed = (
+                    parse_text(
+                        self.buf[start:end].decode('utf-8'), self.fmt,
+                        columns_with_types, offset=start
+                    )
+                    for start, end in self.iter_chunks()
+                )
+
+            for columns in parsed:
+                if columns is not None:
+                    yield columns
+
+        except ValueError as e:
+            raise errors.CannotParseTextError(
+                '{}: {}'.format(self.path, e)
+            )
+
+    def iter_parsed_parallel(self, columns_with_types):
+        # At most two chunks per worker are parsed or waiting for sending.
+        pool = Pool(self.workers)
+        pending = deque()
+
+        try:
+            for start, end in self.iter_chunks():
+                pending.append(pool.apply_async(
+                    parse_file_chunk,
+                    (self.path, self.fmt, columns_with_types, start, end)
+                ))
+
+                if len(pending) >= 2 * self.workers:
+                    yield pending.popleft().get()
+
+            while pending:
+                yield pending.popleft().get()
+
+        finally:
+            pool.terminate()
+            pool.join()
+
+    def close(self):
+        if self.buf is not None:
+            self.buf.close()
+        self.file.close()
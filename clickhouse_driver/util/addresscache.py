@@ -0,0 +1,40 @@
+import socket
+from threading import Lock
+from time import time
+
+
+class AddressCache(object):
+    """
+    Caches getaddrinfo results for ttl seconds. Shared by all connections
+    in process, so reconnects don't wait for resolver.
+    """
+
+    def __init__(self):
+        self.lock = Lock()
+        self.entries = {}
+
+        super(AddressCache, self).__init__()
+
+    def resolve(self, host, port, ttl):
+        if not ttl:
+            return socket.getaddrinfo(host, port, 0, socket.SOCK_STREAM)
+
+        key = (host, port)
+        now = time()
+
+        entry = self.entries.get(key)
+        if entry is not None and entry[1] > now:
+            return entry[0]
+
+        addresses = socket.getaddrinfo(host, port, 0, socket.SOCK_STREAM)
+        with self.lock:
+            self.entries[key] = addresses, now + ttl
+
+        return addresses
+
+    def invalidate(self, host, port):
+        with self.lock:
+            self.entries.pop((host, port), None)
+
+
+address_cache = AddressCache()
@@ -1,3 +1,4 @@
+import operator
 import types
 import sys
 
@@ -13,9 +14,23 @@ if PY3:
     text_type = str
     binary_type = bytes
 
+    from itertools import accumulate
+
 else:
     string_types = basestring,    # noqa: F821
     integer_types = (int, long)  # noqa: F821
     class_types = (type, types.ClassType)
     text_type = unicode  # noqa: F821
     binary_type = str
+
+    def accumulate(iterable, func=operator.add):
+        it = iter(iterable)
+        try:
+            total = next(it)
+        except StopIteration:
+            return
+
+        yield total
+        for element in it:
+            total = func(total, element)
+            yield total
@@ -55,3 +55,7 @@ def escape_params(params):
         escaped[key] = escape_param(value)
 
     return escaped
+
+
+def escape_identifier(name):
+    return '`%s`' % name.replace('\\', '\\\\').replace('`', '\\`')
@@ -1,4 +1,4 @@
-from itertools import islice
+from itertools import chain, islice
 
 
 def chunks(seq, n):
@@ -7,3 +7,73 @@ def chunks(seq, n):
     while item:
         yield item
         item = list(islice(it, n))
+
+
+def column_chunks(columns, n):
+    """
+    Slices all columns into chunks of n rows. Slicing of numpy arrays
+    gives views without copying. Lengths of columns are checked before the
+    first chunk: no data must be sent if they differ.
+    """
+    if len(set(len(x) for x in columns)) > 1:
+        raise ValueError('Different columns length')
+
+    n_rows = len(columns[0]) if columns else 0
+
+    for start in range(0, n_rows, n):
+        yield [column[start:start + n] for column in columns]
+
+
+def merge_columns(blocks_columns):
+    """
+    Concatenates columns of several blocks. Tuples are joined into one
+    tuple, numpy arrays into one array.
+    """
+    if len(blocks_columns) == 1:
+        return list(blocks_columns[0])
+
+    rv = []
+    for parts in zip(*blocks_columns):
+        if getattr(parts[0], 'offsets', None) is not None:
+            # numpy arrays output of Array column.
+            rv.append(type(parts[0]).concatenate(parts))
+
+        elif getattr(parts[0], 'dtype', None) is not None:
+            np = import_numpy()
+            rv.append(np.ma.concatenate(parts)
+                      if any(np.ma.isMaskedArray(x) for x in parts)
+                      else np.concatenate(parts))
+        else:
+            rv.append(tuple(chain.from_iterable(parts)))
+
+    return rv
+
+
+def import_numpy():
+    try:
+        import numpy
+
+    except ImportError:
+        raise RuntimeError('Package numpy is required to use numpy output')
+
+    return numpy
+
+
+def import_pandas():
+    try:
+        import pandas
+
+    except ImportError:
+        raise RuntimeError('Package pandas is required to use DataFrames')
+
+    return pandas
+
+
+def import_pyarrow():
+    try:
+        import pyarrow
+
+    except ImportError:
+        raise RuntimeError('Package pyarrow is required to use Arrow')
+
+    return pyarrow
@@ -0,0 +1,81 @@
+import sys
+from threading import Event, Thread
+
+from . import compat
+
+if compat.PY3:
+    from queue import Queue, Full
+else:
+    from Queue import Queue, Full
+
+
+class PrefetchIterator(object):
+    """
+    Evaluates iterable in background thread. At most maxsize evaluated
+    items are waiting in queue, so the thread is paused when consumer
+    falls behind. Exception raised by iterable is re-raised on consumer's
+    side.
+    """
+    end_of_items = object()
+    put_timeout = 0.1
+
+    def __init__(self, iterable, maxsize):
+        self.queue = Queue(maxsize)
+        self.stopped = Event()
+        self.finished = False
+
+        self.thread = Thread(target=self.run, args=(iterable, ))
+        self.thread.daemon = True
+        self.thread.start()
+
+        super(PrefetchIterator, self).__init__()
+
+    def run(self, iterable):
+        try:
+            for item in iterable:
+                if not self.put((item, None)):
+                    return
+
+        except Exception:
+            self.put((None, sys.exc_info()[1]))
+            return
+
+        self.put((self.end_of_items, None))
+
+    def put(self, item):
+        # Consumer can stop at any moment. Don't block forever on full queue.
+        while not self.stopped.is_set():
+            try:
+                self.queue.put(item, timeout=self.put_timeout)
+                return True
+
+            except Full:
+                pass
+
+        return False
+
+    def __iter__(self):
+        return self
+
+    def next(self):
+        if self.finished:
+            raise StopIteration
+
+        item, exc = self.queue.get()
+
+        if exc is not None:
+            self.finished = True
+            raise exc
+
+        if item is self.end_of_items:
+            self.finished = True
+            raise StopIteration
+
+        return item
+
+    # For Python 3.
+    __next__ = next
+
+    def close(self):
+        self.stopped.set()
+        self.thread.join()
@@ -0,0 +1,53 @@
+import logging
+import socket
+from threading import Lock, Timer
+
+
+logger = logging.getLogger(__name__)
+
+
+class QueryWatchdog(object):
+    """
+    Sends Cancel packet if query is not finished in timeout seconds.
+    Packets are still read by query thread up to the end of stream, so
+    connection stays usable.
+    """
+
+    def __init__(self, connection, timeout):
+        self.connection = connection
+        self.timeout = timeout
+        self.fired = False
+        self.stopped = False
+        self.lock = Lock()
+
+        self.timer = Timer(timeout, self.cancel)
+        self.timer.daemon = True
+        self.timer.start()
+
+        super(QueryWatchdog, self).__init__()
+
+    def cancel(self):
+        with self.lock:
+            if self.stopped:
+                return
+
+            self.fired = True
+            logger.warning('Query timeout %s exceeded, cancelling query',
+                           self.timeout)
+            try:
+                self.connection.send_cancel()
+
+            except (socket.error, ValueError) as e:
+                logger.warning('Error on query cancel: %s', e)
+
+    def stop(self):
+        """
+        Stops timer. Returns ``True`` if Cancel packet was already sent.
+        Cancel is never sent after this call.
+        """
+        with self.lock:
+            self.stopped = True
+            fired = self.fired
+
+        self.timer.cancel()
+        return fired
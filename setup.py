@@ -87,7 +87,10 @@ setup(
     install_requires=install_requires,
     extras_require={
         'lz4': ['lz4', 'clickhouse-cityhash>=1.0.2.1'],
-        'zstd': ['zstd', 'clickhouse-cityhash>=1.0.2.1']
+        'zstd': ['zstd', 'clickhouse-cityhash>=1.0.2.1'],
+        'numpy': ['numpy'],
+        'pandas': ['numpy', 'pandas'],
+        'arrow': ['numpy', 'pyarrow']
     },
     test_suite='nose.collector',
     tests_require=[
@@ -95,6 +98,9 @@ setup(
         'mock',
         'freezegun',
         'lz4', 'zstd',
-        'clickhouse-cityhash>=1.0.2.1'
+        'clickhouse-cityhash>=1.0.2.1',
+        'numpy',
+        'pandas',
+        'pyarrow'
     ],
 )
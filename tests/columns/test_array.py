@@ -110,6 +110,27 @@ class ArrayTestCase(BaseTestCase):
             inserted = self.client.execute(query)
             self.assertEqual(inserted, data)
 
+    def test_nested_with_empty_arrays(self):
+        columns = 'a Array(Array(UInt64))'
+        data = [
+            (self.entuple([]), ), (self.entuple([[], [1, 2], []]), ),
+            (self.entuple([[3]]), )
+        ]
+
+        with self.create_table(columns):
+            self.client.execute(
+                'INSERT INTO test (a) VALUES', data
+            )
+
+            query = 'SELECT * FROM test'
+            inserted = self.emit_cli(query)
+            self.assertEqual(
+                inserted, '[]\n[[],[1,2],[]]\n[[3]]\n'
+            )
+
+            inserted = self.client.execute(query)
+            self.assertEqual(inserted, data)
+
     def test_type_mismatch_error(self):
         columns = 'a Array(Int32)'
         data = [('test', )]
@@ -124,6 +145,44 @@ class ArrayTestCase(BaseTestCase):
             with self.assertRaises(errors.TypeMismatchError):
                 self.client.execute('INSERT INTO test (a) VALUES', data)
 
+    def test_type_mismatch_row(self):
+        data = [([1, 2], ), ([3, 'x'], )]
+
+        with self.create_table('a Array(UInt8)'):
+            with self.assertRaises(errors.TypeMismatchError) as e:
+                self.client.execute(
+                    'INSERT INTO test (a) VALUES', data, types_check=True
+                )
+
+            self.assertIn('for column "a" in row 1', str(e.exception))
+
+        data = [([[1], [2]], ), ([], ), ([[3, 4], [5, 'x']], )]
+
+        with self.create_table('a Array(Array(UInt8))'):
+            with self.assertRaises(errors.TypeMismatchError) as e:
+                self.client.execute(
+                    'INSERT INTO test (a) VALUES', data, types_check=True
+                )
+
+            self.assertIn('for column "a" in row 2', str(e.exception))
+
+    def test_numpy_output(self):
+        client = self.create_client(settings={'array_output': 'numpy'})
+
+        rv = client.execute(
+            'SELECT range(number), [toString(number)] '
+            'FROM system.numbers LIMIT 4',
+            columnar=True, settings={'max_block_size': 2}
+        )
+        self.assertEqual(rv[0].offsets.tolist(), [0, 1, 3, 6])
+        self.assertEqual(rv[0].values.tolist(), [0, 0, 1, 0, 1, 2])
+        self.assertEqual(rv[1].values.tolist(), ['0', '1', '2', '3'])
+
+        rv = client.execute('SELECT [1, 2]')
+        self.assertEqual(rv[0][0].tolist(), [1, 2])
+
+        client.disconnect()
+
     def test_string_array(self):
         columns = 'a Array(String)'
         data = [(self.entuple(['aaa', 'bbb']), )]
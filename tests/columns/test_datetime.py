@@ -1,3 +1,4 @@
+from calendar import timegm
 from contextlib import contextmanager
 from datetime import date, datetime
 import os
@@ -64,6 +65,60 @@ class DateTimeTestCase(BaseTestCase):
             inserted = self.client.execute(query)
             self.assertEqual(inserted, data)
 
+    def test_timestamp_output(self):
+        client = self.create_client(settings={'datetime_output': 'timestamp'})
+
+        with self.create_table('a DateTime'):
+            data = [(1500000000, ), (1530211034, )]
+            client.execute('INSERT INTO test (a) VALUES', data)
+
+            inserted = client.execute('SELECT * FROM test')
+            self.assertEqual(inserted, data)
+
+        client.disconnect()
+
+    def test_numpy_output(self):
+        client = self.create_client(settings={'datetime_output': 'numpy'})
+
+        with self.create_table("a DateTime('Europe/Moscow')"):
+            data = [(datetime(2017, 7, 14, 5, 40), ), (datetime(2018, 1, 1), )]
+            client.execute('INSERT INTO test (a) VALUES', data)
+
+            inserted = client.execute('SELECT * FROM test', columnar=True)
+            self.assertEqual(inserted[0].dtype.name, 'datetime64[s]')
+            self.assertEqual(
+                [x.astype(datetime) for x in inserted[0]], [x[0] for x in data]
+            )
+
+        client.disconnect()
+
+    def test_numpy_output_several_blocks(self):
+        client = self.create_client(settings={'datetime_output': 'numpy'})
+
+        rv = client.execute(
+            'SELECT toDateTime(number, \'UTC\'), number '
+            'FROM system.numbers LIMIT 10',
+            columnar=True, settings={'max_block_size': 3}
+        )
+        self.assertEqual(rv[0].dtype.name, 'datetime64[s]')
+        self.assertEqual(rv[0].astype('int64').tolist(), list(range(10)))
+        self.assertEqual(rv[1], tuple(range(10)))
+
+        client.disconnect()
+
+    def test_insert_repeated_local_time(self):
+        # 2017-10-29 02:30:00 occurs twice in Europe/Berlin.
+        dt = datetime(2017, 10, 29, 2, 30)
+        ts = timegm(
+            timezone('Europe/Berlin').localize(dt).astimezone(utc).timetuple()
+        )
+
+        with self.create_table("a DateTime('Europe/Berlin')"):
+            self.client.execute('INSERT INTO test (a) VALUES', [(dt, )])
+
+            inserted = self.emit_cli('SELECT toUInt32(a) FROM test')
+            self.assertEqual(inserted, '{}\n'.format(ts))
+
 
 class DateTimeTimezonesTestCase(BaseTestCase):
     @contextmanager
@@ -126,3 +126,17 @@ class EnumTestCase(BaseTestCase):
                     (None, ), ('hello', ), (None, ), ('world', ),
                 ]
             )
+
+    def test_value_output(self):
+        columns = "a Nullable(Enum8('hello' = -1, 'world' = 2))"
+
+        data = [(None, ), ('hello', ), (2, )]
+        with self.create_table(columns):
+            self.client.execute(
+                'INSERT INTO test (a) VALUES', data
+            )
+
+            client = self.create_client(settings={'enum_output': 'value'})
+            inserted = client.execute('SELECT * FROM test')
+            self.assertEqual(inserted, [(None, ), (-1, ), (2, )])
+            client.disconnect()
@@ -57,6 +57,30 @@ class IntTestCase(BaseTestCase):
 
             self.assertIn('Column a', str(e.exception))
 
+    def test_type_mismatch_row(self):
+        data = [(1, ), (2, ), ('3', ), (4, )]
+        with self.create_table('a UInt8'):
+            with self.assertRaises(errors.TypeMismatchError) as e:
+                self.client.execute(
+                    'INSERT INTO test (a) VALUES', data, types_check=True
+                )
+
+            self.assertIn('3 for column "a" in row 2', str(e.exception))
+
+    def test_type_mismatch_row_in_next_block(self):
+        client = self.create_client(settings={'insert_block_size': 2})
+        data = [(1, ), (2, ), (3, ), (-4, ), (5, )]
+
+        with self.create_table('a UInt8'):
+            with self.assertRaises(errors.TypeMismatchError) as e:
+                client.execute(
+                    'INSERT INTO test (a) VALUES', data, types_check=True
+                )
+
+            self.assertIn('-4 for column "a" in row 3', str(e.exception))
+
+        client.disconnect()
+
     def test_all_sizes(self):
         columns = (
             'a Int8, b Int16, c Int32, d Int64, '
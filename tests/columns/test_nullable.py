@@ -28,6 +28,24 @@ class NullableTestCase(BaseTestCase):
             inserted = self.client.execute(query)
             self.assertEqual(inserted, data)
 
+    def test_all_nulls_and_no_nulls(self):
+        columns = 'a Nullable(Int32), b Nullable(String)'
+
+        data = [(None, 'a'), (None, 'b'), (None, 'c')]
+        with self.create_table(columns):
+            self.client.execute(
+                'INSERT INTO test (a, b) VALUES', data
+            )
+
+            query = 'SELECT * FROM test'
+            inserted = self.emit_cli(query)
+            self.assertEqual(
+                inserted, '\\N\ta\n\\N\tb\n\\N\tc\n'
+            )
+
+            inserted = self.client.execute(query)
+            self.assertEqual(inserted, data)
+
     def test_nullable_inside_nullable(self):
         columns = 'a Nullable(Nullable(Int32))'
 
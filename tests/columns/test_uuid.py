@@ -60,3 +60,23 @@ class UUIDTestCase(BaseTestCase):
 
             inserted = self.client.execute(query)
             self.assertEqual(inserted, data)
+
+    def test_bytes_and_hex_output(self):
+        value = UUID('c0fcbba9-0752-44ed-a5d6-4dfb4342b89d')
+
+        with self.create_table('a UUID'):
+            self.client.execute(
+                'INSERT INTO test (a) VALUES', [(value.bytes, )]
+            )
+
+            query = 'SELECT * FROM test'
+            inserted = self.emit_cli(query)
+            self.assertEqual(inserted, str(value) + '\n')
+
+            client = self.create_client(settings={'uuid_output': 'bytes'})
+            self.assertEqual(client.execute(query), [(value.bytes, )])
+            client.disconnect()
+
+            client = self.create_client(settings={'uuid_output': 'hex'})
+            self.assertEqual(client.execute(query), [(value.hex, )])
+            client.disconnect()
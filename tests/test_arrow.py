@@ -0,0 +1,81 @@
+from datetime import date, datetime
+
+import pyarrow as pa
+
+from tests.testcase import BaseTestCase
+
+
+class ArrowTestCase(BaseTestCase):
+    columns = (
+        "a Int32, b Float64, c Date, d DateTime('UTC'), e String, "
+        "f Enum8('x' = -1, 'y' = 5), g Nullable(Int64), h Array(String)"
+    )
+
+    data = [
+        (1, 1.5, date(2018, 1, 1), datetime(2018, 1, 1, 12), 'a', 'y',
+         None, ('a', 'b')),
+        (2, 2.0, date(2019, 1, 1), datetime(2019, 1, 1, 3), 'b', 'x', 7, ())
+    ]
+
+    def test_query_arrow(self):
+        with self.create_table(self.columns):
+            self.client.execute('INSERT INTO test VALUES', self.data)
+
+            table = self.client.query_arrow('SELECT * FROM test ORDER BY a')
+
+            self.assertEqual(table.column_names, list('abcdefgh'))
+            self.assertEqual(table.schema.field('a').type, pa.int32())
+            self.assertEqual(table.schema.field('c').type, pa.date32())
+            self.assertEqual(
+                table.schema.field('d').type, pa.timestamp('s', tz='UTC')
+            )
+            self.assertEqual(table.schema.field('e').type, pa.string())
+            self.assertTrue(
+                pa.types.is_dictionary(table.schema.field('f').type)
+            )
+
+            self.assertEqual(table.column('a').to_pylist(), [1, 2])
+            self.assertEqual(table.column('e').to_pylist(), ['a', 'b'])
+            self.assertEqual(table.column('f').to_pylist(), ['y', 'x'])
+            self.assertEqual(table.column('g').to_pylist(), [None, 7])
+            self.assertEqual(
+                table.column('h').to_pylist(), [['a', 'b'], []]
+            )
+
+    def test_query_arrow_empty(self):
+        table = self.client.query_arrow(
+            'SELECT number FROM system.numbers LIMIT 0'
+        )
+        self.assertEqual(table.num_rows, 0)
+        self.assertEqual(table.schema.field('number').type, pa.uint64())
+
+    def test_query_arrow_iter(self):
+        batches = self.client.query_arrow_iter(
+            'SELECT number FROM system.numbers LIMIT 10',
+            settings={'max_block_size': 3}
+        )
+        rows = [x for batch in batches for x in batch.column(0).to_pylist()]
+        self.assertEqual(rows, list(range(10)))
+
+    def test_query_arrow_iter_close(self):
+        batches = self.client.query_arrow_iter(
+            'SELECT number FROM system.numbers',
+            settings={'max_block_size': 3}
+        )
+        next(batches)
+        batches.close()
+
+        rv = self.client.execute('SELECT 1')
+        self.assertEqual(rv, [(1, )])
+
+    def test_insert_arrow(self):
+        with self.create_table(self.columns):
+            self.client.execute('INSERT INTO test VALUES', self.data)
+            table = self.client.query_arrow('SELECT * FROM test')
+
+            self.client.insert_arrow('test', table)
+
+            inserted = self.client.execute('SELECT * FROM test ORDER BY a')
+            self.assertEqual(
+                inserted, [x for x in self.data for _ in range(2)]
+            )
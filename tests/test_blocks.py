@@ -1,6 +1,8 @@
 import types
 
-from clickhouse_driver.errors import ServerException
+from mock import patch
+
+from clickhouse_driver.errors import ServerException, TimeoutExceededError
 from tests.testcase import BaseTestCase
 
 
@@ -19,15 +21,33 @@ class BlocksTestCase(BaseTestCase):
         self.assertEqual(rv, [
             (-1, 2),
             (0, 6),
-            (1, 10),
-
-            # TOTALS
-            (0, 18),
-
-            # EXTREMES
-            (-1, 2),
             (1, 10)
         ])
+        self.assertEqual(self.client.last_query.totals, [(0, 18)])
+        self.assertEqual(self.client.last_query.extremes, [(-1, 2), (1, 10)])
+
+    def test_progress_totals_extremes(self):
+        progress = self.client.execute_with_progress(
+            'SELECT a, sum(b + a) FROM ('
+            'SELECT arrayJoin(range(3)) - 1 AS a,'
+            'arrayJoin(range(4)) AS b'
+            ') AS t '
+            'GROUP BY a WITH TOTALS '
+            'ORDER BY a',
+            settings={'extremes': 1}
+        )
+        self.assertEqual(progress.get_result(), [(-1, 2), (0, 6), (1, 10)])
+        self.assertEqual(progress.totals, [(0, 18)])
+        self.assertEqual(progress.extremes, [(-1, 2), (1, 10)])
+
+    def test_iter_totals(self):
+        rv = self.client.execute_iter(
+            'SELECT number % 2 AS x, count() FROM ('
+            'SELECT number FROM system.numbers LIMIT 10'
+            ') GROUP BY x WITH TOTALS ORDER BY x'
+        )
+        self.assertEqual(list(rv), [(0, 5), (1, 5)])
+        self.assertEqual(self.client.last_query.totals, [(0, 10)])
 
     def test_columnar_result(self):
         rv = self.client.execute(
@@ -84,7 +104,7 @@ class ProgressTestCase(BaseTestCase):
         with self.assertRaises(ServerException):
             progress = self.client.execute_with_progress('SELECT error')
             list(progress)
-        self.assertFalse(self.client.connection.connected)
+        self.assertTrue(self.client.connection.connected)
 
     def test_select_with_progress_no_progress_unwind(self):
         progress = self.client.execute_with_progress('SELECT 2')
@@ -142,4 +162,107 @@ class IteratorTestCase(BaseTestCase):
             self.assertIsInstance(result, types.GeneratorType)
             list(result)
 
-        self.assertFalse(self.client.connection.connected)
+        self.assertTrue(self.client.connection.connected)
+
+    def test_select_with_iter_close(self):
+        result = self.client.execute_iter(
+            'SELECT number FROM system.numbers',
+            settings={'max_block_size': 10}
+        )
+        self.assertEqual(next(result), (0, ))
+        result.close()
+
+        self.assertTrue(self.client.connection.connected)
+        rv = self.client.execute('SELECT 1')
+        self.assertEqual(rv, [(1, )])
+
+
+class TimeoutTestCase(BaseTestCase):
+    def test_execute_timeout(self):
+        with self.assertRaises(TimeoutExceededError):
+            self.client.execute('SELECT sleep(3)', timeout=0.5)
+
+        self.assertTrue(self.client.connection.connected)
+        rv = self.client.execute('SELECT 1')
+        self.assertEqual(rv, [(1, )])
+
+    def test_execute_iter_timeout(self):
+        with self.assertRaises(TimeoutExceededError):
+            list(self.client.execute_iter(
+                'SELECT sleep(3)', timeout=0.5
+            ))
+
+        rv = self.client.execute('SELECT 1')
+        self.assertEqual(rv, [(1, )])
+
+    def test_no_timeout(self):
+        rv = self.client.execute('SELECT 1', timeout=10)
+        self.assertEqual(rv, [(1, )])
+
+    def test_timer_after_end_of_stream(self):
+        start_watchdog = self.client.start_watchdog
+        watchdogs = []
+
+        def side_effect(timeout):
+            watchdog = start_watchdog(timeout)
+            watchdogs.append(watchdog)
+            return watchdog
+
+        with patch.object(self.client, 'start_watchdog') as m:
+            m.side_effect = side_effect
+            rv = self.client.execute('SELECT 1', timeout=10)
+            self.assertEqual(rv, [(1, )])
+
+        connection = self.client.connection
+        with patch.object(connection, 'send_cancel') as send_cancel:
+            # Timer fires when stream is already completed.
+            watchdogs[0].cancel()
+            send_cancel.assert_not_called()
+
+        self.assertFalse(watchdogs[0].fired)
+        rv = self.client.execute('SELECT 2')
+        self.assertEqual(rv, [(2, )])
+
+
+class CallbacksTestCase(BaseTestCase):
+    def test_execute_callbacks(self):
+        progress = []
+        profile_info = []
+        blocks = []
+        totals = []
+
+        rv = self.client.execute(
+            'SELECT arrayJoin(range(100)) AS x, count() '
+            'FROM system.one GROUP BY x WITH TOTALS LIMIT 10',
+            settings={'max_block_size': 5},
+            on_progress=progress.append, on_profile_info=profile_info.append,
+            on_block=blocks.append, on_totals=totals.append
+        )
+        self.assertTrue(rv)
+        self.assertEqual(len(totals), 1)
+        self.assertTrue(blocks)
+        self.assertEqual(len(profile_info), 1)
+        self.assertTrue(profile_info[0].applied_limit)
+        self.assertEqual(profile_info[0].rows_before_limit, 100)
+
+    def test_last_query(self):
+        self.client.execute(
+            'SELECT number FROM system.numbers LIMIT 10, 5'
+        )
+        last_query = self.client.last_query
+        self.assertTrue(last_query.profile_info.applied_limit)
+        self.assertEqual(last_query.profile_info.rows_before_limit, 15)
+        self.assertGreater(last_query.progress.rows, 0)
+        self.assertGreater(last_query.elapsed, 0)
+
+    def test_execute_iter_callbacks(self):
+        blocks = []
+        rv = self.client.execute_iter(
+            'SELECT number FROM system.numbers LIMIT 10',
+            settings={'max_block_size': 2}, on_block=blocks.append
+        )
+        self.assertEqual(list(rv), list(zip(range(10))))
+        self.assertEqual(sum(x.rows for x in blocks), 10)
+        self.assertEqual(
+            self.client.last_query.profile_info.rows_before_limit, 10
+        )
@@ -0,0 +1,127 @@
+from tests.testcase import BaseTestCase
+from clickhouse_driver.bulkinsert import (
+    BulkInserter, BulkInsertError, InsertAbortedError
+)
+
+
+class BulkInsertTestCase(BaseTestCase):
+    def create_inserter(self, hosts, **kwargs):
+        return BulkInserter(
+            hosts, database=self.database, user=self.user,
+            password=self.password, **kwargs
+        )
+
+    def test_several_connections(self):
+        inserter = self.create_inserter(
+            [(self.host, self.port)], connections_per_host=3,
+            settings={'insert_block_size': 10}
+        )
+
+        with self.create_table('a UInt32'):
+            report = inserter.insert(
+                'INSERT INTO test (a) VALUES', ((i, ) for i in range(1000))
+            )
+            self.assertEqual(report.rows, 1000)
+            self.assertEqual(len(report.results), 3)
+            self.assertEqual(report.failed, [])
+
+            inserted = self.client.execute('SELECT sum(a) FROM test')
+            self.assertEqual(inserted, [(sum(range(1000)), )])
+
+        inserter.disconnect()
+
+    def test_sharding_key(self):
+        host = (self.host, self.port)
+        inserter = self.create_inserter(
+            [host, host], sharding_key=lambda row: row[0],
+            settings={'insert_block_size': 10}
+        )
+
+        with self.create_table('a UInt32'):
+            report = inserter.insert(
+                'INSERT INTO test (a) VALUES', [(i, ) for i in range(101)]
+            )
+            self.assertEqual(
+                [(x.shard, x.rows) for x in report.results], [(0, 51), (1, 50)]
+            )
+
+            inserted = self.client.execute('SELECT count() FROM test')
+            self.assertEqual(inserted, [(101, )])
+
+        inserter.disconnect()
+
+    def test_sharding_key_required(self):
+        with self.assertRaises(ValueError):
+            self.create_inserter(['a', 'b'])
+
+    def test_data_error_aborts_insert(self):
+        # Aborted data is dropped by server only while it's below squashing
+        # thresholds.
+        inserter = self.create_inserter(
+            [(self.host, self.port)], connections_per_host=2,
+            settings={
+                'insert_block_size': 10,
+                'min_insert_block_size_rows': 1000000,
+                'min_insert_block_size_bytes': 0
+            }
+        )
+
+        def data():
+            for i in range(500):
+                yield (i, )
+            raise RuntimeError('broken source')
+
+        with self.create_table('a UInt32'):
+            with self.assertRaises(RuntimeError):
+                inserter.insert('INSERT INTO test (a) VALUES', data())
+
+            inserted = self.client.execute('SELECT count() FROM test')
+            self.assertEqual(inserted, [(0, )])
+
+        inserter.disconnect()
+
+    def test_connection_error_aborts_other_connections(self):
+        host = (self.host, self.port)
+        inserter = self.create_inserter(
+            [host, host], sharding_key=lambda row: row[0],
+            settings={
+                'insert_block_size': 10,
+                'min_insert_block_size_rows': 1000000,
+                'min_insert_block_size_bytes': 0
+            }
+        )
+
+        # First block of shard 1 fails, shard 0 is still receiving data.
+        data = [(1, 'x')] + [(1, 1)] * 9 + [(0, i) for i in range(100000)]
+
+        with self.create_table('a UInt8, b UInt32'):
+            with self.assertRaises(BulkInsertError) as e:
+                inserter.insert(
+                    'INSERT INTO test (a, b) VALUES', data, types_check=True
+                )
+
+            results = e.exception.report.results
+            self.assertEqual(len(e.exception.report.failed), 2)
+            self.assertIsInstance(results[0].error, InsertAbortedError)
+
+            inserted = self.client.execute('SELECT count() FROM test')
+            self.assertEqual(inserted, [(0, )])
+
+        inserter.disconnect()
+
+    def test_error_report(self):
+        inserter = self.create_inserter(
+            [(self.host, self.port)], connections_per_host=2
+        )
+
+        with self.create_table('a UInt8'):
+            with self.assertRaises(BulkInsertError) as e:
+                inserter.insert(
+                    'INSERT INTO test (a) VALUES', [('x', )], types_check=True
+                )
+
+            failed = e.exception.report.failed
+            self.assertEqual(len(failed), 1)
+            self.assertIn('for column "a" in row 0', str(failed[0].error))
+
+        inserter.disconnect()
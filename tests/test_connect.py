@@ -1,11 +1,17 @@
 import socket
+import ssl
 
 from mock import patch
 
 from clickhouse_driver import errors
 from clickhouse_driver.client import Client
+from clickhouse_driver.connection import create_ssl_context
+from clickhouse_driver.loadbalancing import (
+    LoadBalancing, hosts_state, parse_hosts
+)
 from clickhouse_driver.protocol import ClientPacketTypes, ServerPacketTypes
 from clickhouse_driver.reader import _read_one
+from clickhouse_driver.util.addresscache import address_cache
 from tests.testcase import BaseTestCase
 
 
@@ -21,6 +27,11 @@ class PacketsTestCase(BaseTestCase):
 
 
 class ConnectTestCase(BaseTestCase):
+    def setUp(self):
+        super(ConnectTestCase, self).setUp()
+        # Tests below check ping before every query.
+        self.client.connection.ping_interval = 0
+
     def test_exception_on_hello_packet(self):
         client = Client(self.host, self.port, self.database, 'wrong_user')
 
@@ -123,3 +134,273 @@ class ConnectTestCase(BaseTestCase):
 
             rv = self.client.execute('SELECT 1')
             self.assertEqual(rv, [(1, )])
+
+
+class LivenessTestCase(BaseTestCase):
+    def test_ping_skipped_for_recently_used(self):
+        self.client.execute('SELECT 1')
+
+        with patch.object(self.client.connection, 'ping') as mocked_ping:
+            rv = self.client.execute('SELECT 1')
+            self.assertEqual(rv, [(1, )])
+            mocked_ping.assert_not_called()
+
+    def test_ping_idle(self):
+        self.client.execute('SELECT 1')
+        self.client.connection.last_used -= 3600
+
+        with patch.object(self.client.connection, 'ping') as mocked_ping:
+            mocked_ping.return_value = True
+
+            self.client.execute('SELECT 1')
+            mocked_ping.assert_called_once_with()
+
+    def test_closed_socket_detected(self):
+        self.client.execute('SELECT 1')
+        connection = self.client.connection
+        old_socket = connection.socket
+
+        # Read side returns EOF as if server closed connection.
+        old_socket.shutdown(socket.SHUT_RD)
+
+        rv = self.client.execute('SELECT 1')
+        self.assertEqual(rv, [(1, )])
+        self.assertIsNot(connection.socket, old_socket)
+
+    def test_retry_idempotent_query(self):
+        self.client.execute('SELECT 1')
+
+        def side_effect(*args, **kwargs):
+            raise socket.error(32, 'Broken pipe')
+
+        with patch.object(self.client.connection, 'fout') as mocked_fout:
+            mocked_fout.flush.side_effect = side_effect
+
+            rv = self.client.execute('SELECT 1')
+            self.assertEqual(rv, [(1, )])
+
+    def test_no_retry_for_not_idempotent_query(self):
+        self.client.execute('SELECT 1')
+
+        def side_effect(*args, **kwargs):
+            raise socket.error(32, 'Broken pipe')
+
+        with patch.object(self.client.connection, 'fout') as mocked_fout:
+            mocked_fout.flush.side_effect = side_effect
+
+            with self.assertRaises(socket.error):
+                self.client.execute('DROP TABLE IF EXISTS test')
+
+
+class ServerExceptionTestCase(BaseTestCase):
+    def assertConnectionKept(self, execute):
+        self.client.execute('SELECT 1')
+        connection = self.client.connection
+        sock = connection.socket
+
+        with self.assertRaises(errors.ServerException):
+            execute('SELECT throwIf(1)')
+
+        self.assertTrue(connection.connected)
+        self.assertIs(connection.socket, sock)
+
+        rv = self.client.execute('SELECT 1')
+        self.assertEqual(rv, [(1, )])
+        self.assertIs(connection.socket, sock)
+
+    def test_execute(self):
+        self.assertConnectionKept(self.client.execute)
+
+    def test_execute_iter(self):
+        self.assertConnectionKept(
+            lambda query: list(self.client.execute_iter(query))
+        )
+
+    def test_execute_with_progress(self):
+        self.assertConnectionKept(
+            lambda query: self.client.execute_with_progress(
+                query
+            ).get_result()
+        )
+
+
+class SSLContextTestCase(BaseTestCase):
+    def test_context_created_once(self):
+        client = Client(self.host, secure=True, verify=False)
+        context = client.connection.ssl_context
+
+        self.assertIsInstance(context, ssl.SSLContext)
+        self.assertEqual(context.verify_mode, ssl.CERT_NONE)
+        self.assertFalse(context.check_hostname)
+
+    def test_shared_context(self):
+        context = create_ssl_context(verify=False)
+
+        first = Client(self.host, secure=True, ssl_context=context)
+        second = Client(self.host, secure=True, ssl_context=context)
+        self.assertIs(first.connection.ssl_context, context)
+        self.assertIs(second.connection.ssl_context, context)
+
+    def test_insecure_connection_without_context(self):
+        self.assertIsNone(self.client.connection.ssl_context)
+
+
+class SocketOptionsTestCase(BaseTestCase):
+    def test_socket_options(self):
+        client = self.create_client(
+            recv_buffer_size=1 << 20, send_buffer_size=1 << 20,
+            tcp_keepalive=(60, 10, 3)
+        )
+        client.execute('SELECT 1')
+
+        sock = client.connection.socket
+        self.assertTrue(
+            sock.getsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE)
+        )
+        # Linux doubles requested size.
+        self.assertGreaterEqual(
+            sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF), 1 << 20
+        )
+        client.disconnect()
+
+    def test_dns_cache(self):
+        client = self.create_client(dns_cache_ttl=60)
+        address_cache.invalidate(self.host, self.port)
+
+        with patch('socket.getaddrinfo', wraps=socket.getaddrinfo) as mocked:
+            for _ in range(3):
+                client.execute('SELECT 1')
+                client.disconnect()
+
+            self.assertEqual(mocked.call_count, 1)
+
+    def test_dns_cache_disabled(self):
+        client = self.create_client(dns_cache_ttl=0)
+
+        with patch('socket.getaddrinfo', wraps=socket.getaddrinfo) as mocked:
+            for _ in range(2):
+                client.execute('SELECT 1')
+                client.disconnect()
+
+            self.assertEqual(mocked.call_count, 2)
+
+
+class FailoverTestCase(BaseTestCase):
+    def test_failover_to_alt_host(self):
+        client = Client(
+            'bad-address', alt_hosts='{}:{}'.format(self.host, self.port),
+            database=self.database, user=self.user, password=self.password
+        )
+
+        rv = client.execute('SELECT 1')
+        self.assertEqual(rv, [(1, )])
+        self.assertEqual(client.connection.host, self.host)
+        self.assertIn(('bad-address', 9000), hosts_state.banned)
+
+        # Banned host is tried after alive ones.
+        client.disconnect()
+        client.execute('SELECT 1')
+        self.assertEqual(client.connection.host, self.host)
+
+        client.disconnect()
+
+    def test_all_hosts_failed(self):
+        client = Client('bad-address', alt_hosts='bad-address2:9001')
+
+        with self.assertRaises(errors.NetworkError):
+            client.execute('SHOW TABLES')
+
+    def test_load_balancing(self):
+        hosts = [(self.host, self.port), ('localhost', self.port)]
+
+        for strategy in LoadBalancing.strategies:
+            client = Client(
+                self.host, self.port, alt_hosts=hosts[1:],
+                database=self.database, user=self.user,
+                password=self.password, load_balancing=strategy
+            )
+
+            rv = client.execute('SELECT 1')
+            self.assertEqual(rv, [(1, )])
+            self.assertIn((client.connection.host, self.port), hosts)
+            client.disconnect()
+
+    def test_unknown_load_balancing(self):
+        with self.assertRaises(ValueError):
+            Client(self.host, load_balancing='unknown')
+
+    def test_parse_hosts(self):
+        self.assertEqual(
+            parse_hosts('a:9001, b,[::1]:9002', 9000),
+            [('a', 9001), ('b', 9000), ('::1', 9002)]
+        )
+        self.assertEqual(
+            parse_hosts(['a', ('b', 9001)], 9000), [('a', 9000), ('b', 9001)]
+        )
+
+
+class TablesStatusTestCase(BaseTestCase):
+    def test_tables_status(self):
+        with self.create_table('a Int8'):
+            connection = self.client.connection
+            statuses = connection.get_tables_status([(self.database, 'test')])
+
+            status = statuses[(self.database, 'test')]
+            self.assertFalse(status.is_replicated)
+            self.assertEqual(status.absolute_delay, 0)
+
+    def test_unknown_table(self):
+        with self.assertRaises(errors.ServerException):
+            self.client.connection.get_tables_status(
+                [(self.database, 'unknown_table')]
+            )
+
+    def test_fresh_replica(self):
+        with self.create_table('a Int8'):
+            client = Client(
+                'localhost', self.port, alt_hosts=[(self.host, self.port)],
+                database=self.database, user=self.user,
+                password=self.password, replica_tables=['test'],
+                max_replica_delay=10
+            )
+
+            rv = client.execute('SELECT count() FROM test')
+            self.assertEqual(rv, [(0, )])
+            self.assertEqual(client.connection.host, 'localhost')
+            client.disconnect()
+
+    def test_unknown_table_on_all_replicas(self):
+        client = Client(
+            'localhost', self.port, alt_hosts=[(self.host, self.port)],
+            database=self.database, user=self.user,
+            password=self.password, replica_tables=['unknown_table'],
+            max_replica_delay=10
+        )
+
+        with self.assertRaises(errors.ServerException):
+            client.execute('SELECT 1')
+
+        self.assertFalse(client.connection.connected)
+        self.assertIsNone(client.connection.socket)
+
+    def test_tables_status_timeout(self):
+        client = Client(
+            'localhost', self.port, alt_hosts=[(self.host, self.port)],
+            database=self.database, user=self.user,
+            password=self.password, replica_tables=['test'],
+            max_replica_delay=10
+        )
+
+        def side_effect(*args, **kwargs):
+            raise socket.timeout
+
+        with patch.object(client.connection, 'request_tables_status') as m:
+            m.side_effect = side_effect
+
+            with self.assertRaises(errors.SocketTimeoutError):
+                client.execute('SELECT 1')
+
+        self.assertFalse(client.connection.connected)
+        for host in [('localhost', self.port), (self.host, self.port)]:
+            self.assertIn(host, hosts_state.banned)
+            hosts_state.unban(host)
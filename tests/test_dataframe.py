@@ -0,0 +1,146 @@
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+from clickhouse_driver import errors
+from tests.testcase import BaseTestCase
+
+
+class DataFrameTestCase(BaseTestCase):
+    def test_query_dataframe(self):
+        columns = (
+            "a Int32, b Float64, c Date, d DateTime('UTC'), e String, "
+            "f Enum8('x' = -1, 'y' = 5), g Nullable(Int64)"
+        )
+        with self.create_table(columns):
+            data = [
+                (1, 1.5, date(2018, 1, 1), datetime(2018, 1, 1, 12), 'a',
+                 'y', None),
+                (-2, 2.0, date(2019, 1, 1), datetime(2019, 1, 1, 3), 'b',
+                 'x', 7)
+            ]
+            self.client.execute('INSERT INTO test VALUES', data)
+
+            df = self.client.query_dataframe('SELECT * FROM test ORDER BY a')
+
+            self.assertEqual(list(df.columns), list('abcdefg'))
+            self.assertEqual(df['a'].dtype, np.int32)
+            self.assertEqual(df['a'].tolist(), [-2, 1])
+            self.assertEqual(df['b'].dtype, np.float64)
+            self.assertEqual(df['c'].dtype.kind, 'M')
+            self.assertEqual(
+                df['c'].tolist(),
+                [pd.Timestamp(2019, 1, 1), pd.Timestamp(2018, 1, 1)]
+            )
+            self.assertEqual(df['d'].dtype.kind, 'M')
+            self.assertEqual(df['e'].tolist(), ['b', 'a'])
+            self.assertEqual(df['f'].dtype.name, 'category')
+            self.assertEqual(list(df['f'].cat.categories), ['x', 'y'])
+            self.assertEqual(df['f'].tolist(), ['x', 'y'])
+            self.assertEqual(df['g'].isnull().tolist(), [False, True])
+
+        # Client settings are not changed.
+        rv = self.client.execute('SELECT toDate(0)')
+        self.assertEqual(rv, [(date(1970, 1, 1), )])
+
+    def test_query_empty_dataframe(self):
+        df = self.client.query_dataframe(
+            'SELECT number FROM system.numbers LIMIT 0'
+        )
+        self.assertEqual(list(df.columns), ['number'])
+        self.assertEqual(len(df), 0)
+
+    def test_insert_dataframe(self):
+        columns = (
+            "a Int32, b Float64, c Date, d DateTime('UTC'), e String, "
+            "f Enum8('x' = -1, 'y' = 5), g Nullable(Int64)"
+        )
+        with self.create_table(columns):
+            df = pd.DataFrame({
+                'a': np.array([1, 2], dtype=np.int32),
+                'b': [0.5, 1.0],
+                'c': pd.to_datetime(['2018-01-01', '2019-01-01']),
+                'd': pd.to_datetime(['2018-01-01 12:00', '2019-01-01 03:00']),
+                'e': ['a', 'b'],
+                'f': pd.Categorical(['y', 'x']),
+                'g': [np.nan, 7]
+            }, columns=list('abcdefg'))
+
+            self.client.insert_dataframe('test', df)
+
+            inserted = self.client.execute('SELECT * FROM test ORDER BY a')
+            self.assertEqual(inserted, [
+                (1, 0.5, date(2018, 1, 1), datetime(2018, 1, 1, 12), 'a',
+                 'y', None),
+                (2, 1.0, date(2019, 1, 1), datetime(2019, 1, 1, 3), 'b',
+                 'x', 7)
+            ])
+
+    def test_insert_dataframe_nat(self):
+        columns = (
+            "a Int32, b Nullable(Date), c Nullable(DateTime('Europe/Berlin'))"
+        )
+        with self.create_table(columns):
+            df = pd.DataFrame({
+                'a': np.array([1, 2, 3], dtype=np.int32),
+                'b': pd.to_datetime(['2018-01-01', None, '2019-01-01']),
+                'c': pd.to_datetime(
+                    [None, '2018-01-01 12:00', '2019-01-01 03:00']
+                )
+            }, columns=list('abc'))
+
+            self.client.insert_dataframe('test', df)
+
+            inserted = self.client.execute('SELECT * FROM test ORDER BY a')
+            self.assertEqual(inserted, [
+                (1, date(2018, 1, 1), None),
+                (2, None, datetime(2018, 1, 1, 12)),
+                (3, date(2019, 1, 1), datetime(2019, 1, 1, 3))
+            ])
+
+    def test_insert_dataframe_repeated_local_time(self):
+        # 2017-10-29 02:30:00 occurs twice in Europe/Berlin. Both rows and
+        # numpy arrays resolve it like pytz with is_dst=False.
+        dt = datetime(2017, 10, 29, 2, 30)
+
+        with self.create_table("a Int32, b DateTime('Europe/Berlin')"):
+            self.client.execute('INSERT INTO test VALUES', [(1, dt)])
+
+            df = pd.DataFrame({
+                'a': np.array([2], dtype=np.int32),
+                'b': pd.to_datetime([dt])
+            }, columns=list('ab'))
+            self.client.insert_dataframe('test', df)
+
+            inserted = self.client.execute(
+                'SELECT toUInt32(b) FROM test ORDER BY a'
+            )
+            self.assertEqual(inserted[0], inserted[1])
+
+    def test_insert_dataframe_out_of_range(self):
+        with self.create_table('a UInt8'):
+            df = pd.DataFrame({'a': [1, 300]})
+
+            with self.assertRaises(errors.TypeMismatchError):
+                self.client.insert_dataframe('test', df)
+
+    def test_insert_dataframe_bool(self):
+        with self.create_table('a UInt8, b Nullable(UInt8)'):
+            df = pd.DataFrame({
+                'a': [True, False], 'b': [False, True]
+            }, columns=['a', 'b'])
+
+            self.client.insert_dataframe('test', df)
+
+            inserted = self.client.execute('SELECT * FROM test')
+            self.assertEqual(inserted, [(1, 0), (0, 1)])
+
+    def test_insert_dataframe_fractional(self):
+        with self.create_table('a Int32'):
+            df = pd.DataFrame({'a': [1.5, 2.0]})
+
+            with self.assertRaises(errors.TypeMismatchError) as e:
+                self.client.insert_dataframe('test', df)
+
+            self.assertIn('fractional', str(e.exception))
@@ -123,3 +123,100 @@ class InsertTestCase(BaseTestCase):
                 'SELECT number FROM system.numbers LIMIT 5'
             )
             self.assertEqual(inserted, [])
+
+    def test_data_dicts_not_mutated(self):
+        with self.create_table('a Int8, b Int8'):
+            data = [{'a': 1, 'b': 2}, {'a': 3, 'b': 4}]
+            self.client.execute(
+                'INSERT INTO test (a, b) VALUES', data
+            )
+            self.assertEqual(data, [{'a': 1, 'b': 2}, {'a': 3, 'b': 4}])
+
+
+class ColumnarInsertTestCase(BaseTestCase):
+    def test_columnar_insert(self):
+        with self.create_table('a Int8, b String'):
+            data = [(1, 2, 3), ['x', 'y', 'z']]
+            self.client.execute(
+                'INSERT INTO test (a, b) VALUES', data, columnar=True
+            )
+
+            query = 'SELECT * FROM test'
+            inserted = self.emit_cli(query)
+            self.assertEqual(inserted, '1\tx\n2\ty\n3\tz\n')
+
+    def test_insert_columns(self):
+        client = self.create_client(settings={'insert_block_size': 2})
+
+        with self.create_table('a Int8, b String'):
+            client.insert_columns(
+                'test', {'b': ['x', 'y', 'z'], 'a': [1, 2, 3]}
+            )
+
+            query = 'SELECT * FROM test'
+            inserted = self.emit_cli(query)
+            self.assertEqual(inserted, '1\tx\n2\ty\n3\tz\n')
+
+        client.disconnect()
+
+    def test_columnar_different_columns_length(self):
+        with self.create_table('a Int8, b Int8'):
+            with self.assertRaises(ValueError) as e:
+                self.client.execute(
+                    'INSERT INTO test (a, b) VALUES', [(1, 2), (3, )],
+                    columnar=True
+                )
+            self.assertEqual(str(e.exception), 'Different columns length')
+
+    def test_different_columns_length_in_next_block(self):
+        client = self.create_client(settings={'insert_block_size': 2})
+
+        with self.create_table('a Int8, b Int8'):
+            with self.assertRaises(ValueError) as e:
+                client.insert_columns(
+                    'test', {'a': [1, 2, 3, 4, 5], 'b': [1, 2, 3, 4]}
+                )
+            self.assertEqual(str(e.exception), 'Different columns length')
+
+            inserted = self.client.execute('SELECT count() FROM test')
+            self.assertEqual(inserted, [(0, )])
+
+        client.disconnect()
+
+    def test_columnar_less_columns_then_expected(self):
+        with self.create_table('a Int8, b Int8'):
+            with self.assertRaises(ValueError) as e:
+                self.client.execute(
+                    'INSERT INTO test (a, b) VALUES', [(1, 2)], columnar=True
+                )
+            self.assertEqual(str(e.exception), 'Expected 2 columns, got 1')
+
+
+class PipelinedInsertTestCase(BaseTestCase):
+    def test_pipelined_insert(self):
+        client = self.create_client(settings={
+            'insert_block_size': 2, 'insert_pipeline_depth': 2
+        })
+
+        with self.create_table('a UInt32, b String'):
+            data = [(i, str(i)) for i in range(11)]
+            client.execute('INSERT INTO test (a, b) VALUES', data)
+
+            inserted = client.execute('SELECT * FROM test ORDER BY a')
+            self.assertEqual(inserted, data)
+
+        client.disconnect()
+
+    def test_pipelined_insert_error(self):
+        client = self.create_client(settings={
+            'insert_block_size': 2, 'insert_pipeline_depth': 1
+        })
+
+        with self.create_table('a UInt8'):
+            data = [(1, ), (2, ), (3, ), ('x', )]
+            with self.assertRaises(errors.TypeMismatchError):
+                client.execute(
+                    'INSERT INTO test (a) VALUES', data, types_check=True
+                )
+
+        client.disconnect()
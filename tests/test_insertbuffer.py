@@ -0,0 +1,140 @@
+from threading import Thread
+from time import sleep
+
+from tests.testcase import BaseTestCase
+from clickhouse_driver.insertbuffer import InsertBuffer
+
+
+class InsertBufferTestCase(BaseTestCase):
+    def test_flush_on_close(self):
+        client = self.create_client()
+
+        with self.create_table('a UInt32, b String'):
+            with InsertBuffer(client, max_delay=60) as buffer:
+                buffer.insert('test', [(1, 'a'), (2, 'b')])
+                buffer.insert_columns('test', {'a': [3], 'b': ['c']})
+
+            inserted = self.client.execute('SELECT * FROM test ORDER BY a')
+            self.assertEqual(inserted, [(1, 'a'), (2, 'b'), (3, 'c')])
+
+        client.disconnect()
+
+    def test_many_producers(self):
+        client = self.create_client()
+
+        def produce(buffer, n):
+            for i in range(100):
+                buffer.insert('test', [(n * 100 + i, )])
+
+        with self.create_table('a UInt32'):
+            with InsertBuffer(client, max_rows=50) as buffer:
+                threads = [
+                    Thread(target=produce, args=(buffer, n)) for n in range(4)
+                ]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+
+            inserted = self.client.execute('SELECT count(), sum(a) FROM test')
+            self.assertEqual(inserted, [(400, sum(range(400)))])
+
+        client.disconnect()
+
+    def test_flush_by_delay(self):
+        client = self.create_client()
+
+        with self.create_table('a UInt32'):
+            buffer = InsertBuffer(client, max_delay=0.1)
+            buffer.insert('test', [(1, )], column_names=['a'])
+            sleep(1)
+
+            inserted = self.client.execute('SELECT * FROM test')
+            self.assertEqual(inserted, [(1, )])
+            buffer.close()
+
+        client.disconnect()
+
+    def test_error_callback(self):
+        client = self.create_client()
+        failed = []
+
+        def callback(query, data, e):
+            failed.append(data)
+
+        with self.create_table('a UInt8'):
+            with InsertBuffer(client, types_check=True,
+                              error_callback=callback) as buffer:
+                buffer.insert('test', [('x', )])
+
+            self.assertEqual(failed, [[('x', )]])
+
+        client.disconnect()
+
+    def test_failed_error_callback(self):
+        client = self.create_client()
+
+        def callback(query, data, e):
+            raise ValueError('callback failed')
+
+        with self.create_table('a UInt8'):
+            buffer = InsertBuffer(client, max_delay=0.1, types_check=True,
+                                  error_callback=callback)
+            buffer.insert('test', [('x', )])
+            sleep(0.5)
+
+            # Flush thread keeps running after failed callback.
+            self.assertTrue(buffer.thread.is_alive())
+            buffer.insert('test', [(1, )])
+            sleep(0.5)
+
+            inserted = self.client.execute('SELECT * FROM test')
+            self.assertEqual(inserted, [(1, )])
+            buffer.close()
+
+        client.disconnect()
+
+    def test_insert_after_close(self):
+        buffer = InsertBuffer(self.client)
+        buffer.close()
+
+        with self.assertRaises(RuntimeError):
+            buffer.insert('test', [(1, )])
+
+    def test_invalid_data_rejected(self):
+        client = self.create_client()
+
+        with self.create_table('a UInt32, b String'):
+            with InsertBuffer(client, max_delay=60) as buffer:
+                buffer.insert('test', [(1, 'a')])
+
+                with self.assertRaises(ValueError):
+                    buffer.insert('test', [{'a': 2, 'b': 'b'}])
+
+                with self.assertRaises(ValueError):
+                    buffer.insert('test', [(2, 'b', 'c')])
+
+                with self.assertRaises(ValueError):
+                    buffer.insert_columns('test', {'a': [2, 3], 'b': ['b']})
+
+                buffer.insert('test', [(2, 'b')])
+
+            # Data of other producers is not lost.
+            inserted = self.client.execute('SELECT * FROM test ORDER BY a')
+            self.assertEqual(inserted, [(1, 'a'), (2, 'b')])
+
+        client.disconnect()
+
+    def test_flush_waits_for_flush_thread(self):
+        client = self.create_client()
+
+        with self.create_table('a UInt32'):
+            with InsertBuffer(client, max_rows=10) as buffer:
+                for i in range(100):
+                    buffer.insert('test', [(i, )])
+
+                buffer.flush()
+                inserted = self.client.execute('SELECT count() FROM test')
+                self.assertEqual(inserted, [(100, )])
+
+        client.disconnect()
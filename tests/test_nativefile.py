@@ -0,0 +1,215 @@
+from datetime import date
+from io import BytesIO
+import os
+from tempfile import mkdtemp
+from shutil import rmtree
+from unittest import TestCase
+
+from clickhouse_driver.block import Block
+from clickhouse_driver.nativefile import NativeFileReader, NativeFileWriter
+from tests.testcase import BaseTestCase
+
+
+class NativeFileTestCase(TestCase):
+    columns_with_types = [
+        ('a', 'UInt32'), ('b', 'String'), ('c', 'Nullable(Date)'),
+        ('d', 'Array(Int8)')
+    ]
+
+    def setUp(self):
+        self.dir = mkdtemp()
+        self.path = os.path.join(self.dir, 'data.native')
+        super(NativeFileTestCase, self).setUp()
+
+    def tearDown(self):
+        rmtree(self.dir)
+        super(NativeFileTestCase, self).tearDown()
+
+    def make_rows(self, n_rows):
+        return [
+            (i, str(i), None if i % 2 else date(2020, 1, 1), (1, ) * (i % 3))
+            for i in range(n_rows)
+        ]
+
+    def write_and_read(self, compression=False, use_mmap=True):
+        first, second = self.make_rows(100), self.make_rows(10)
+
+        with NativeFileWriter(self.path, compression=compression) as writer:
+            writer.write(Block(self.columns_with_types, []))
+            writer.write(Block(self.columns_with_types, first))
+            writer.write(Block(self.columns_with_types, second))
+
+        self.assertEqual(writer.rows, 110)
+
+        reader = NativeFileReader(
+            self.path, compression=compression, use_mmap=use_mmap
+        )
+        with reader:
+            self.assertEqual(
+                [x.rows for x in reader.iter_blocks()], [0, 100, 10]
+            )
+            self.assertEqual(list(reader), first + second)
+
+            block = next(reader.iter_blocks())
+            self.assertEqual(
+                block.columns_with_types, self.columns_with_types
+            )
+
+    def test_read_write(self):
+        self.write_and_read()
+
+    def test_without_mmap(self):
+        self.write_and_read(use_mmap=False)
+
+    def test_lz4(self):
+        self.write_and_read(compression=True)
+        self.write_and_read(compression=True, use_mmap=False)
+
+    def test_lz4hc(self):
+        self.write_and_read(compression='lz4hc')
+
+    def test_zstd(self):
+        self.write_and_read(compression='zstd')
+
+    def test_file_object(self):
+        with open(self.path, 'wb') as f:
+            with NativeFileWriter(f) as writer:
+                writer.write(Block([('a', 'UInt8')], [(1, ), (2, )]))
+
+            self.assertFalse(f.closed)
+
+        with open(self.path, 'rb') as f:
+            self.assertEqual(list(NativeFileReader(f)), [(1, ), (2, )])
+
+    def test_bytes_io(self):
+        rows = self.make_rows(10)
+
+        for compression in [False, True]:
+            f = BytesIO()
+            with NativeFileWriter(f, compression=compression) as writer:
+                writer.write(Block(self.columns_with_types, rows))
+
+            reader = NativeFileReader(
+                f, compression=compression, use_mmap=False
+            )
+            self.assertEqual(list(reader), rows)
+
+        reader = NativeFileReader(BytesIO(), use_mmap=False)
+        self.assertEqual(list(reader), [])
+
+    def test_empty_file(self):
+        NativeFileWriter(self.path).close()
+
+        with NativeFileReader(self.path) as reader:
+            self.assertEqual(list(reader), [])
+
+    def test_empty_blocks_skipped(self):
+        with NativeFileWriter(self.path) as writer:
+            for _ in range(3):
+                writer.write(Block([('a', 'UInt8')], []))
+
+        self.assertEqual(writer.blocks, 1)
+
+    def test_numpy_output(self):
+        try:
+            import numpy as np  # noqa: F401
+        except ImportError:
+            self.skipTest('numpy package is not installed')
+
+        with NativeFileWriter(self.path) as writer:
+            writer.write(Block([('a', 'UInt8')], [(1, ), (2, )]))
+
+        reader = NativeFileReader(
+            self.path, client_settings={'use_numpy': True}
+        )
+        with reader:
+            column = next(reader.iter_blocks()).get_column(0)
+            self.assertEqual(column.dtype, np.uint8)
+            self.assertEqual(column.tolist(), [1, 2])
+
+    def test_array_numpy_output(self):
+        try:
+            import numpy as np  # noqa: F401
+        except ImportError:
+            self.skipTest('numpy package is not installed')
+
+        columns_with_types = [
+            ('a', 'Array(UInt64)'), ('b', 'Array(String)'),
+            ('c', 'Array(Array(Int8))')
+        ]
+        rows = [((1, 2), ('x', ), ((1, ), )), ((), (), ()), ((3, ), (), ())]
+
+        with NativeFileWriter(self.path) as writer:
+            writer.write(Block(columns_with_types, rows))
+            writer.write(Block(columns_with_types, rows))
+
+        reader = NativeFileReader(
+            self.path, client_settings={'array_output': 'numpy'}
+        )
+        with reader:
+            a, b, c = next(reader.iter_blocks()).get_columns()
+
+            self.assertEqual(a.offsets.tolist(), [2, 2, 3])
+            self.assertEqual(a.values.dtype, np.uint64)
+            self.assertEqual(a.values.tolist(), [1, 2, 3])
+            self.assertEqual([x.tolist() for x in a], [[1, 2], [], [3]])
+            self.assertEqual(b.values.tolist(), ['x'])
+            # Nested arrays are tuples.
+            self.assertEqual(c, (((1, ), ), (), ()))
+
+            rows = list(reader)
+            self.assertEqual(len(rows), 6)
+            self.assertEqual(rows[3][0].tolist(), [1, 2])
+
+
+class QueryToNativeFileTestCase(BaseTestCase):
+    def setUp(self):
+        self.dir = mkdtemp()
+        self.path = os.path.join(self.dir, 'data.native')
+        super(QueryToNativeFileTestCase, self).setUp()
+
+    def tearDown(self):
+        rmtree(self.dir)
+        super(QueryToNativeFileTestCase, self).tearDown()
+
+    def test_query_to_file(self):
+        query = (
+            'SELECT number, toString(number) FROM system.numbers LIMIT 1000'
+        )
+
+        rows = self.client.query_to_native_file(
+            query, self.path, settings={'max_block_size': 100},
+            compression=True
+        )
+        self.assertEqual(rows, 1000)
+
+        with NativeFileReader(self.path, compression=True) as reader:
+            self.assertEqual(list(reader), self.client.execute(query))
+
+    def test_empty_result(self):
+        rows = self.client.query_to_native_file(
+            'SELECT 1 AS x WHERE 0', self.path
+        )
+        self.assertEqual(rows, 0)
+
+        with NativeFileReader(self.path) as reader:
+            blocks = list(reader.iter_blocks())
+            self.assertEqual(len(blocks), 1)
+            self.assertEqual(blocks[0].columns_with_types, [('x', 'UInt8')])
+
+    def test_replay(self):
+        with self.create_table('a UInt64'):
+            self.client.query_to_native_file(
+                'SELECT number FROM system.numbers LIMIT 10', self.path
+            )
+
+            with NativeFileReader(self.path) as reader:
+                for block in reader.iter_blocks():
+                    self.client.execute(
+                        'INSERT INTO test (a) VALUES', block.get_columns(),
+                        columnar=True
+                    )
+
+            self.assertEqual(
+                self.client.execute('SELECT count() FROM test'), [(10, )]
+            )
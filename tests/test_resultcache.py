@@ -0,0 +1,146 @@
+from clickhouse_driver.resultcache import ResultCache, normalize_query
+from tests.testcase import BaseTestCase
+
+
+class NormalizeQueryTestCase(BaseTestCase):
+    def test_whitespace_collapsed(self):
+        self.assertEqual(
+            normalize_query('SELECT  1,\n\t2 '), 'SELECT 1, 2'
+        )
+
+    def test_literals_kept(self):
+        self.assertEqual(
+            normalize_query("SELECT  'a  b', `c  d`"), "SELECT 'a  b', `c  d`"
+        )
+
+
+class ResultCacheTestCase(BaseTestCase):
+    query = 'SELECT number FROM system.numbers LIMIT 10'
+
+    def test_cached_result(self):
+        cache = ResultCache()
+        client = self.create_client(result_cache=cache)
+
+        rv = client.execute(self.query, use_cache=True)
+        self.assertEqual(rv, [(i, ) for i in range(10)])
+        self.assertEqual(cache.misses, 1)
+
+        rv = client.execute(self.query + '  ', use_cache=True)
+        self.assertEqual(rv, [(i, ) for i in range(10)])
+        self.assertEqual(cache.hits, 1)
+
+        rv, columns = client.execute(
+            self.query, use_cache=True, columnar=True, with_column_types=True
+        )
+        self.assertEqual(rv, [tuple(range(10))])
+        self.assertEqual(columns, [('number', 'UInt64')])
+        self.assertEqual(cache.hits, 2)
+
+        client.disconnect()
+
+    def test_not_cached_without_flag(self):
+        cache = ResultCache()
+        client = self.create_client(result_cache=cache)
+
+        client.execute(self.query)
+        self.assertEqual(len(cache.entries), 0)
+
+        client.disconnect()
+
+    def test_settings_in_key(self):
+        cache = ResultCache()
+        client = self.create_client(result_cache=cache)
+
+        client.execute(self.query, use_cache=True)
+        client.execute(
+            self.query, use_cache=True, settings={'max_block_size': 1}
+        )
+        self.assertEqual(cache.misses, 2)
+        self.assertEqual(len(cache.entries), 2)
+
+        client.disconnect()
+
+    def test_hosts_in_key(self):
+        cache = ResultCache()
+        client = self.create_client(result_cache=cache)
+        other_client = self.create_client(
+            result_cache=cache, alt_hosts='localhost'
+        )
+
+        client.execute(self.query, use_cache=True)
+        other_client.execute(self.query, use_cache=True)
+        self.assertEqual(cache.misses, 2)
+        self.assertEqual(len(cache.entries), 2)
+
+        client.disconnect()
+        other_client.disconnect()
+
+    def test_params_in_key(self):
+        cache = ResultCache()
+        client = self.create_client(result_cache=cache)
+
+        rv = client.execute('SELECT %(x)s', {'x': 1}, use_cache=True)
+        self.assertEqual(rv, [(1, )])
+        rv = client.execute('SELECT %(x)s', {'x': 2}, use_cache=True)
+        self.assertEqual(rv, [(2, )])
+        self.assertEqual(cache.hits, 0)
+
+        client.disconnect()
+
+    def test_numpy_columns_copied(self):
+        cache = ResultCache()
+        client = self.create_client(
+            result_cache=cache, settings={'use_numpy': True}
+        )
+
+        rv = client.execute(self.query, use_cache=True, columnar=True)
+        rv[0][0] = 100
+
+        rv = client.execute(self.query, use_cache=True, columnar=True)
+        self.assertEqual(rv[0].tolist(), list(range(10)))
+        self.assertEqual(cache.hits, 1)
+
+        client.disconnect()
+
+    def test_callbacks_bypass_cache(self):
+        cache = ResultCache()
+        client = self.create_client(result_cache=cache)
+
+        client.execute(self.query, use_cache=True)
+
+        blocks = []
+        rv = client.execute(
+            self.query, use_cache=True, on_block=blocks.append
+        )
+        self.assertEqual(rv, [(i, ) for i in range(10)])
+        self.assertEqual(len(blocks), 1)
+        self.assertEqual(cache.hits, 0)
+
+        client.disconnect()
+
+    def test_ttl(self):
+        cache = ResultCache(ttl=0)
+        client = self.create_client(result_cache=cache)
+
+        client.execute(self.query, use_cache=True)
+        client.execute(self.query, use_cache=True)
+        self.assertEqual(cache.hits, 0)
+        self.assertEqual(cache.misses, 2)
+
+        client.disconnect()
+
+    def test_eviction(self):
+        cache = ResultCache(max_bytes=100)
+        cache.put('a', 1, 60)
+        cache.put('b', 2, 30)
+        cache.get('a')
+        cache.put('c', 3, 30)
+
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(cache.get('c'), 3)
+        self.assertEqual(cache.size, 90)
+
+        # Values bigger than cache are not stored.
+        cache.put('d', 4, 1000)
+        self.assertIsNone(cache.get('d'))
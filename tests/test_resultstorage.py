@@ -0,0 +1,56 @@
+from clickhouse_driver.resultstorage import SpilledResult
+from tests.testcase import BaseTestCase
+
+
+class SpillingTestCase(BaseTestCase):
+    query = 'SELECT number, toString(number) FROM system.numbers LIMIT 10000'
+
+    def test_spill_to_file(self):
+        client = self.create_client(settings={'result_memory_limit': 1000})
+
+        rv = client.execute(self.query, settings={'max_block_size': 1000})
+        self.assertIsInstance(rv, SpilledResult)
+        self.assertEqual(len(rv), 10000)
+
+        expected = [(i, str(i)) for i in range(10000)]
+        self.assertEqual(list(rv), expected)
+        # Result can be iterated again.
+        self.assertEqual(list(rv), expected)
+
+        rv.close()
+        client.disconnect()
+
+    def test_small_result_in_memory(self):
+        client = self.create_client(
+            settings={'result_memory_limit': 10 ** 8}
+        )
+
+        rv = client.execute(self.query)
+        self.assertIsInstance(rv, list)
+        self.assertEqual(len(rv), 10000)
+
+        client.disconnect()
+
+    def test_columnar_result_in_memory(self):
+        client = self.create_client(settings={'result_memory_limit': 1000})
+
+        rv = client.execute(self.query, columnar=True)
+        self.assertEqual(len(rv[0]), 10000)
+
+        client.disconnect()
+
+    def test_with_column_types(self):
+        client = self.create_client(settings={'result_memory_limit': 1000})
+
+        rv, columns = client.execute(
+            self.query, with_column_types=True,
+            settings={'max_block_size': 1000}
+        )
+        self.assertIsInstance(rv, SpilledResult)
+        self.assertEqual(
+            columns, [('number', 'UInt64'), ('toString(number)', 'String')]
+        )
+        self.assertEqual(sum(1 for _ in rv), 10000)
+
+        rv.close()
+        client.disconnect()
@@ -0,0 +1,233 @@
+from datetime import date, datetime
+import os
+import re
+from tempfile import mkdtemp
+from shutil import rmtree
+from unittest import TestCase
+
+from clickhouse_driver import errors
+from clickhouse_driver.textfile import TextFileReader
+from tests.testcase import BaseTestCase
+
+
+class TextFileMixin(object):
+    def setUp(self):
+        self.dir = mkdtemp()
+        super(TextFileMixin, self).setUp()
+
+    def tearDown(self):
+        rmtree(self.dir)
+        super(TextFileMixin, self).tearDown()
+
+    def make_file(self, text, name='data'):
+        path = os.path.join(self.dir, name)
+        with open(path, 'w') as f:
+            f.write(text)
+
+        return path
+
+
+class TextFileReaderTestCase(TextFileMixin, TestCase):
+    columns_with_types = [
+        ('a', 'UInt32'), ('b', 'String'), ('c', 'Date'),
+        ('d', 'DateTime'), ('e', 'Nullable(Float64)'),
+        ('f', 'Array(Nullable(String))')
+    ]
+
+    def read(self, path, fmt, **kwargs):
+        with TextFileReader(path, fmt, **kwargs) as reader:
+            return list(reader.iter_columns(self.columns_with_types))
+
+    def test_csv(self):
+        path = self.make_file(
+            '1,"x,""y""\nz",2020-01-02,2020-01-02 03:04:05,1.5,'
+            '"[\'a\',NULL]"\n'
+            '2,w,2020-01-03,1577836800,\\N,[]\n'
+        )
+
+        self.assertEqual(self.read(path, 'CSV'), [[
+            [1, 2],
+            ('x,"y"\nz', 'w'),
+            [date(2020, 1, 2), date(2020, 1, 3)],
+            [datetime(2020, 1, 2, 3, 4, 5), 1577836800],
+            [1.5, None],
+            [['a', None], []]
+        ]])
+
+    def test_tsv(self):
+        path = self.make_file(
+            '1\ta\\tb\\\\c\t2020-01-02\t2020-01-02 03:04:05\t\\N\t[\'x\']\n'
+        )
+
+        columns = self.read(path, 'TabSeparated')[0]
+        self.assertEqual(columns[1], ['a\tb\\c'])
+        self.assertEqual(columns[4], [None])
+        self.assertEqual(columns[5], [['x']])
+
+    def test_json_each_row(self):
+        path = self.make_file(
+            '{"a": 1, "b": "x", "c": "2020-01-02", '
+            '"d": "2020-01-02 03:04:05", "e": null, "f": ["y", null]}\n'
+            '\n'
+            '{"a": "2", "b": "z", "c": "2020-01-03", "d": 0, "e": 2, '
+            '"f": []}\n'
+        )
+
+        self.assertEqual(self.read(path, 'JSONEachRow'), [[
+            [1, 2],
+            ('x', 'z'),
+            [date(2020, 1, 2), date(2020, 1, 3)],
+            [datetime(2020, 1, 2, 3, 4, 5), 0],
+            [None, 2.0],
+            [['y', None], []]
+        ]])
+
+    def test_names_from_header(self):
+        path = self.make_file('b,a\nx,1\n')
+
+        with TextFileReader(path, 'CSVWithNames') as reader:
+            self.assertEqual(reader.names, ['b', 'a'])
+            columns = list(reader.iter_columns(
+                [('b', 'String'), ('a', 'UInt8')]
+            ))
+            self.assertEqual(columns, [[('x', ), [1]]])
+
+    def make_big_file(self):
+        return self.make_file(''.join(
+            '{},"multi\nline {}",2020-01-01,0,1,[]\n'.format(i, i)
+            for i in range(10000)
+        ))
+
+    def test_chunks(self):
+        path = self.make_big_file()
+
+        chunks = self.read(path, 'CSV', chunk_size=1000)
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(
+            [x for columns in chunks for x in columns[0]], list(range(10000))
+        )
+        self.assertEqual(chunks[-1][1][-1], 'multi\nline 9999')
+
+    def test_parallel(self):
+        path = self.make_big_file()
+
+        self.assertEqual(
+            self.read(path, 'CSV', chunk_size=1000, workers=2),
+            self.read(path, 'CSV', chunk_size=1000)
+        )
+
+    def test_empty_file(self):
+        path = self.make_file('')
+        self.assertEqual(self.read(path, 'CSVWithNames'), [])
+
+    def test_wrong_number_of_values(self):
+        path = self.make_file('1,2\n')
+
+        with self.assertRaises(errors.CannotParseTextError) as e:
+            self.read(path, 'CSV')
+
+        self.assertIn('Expected 6 values', str(e.exception))
+
+    def test_wrong_value(self):
+        path = self.make_file('x,a,2020-01-01,0,1,[]\n')
+
+        with self.assertRaises(errors.CannotParseTextError) as e:
+            self.read(path, 'CSV', workers=2)
+
+        self.assertIn('column "a"', str(e.exception))
+
+    def test_empty_lines(self):
+        columns_with_types = [('a', 'String')]
+
+        for fmt in ['CSV', 'TSV']:
+            path = self.make_file('x\n\n\ny\n')
+
+            with TextFileReader(path, fmt) as reader:
+                columns = list(reader.iter_columns(columns_with_types))
+                self.assertEqual(list(columns[0][0]), ['x', '', '', 'y'])
+
+    def test_csv_empty_values(self):
+        path = self.make_file('1,,2020-01-01,0,,\n')
+
+        columns = self.read(path, 'CSV')[0]
+        self.assertEqual(columns[1], ('', ))
+        self.assertEqual(columns[4], [None])
+        self.assertEqual(columns[5], [[]])
+
+        path = self.make_file(',a,,,1,[]\n')
+
+        columns = self.read(path, 'CSV')[0]
+        self.assertEqual(columns[0], [0])
+        self.assertEqual(columns[2], [date(1970, 1, 1)])
+        self.assertEqual(columns[3], [0])
+
+    def test_error_position(self):
+        path = self.make_big_file()
+        with open(path, 'a') as f:
+            f.write('x,a,2020-01-01,0,1,[]\n')
+
+        with self.assertRaises(errors.CannotParseTextError) as e:
+            self.read(path, 'CSV', chunk_size=1000)
+
+        # Row is counted in the last part, not in the whole file.
+        match = re.search(
+            r'in row (\d+) of part at byte (\d+)', str(e.exception)
+        )
+        self.assertLess(int(match.group(1)), 10000)
+        self.assertGreater(int(match.group(2)), 0)
+
+    def test_unknown_format(self):
+        path = self.make_file('')
+
+        with self.assertRaises(ValueError):
+            TextFileReader(path, 'Parquet')
+
+
+class InsertFileTestCase(TextFileMixin, BaseTestCase):
+    def test_insert_csv(self):
+        path = self.make_file(''.join(
+            '{},"{}",2020-01-01\n'.format(i, i) for i in range(1000)
+        ))
+
+        with self.create_table('a UInt32, b String, c Date'):
+            self.client.insert_file('test', path, chunk_size=1000)
+
+            inserted = self.client.execute(
+                'SELECT count(), sum(a), max(c) FROM test'
+            )
+            self.assertEqual(inserted, [(1000, 499500, date(2020, 1, 1))])
+
+    def test_insert_tsv_with_names(self):
+        path = self.make_file('b\ta\nx\\ty\t1\n\\N\t2\n')
+
+        with self.create_table('a UInt8, b Nullable(String)'):
+            self.client.insert_file('test', path, format='TSVWithNames')
+
+            inserted = self.client.execute('SELECT * FROM test ORDER BY a')
+            self.assertEqual(inserted, [(1, 'x\ty'), (2, None)])
+
+    def test_insert_json_each_row_parallel(self):
+        path = self.make_file(''.join(
+            '{{"a": {}, "b": [{}]}}\n'.format(i, i) for i in range(1000)
+        ))
+
+        with self.create_table('a UInt32, b Array(UInt32)'):
+            self.client.insert_file(
+                'test', path, format='JSONEachRow', chunk_size=1000,
+                workers=2
+            )
+
+            inserted = self.client.execute(
+                'SELECT count(), sum(a), sum(arraySum(b)) FROM test'
+            )
+            self.assertEqual(inserted, [(1000, 499500, 499500)])
+
+    def test_parse_error(self):
+        path = self.make_file('x\n')
+
+        with self.create_table('a UInt32'):
+            with self.assertRaises(errors.CannotParseTextError):
+                self.client.insert_file('test', path)
+
+            inserted = self.client.execute('SELECT count() FROM test')
+            self.assertEqual(inserted, [(0, )])